@@ -2,14 +2,37 @@ import threading
 import logging
 import os
 import sys
+import time
+import uuid
 from typing import Dict, Any
-from flask import Flask, send_from_directory, request
+
+from .startup import timeline, start_background_preload
+timeline.mark('app import started')
+
+from flask import Flask, request, g, jsonify
 from flask_cors import CORS
-from collections import defaultdict
 
 # Import our modules - using relative imports
 from .odrive_manager import ODriveManager
+from .event_bus import EventBus
+from .telemetry_sampler import TelemetrySampler
+from .telemetry_rate import TelemetryRateController
+from .connection_monitor import ConnectionMonitor
+from .error_watcher import ErrorWatcher
+from .watchdog_service import WatchdogService
+from .setpoint_stream import SetpointStreamService
+from .trajectory_player import TrajectoryPlayer
+from .script_runner import ScriptRunner
+from .path_index import PathIndexRegistry
 from .utils.utils import is_running_as_executable, open_browser
+from .utils.json_encoding import ODriveJSONProvider
+from .server import run_server
+from .static_assets import StaticAssetIndex
+from .simulator import SIMULATE_ENV, create_simulated_finder_from_env
+from .device_process import start_device_process_from_env
+from .telemetry_tap import TelemetryTap, TelemetryTapError, TAP_ENV, tap_enabled
+from .metrics import metrics
+from .rate_limiter import RateLimiter, classify_request, client_key, CLIENT_ID_HEADER, CLIENT_ID_COOKIE
 from .constants import VERSION
 
 # Import route blueprints - using relative imports
@@ -18,6 +41,11 @@ from .routes.config_routes import config_bp, init_routes as init_config_routes
 from .routes.calibration_routes import calibration_bp, init_routes as init_calibration_routes
 from .routes.telemetry_routes import telemetry_bp, init_routes as init_telemetry_routes
 from .routes.system_routes import system_bp
+from .routes.event_routes import event_bp, init_routes as init_event_routes
+from .routes.watchdog_routes import watchdog_bp, init_routes as init_watchdog_routes
+from .routes.motion_routes import motion_bp, init_routes as init_motion_routes
+from .routes.script_routes import script_bp, init_routes as init_script_routes
+timeline.mark('app modules imported')
 
 current_version = VERSION
 
@@ -39,9 +67,10 @@ app = Flask(__name__,
             static_url_path='/static',
             template_folder=template_folder)
 
+# Every jsonify() goes through the shared encoder (one NaN/Inf policy for all endpoints)
+app.json = ODriveJSONProvider(app)
+
 CORS(app, origins=["http://localhost:3000"])
-last_api_call = defaultdict(float)
-API_RATE_LIMIT = 0.1
 
 # Global variables
 connected_odrives: Dict[str, Any] = {}
@@ -49,52 +78,155 @@ current_odrive = None
 device_state_cache = {}
 last_update_time = 0
 
-# Add the backend directory to the Python path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Index the built frontend once; development builds are rescanned when new files appear
+static_assets = StaticAssetIndex(app.static_folder, auto_rescan=not hasattr(sys, '_MEIPASS'))
+static_assets.build()
 
 @app.route('/')
 def index():
     """Serve the main frontend application"""
     try:
-        if hasattr(sys, '_MEIPASS'):
-            return send_from_directory(app.static_folder, 'index.html')
-        else:
-            # Fix the path for development mode
-            return send_from_directory('../../frontend/dist', 'index.html')
+        return static_assets.serve('index.html', request)
     except Exception as e:
         return f"Error serving index: {e}", 500
 
 @app.route('/<path:path>')
 def catch_all(path):
     try:
-        if hasattr(sys, '_MEIPASS'):
-            file_path = os.path.join(app.static_folder, path)
-        else:
-            # Fix the path for development mode
-            file_path = os.path.join('../../frontend/dist', path)
-            
-        if os.path.exists(file_path):
-            return send_from_directory(os.path.dirname(file_path), os.path.basename(file_path))
-        else:
-            return index()
+        return static_assets.serve(path, request)
     except Exception as e:
         return f"Error serving file: {e}", 500
 
-# Initialize ODrive manager
-odrive_manager = ODriveManager()
+# Run directly, the backend takes the same options as start_backend.py
+cli_args = None
+if __name__ == '__main__':
+    from start_backend import parse_args
+    cli_args = parse_args()
+    # --simulate N (or ODRIVE_SIMULATE=N) replaces USB discovery with N simulated boards
+    if cli_args.simulate is not None:
+        os.environ[SIMULATE_ENV] = str(cli_args.simulate)
+    if cli_args.telemetry_tap:
+        os.environ[TAP_ENV] = '1'
+# ODRIVE_DEVICE_PROCESS=1 moves USB I/O and telemetry sampling into a child process (app.device_process)
+device_process = start_device_process_from_env()
+if device_process:
+    device_finder = device_process.finder
+else:
+    device_finder = create_simulated_finder_from_env()
+    if device_finder:
+        logger.warning(f"Simulator mode: {len(device_finder.devices)} simulated ODrive(s), no USB access")
+
+# Initialize ODrive manager and background services
+odrive_manager = ODriveManager(device_finder=device_finder)
+event_bus = EventBus()
+connection_monitor = ConnectionMonitor(odrive_manager, event_bus)
+telemetry_sampler = device_process.create_sampler(odrive_manager) if device_process else TelemetrySampler(odrive_manager)
+odrive_manager.watch_axis_states(telemetry_sampler)
+telemetry_rate = TelemetryRateController(telemetry_sampler)
+error_watcher = ErrorWatcher(telemetry_sampler, event_bus)
+odrive_manager.add_connection_listener(lambda device: error_watcher.reset())
+telemetry_tap = TelemetryTap(telemetry_sampler, device_process.ring if device_process else None)
+watchdog_service = WatchdogService(odrive_manager, event_bus)
+setpoint_service = SetpointStreamService(odrive_manager)
+trajectory_player = TrajectoryPlayer(odrive_manager, telemetry_sampler, event_bus)
+script_runner = ScriptRunner(odrive_manager, event_bus)
+path_index = PathIndexRegistry(odrive_manager)
+# ODRIVE_NO_RATE_LIMIT=1 disables request throttling (e.g. for load tests)
+rate_limiter = RateLimiter(enabled=os.environ.get('ODRIVE_NO_RATE_LIMIT') != '1')
 
 # Register blueprints and initialize routes
-app.register_blueprint(device_bp)
-app.register_blueprint(config_bp)
-app.register_blueprint(calibration_bp)
-app.register_blueprint(telemetry_bp)
-app.register_blueprint(system_bp)
+for blueprint in (device_bp, config_bp, calibration_bp, telemetry_bp, system_bp,
+                  event_bp, watchdog_bp, motion_bp, script_bp):
+    with timeline.phase(f'register blueprint {blueprint.name}'):
+        app.register_blueprint(blueprint)
 
 # Initialize routes with ODrive manager
-init_device_routes(odrive_manager)
+init_device_routes(odrive_manager, path_index)
 init_config_routes(odrive_manager)
 init_calibration_routes(odrive_manager)
-init_telemetry_routes(odrive_manager)
+init_telemetry_routes(odrive_manager, telemetry_rate, telemetry_tap)
+init_event_routes(event_bus, error_watcher)
+init_watchdog_routes(watchdog_service)
+init_motion_routes(odrive_manager, setpoint_service, trajectory_player)
+init_script_routes(script_runner)
+
+# Start sampling device error registers and watching the link (both idle while no device is connected)
+telemetry_sampler.start()
+connection_monitor.start()
+
+# The server can bind now - load odrive/usb in the background meanwhile
+timeline.mark('app initialized')
+start_background_preload()
+
+def start_telemetry_tap() -> bool:
+    """Start the telemetry tap if enabled (ODRIVE_TELEMETRY_TAP=1); called by entry points, not on import"""
+    if not tap_enabled():
+        return False
+    try:
+        telemetry_tap.start()
+    except (TelemetryTapError, OSError) as e:
+        logger.error(f"Telemetry tap not started: {e}")
+        return False
+    return True
+
+def shutdown_services():
+    """Stop background device services so the USB device is released cleanly"""
+    logger.info("Stopping backend services...")
+    script_runner.cancel()
+    trajectory_player.stop()
+    setpoint_service.shutdown()
+    watchdog_service.stop()
+    telemetry_tap.stop()
+    telemetry_sampler.stop()
+    connection_monitor.stop()
+    if device_process:
+        device_process.stop()
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.before_request
+def enforce_rate_limits():
+    """Throttle per client and endpoint class; 429 with Retry-After when a bucket is empty"""
+    if request.method == 'OPTIONS':
+        return None
+    payload = request.get_json(silent=True) if request.endpoint in ('device.execute_command', 'device.set_property') else None
+    endpoint_class = classify_request(request.endpoint, payload)
+    address = request.remote_addr or 'unknown'
+    client = client_key(address, request.cookies.get(CLIENT_ID_COOKIE), request.headers.get(CLIENT_ID_HEADER))
+    retry_after, scope = rate_limiter.check(client, endpoint_class, address)
+    if not retry_after:
+        return None
+    response = jsonify(rate_limiter.reject(endpoint_class, scope, retry_after))
+    response.status_code = 429
+    response.headers['Retry-After'] = rate_limiter.retry_after_header(retry_after)
+    return response
+
+def _metrics_endpoint() -> str:
+    # Label by route name rather than URL so path parameters don't explode cardinality
+    if request.url_rule is None:
+        return 'unmatched'
+    return request.endpoint or 'unknown'
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None and request.endpoint != 'system.get_metrics':
+        endpoint = _metrics_endpoint()
+        metrics.observe('odrive_http_request_duration_seconds', time.perf_counter() - started,
+                        endpoint=endpoint, method=request.method)
+        metrics.inc('odrive_http_requests_total', endpoint=endpoint, method=request.method,
+                    status=response.status_code)
+        if response.status_code >= 400:
+            metrics.inc('odrive_http_request_errors_total', endpoint=endpoint, status=response.status_code)
+    return response
+
+@app.teardown_request
+def record_request_exception(exc):
+    # Unhandled exceptions skip after_request - count them here
+    if exc is not None and g.pop('request_started', None) is not None:
+        metrics.inc('odrive_http_request_errors_total', endpoint=_metrics_endpoint(), status='exception')
 
 @app.after_request
 def after_request(response):
@@ -103,6 +235,12 @@ def after_request(response):
         response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
         response.headers['Pragma'] = 'no-cache'
         response.headers['Expires'] = '0'
+    elif 'ETag' in response.headers and request.path.startswith('/api/'):
+        # Versioned config reads: keep the copy but revalidate every time (304 when unchanged)
+        response.headers['Cache-Control'] = 'no-cache'
+    if CLIENT_ID_COOKIE not in request.cookies:
+        # Per-browser identity for rate limiting, so local tabs and stations don't share one budget
+        response.set_cookie(CLIENT_ID_COOKIE, uuid.uuid4().hex, httponly=True, samesite='Lax')
     return response
 
 if __name__ == '__main__':
@@ -118,11 +256,13 @@ if __name__ == '__main__':
         browser_thread.start()
     else:
         print("🔧 Running in development mode or browser disabled by tray app")
-        print("   Open: http://localhost:5000")
+        print(f"   Open: http://localhost:{cli_args.port}")
     
     try:
         logger.info("Starting ODrive GUI Backend v0.5.6")
-        app.run(host='0.0.0.0', port=5000, debug=False)
+        start_telemetry_tap()
+        run_server(app, host=cli_args.host, port=cli_args.port, production=cli_args.production,
+                   threads=cli_args.threads, on_shutdown=shutdown_services)
     except KeyboardInterrupt:
         print("\n👋 ODrive GUI Backend stopped")
     except Exception as e:
@@ -0,0 +1,147 @@
+"""
+Device connection monitor
+Derives liveness from the most recent successful device transaction (sampler
+reads, commands, property writes) and only probes the device when the link has
+been idle for a while or a transaction failed. Connect and disconnect
+transitions are published on the event bus.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CONNECTION_EVENT_TOPIC = 'connection'
+
+# Probe the device after this long without a successful transaction
+IDLE_PROBE_AFTER = 1.0
+CHECK_INTERVAL = 0.2
+
+metrics.describe('odrive_connection_probes_total', 'counter', 'Liveness probes sent by the connection monitor by outcome')
+metrics.describe('odrive_connection_idle_seconds', 'gauge', 'Seconds since the last successful device transaction')
+
+
+class ConnectionMonitor:
+    def __init__(self, odrive_manager, event_bus, idle_probe_after: float = IDLE_PROBE_AFTER,
+                 check_interval: float = CHECK_INTERVAL):
+        self.odrive_manager = odrive_manager
+        self.event_bus = event_bus
+        self.idle_probe_after = idle_probe_after
+        self.check_interval = check_interval
+        self._device = None
+        self._serial = None
+        self._connected_since = 0.0
+        self._lock = threading.Lock()
+        self._probe_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        odrive_manager.connection_monitor = self
+        metrics.register_collector(self._collect_metrics)
+
+    def _collect_metrics(self, registry):
+        if self.odrive_manager.current_device is not None and self.odrive_manager.last_transaction:
+            registry.set_gauge('odrive_connection_idle_seconds',
+                               time.monotonic() - self.odrive_manager.last_transaction)
+
+    def is_alive(self) -> bool:
+        """True if the device answered recently; probes only when the link is suspect"""
+        if self.odrive_manager.current_device is None:
+            self._update_state()
+            return False
+        # The monitor thread probes idle links; only step in if it has fallen behind
+        if self._needs_probe(time.monotonic(), self.idle_probe_after * 2):
+            return self.probe()
+        return True
+
+    def _needs_probe(self, now: float, idle_limit: float) -> bool:
+        manager = self.odrive_manager
+        return manager.last_failure >= manager.last_transaction or now - manager.last_transaction > idle_limit
+
+    def probe(self) -> bool:
+        """Read vbus_voltage to confirm the link; concurrent callers share one probe"""
+        manager = self.odrive_manager
+        with self._probe_lock:
+            # Someone else probed (or traffic arrived) while we waited
+            if manager.current_device is not None and not self._needs_probe(time.monotonic(), self.idle_probe_after):
+                return True
+            try:
+                alive = manager.current_device is not None and manager.execute_with_lock(manager.check_connection)
+            except Exception as e:
+                logger.debug(f"Connection probe failed: {e}")
+                alive = False
+            metrics.inc('odrive_connection_probes_total', outcome='alive' if alive else 'lost')
+        self._update_state(reason=None if alive else 'Device stopped responding')
+        return alive
+
+    def get_status(self) -> Dict[str, Any]:
+        manager = self.odrive_manager
+        now = time.monotonic()
+        with self._lock:
+            connected = self._device is not None
+            return {
+                'connected': connected,
+                'serial': self._serial,
+                'connected_for_s': round(now - self._connected_since, 1) if connected else None,
+                'idle_ms': round((now - manager.last_transaction) * 1000, 1) if connected else None,
+            }
+
+    def _update_state(self, reason: Optional[str] = None):
+        """Publish connect/disconnect events when the manager's device changed"""
+        manager = self.odrive_manager
+        device = manager.current_device
+        with self._lock:
+            if device is self._device:
+                return
+            previous, previous_serial = self._device, self._serial
+            self._device = device
+            self._serial = manager.current_device_serial if device is not None else None
+            self._connected_since = time.monotonic()
+            serial = self._serial
+
+        if previous is not None:
+            if reason is None:
+                reason = 'Switched device' if device is not None else 'Disconnected'
+            logger.info(f"Connection lost: {previous_serial} ({reason})")
+            self.event_bus.publish(CONNECTION_EVENT_TOPIC, {
+                'state': 'disconnected',
+                'serial': previous_serial,
+                'reason': reason,
+            })
+        if device is not None:
+            self.event_bus.publish(CONNECTION_EVENT_TOPIC, {
+                'state': 'connected',
+                'serial': serial,
+            })
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='ConnectionMonitor', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                if (self.odrive_manager.current_device is not None
+                        and self._needs_probe(time.monotonic(), self.idle_probe_after)):
+                    self.probe()
+                else:
+                    self._update_state()
+            except Exception as e:
+                logger.error(f"Connection monitor error: {e}")
+            self._stop_event.wait(self.check_interval)
@@ -0,0 +1,523 @@
+"""
+Isolated device process
+Opt-in (ODRIVE_DEVICE_PROCESS=1): the USB connection and the telemetry sampler
+run in a child process, so request handling and JSON encoding in the web
+process no longer add jitter to device sampling, and the two run on separate
+cores.
+
+The child owns the real device objects. The web process gets stand-ins
+(RemoteObject) with the same attributes, built from the device schema; their
+property reads, writes and function calls are forwarded over a pipe, so
+ODriveManager and everything built on it work unchanged. Samples come back
+through a SharedSampleRing that the web process reads in place
+(RingTelemetrySampler), without a pipe round trip.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from .shared_ring import SharedSampleRing, DEFAULT_CHANNELS, DEFAULT_CAPACITY
+from .telemetry_tap import TelemetryTapError, close_tap_ring, create_tap_ring, tap_enabled
+from .odrive_telemetry_config import FREQUENCY_CLASSES
+
+logger = logging.getLogger(__name__)
+
+DEVICE_PROCESS_ENV = 'ODRIVE_DEVICE_PROCESS'
+
+STARTUP_TIMEOUT = 30.0
+REQUEST_TIMEOUT = 30.0
+SHUTDOWN_TIMEOUT = 5.0
+# How often the web process checks the ring for new rows
+RING_POLL_INTERVAL = 0.001
+IDLE_WAIT = 0.1
+MAX_SCHEMA_DEPTH = 12
+
+# Errors re-raised with their own type in the web process (hasattr() relies on AttributeError)
+_FORWARDED_ERRORS = {error.__name__: error for error in (
+    AttributeError, TypeError, ValueError, KeyError, IndexError, RuntimeError, TimeoutError, ConnectionError,
+)}
+
+
+class DeviceProcessError(Exception):
+    """The device process failed a request or is not running"""
+
+
+def _schema(obj, depth: int = 0) -> Dict[str, Any]:
+    """{'objects': {name: schema}, 'properties': {name: (type, writable)}, 'functions': [name]} without reading values"""
+    from .path_index import object_members
+
+    schema = {'objects': {}, 'properties': {}, 'functions': []}
+    for name, kind, type_name, writable, child in object_members(obj):
+        if name.startswith('_'):
+            continue
+        if kind == 'object' and depth < MAX_SCHEMA_DEPTH:
+            schema['objects'][name] = _schema(child, depth + 1)
+        elif kind == 'property':
+            schema['properties'][name] = (type_name, writable)
+        elif kind == 'function':
+            schema['functions'].append(name)
+    return schema
+
+
+# Child process
+
+class _DeviceServer:
+    """Serves device requests from the web process and fills the sample ring"""
+
+    def __init__(self, conn, ring_name: str):
+        from .odrive_manager import ODriveManager
+        from .telemetry_sampler import TelemetrySampler
+        from .simulator import create_simulated_finder_from_env
+
+        self.conn = conn
+        finder = create_simulated_finder_from_env()
+        self.path_prefix = getattr(finder, 'path_prefix', 'USB')
+        self.manager = ODriveManager(device_finder=finder)
+        self.sampler = TelemetrySampler(self.manager)
+        # The web process created the ring and shares our resource tracker
+        self.ring = SharedSampleRing.attach(ring_name, track=True)
+        self._ring_lock = threading.Lock()
+        self.sampler.add_listener(self._on_sample)
+        self._devices: Dict[int, Any] = {}
+        self._handles: Dict[int, int] = {}
+        self._parents: Dict[Tuple[int, str], Any] = {}
+        self._handlers = {
+            'find': self.find,
+            'find_all': self.find_all,
+            'get': self.get,
+            'get_many': self.get_many,
+            'set': self.set,
+            'call': self.call,
+            'sample': self.sample,
+            'register_paths': self.register_paths,
+            'unregister_paths': self.unregister_paths,
+            'stats': self.sampler.get_stats,
+        }
+
+    def _on_sample(self, values: Dict[str, Any], timestamp: float):
+        with self._ring_lock:
+            self.ring.write(values, timestamp)
+
+    def _sync_channels(self):
+        with self._ring_lock:
+            self.ring.set_channels(self.sampler.sampled_paths())
+
+    def _describe(self, device) -> Tuple[int, Dict[str, Any]]:
+        handle = self._handles.get(id(device))
+        if handle is None:
+            handle = self._handles[id(device)] = len(self._devices) + 1
+            self._devices[handle] = device
+        return handle, _schema(device)
+
+    def _resolve(self, handle: int, path: str) -> Tuple[Any, str]:
+        """(parent object, attribute name) of a path below a device; parents are cached"""
+        parent_path, _, name = path.rpartition('.')
+        parent = self._parents.get((handle, parent_path))
+        if parent is None:
+            parent = self._devices[handle]
+            for part in parent_path.split('.') if parent_path else ():
+                parent = getattr(parent, part)
+            self._parents[(handle, parent_path)] = parent
+        return parent, name
+
+    def find(self, timeout: Optional[float], serial: Optional[str]):
+        device = self.manager._find_device(timeout, serial)
+        return self._describe(device) if device is not None else None
+
+    def find_all(self, timeout: Optional[float]):
+        return [self._describe(device) for device in self.manager._find_all_devices(timeout)]
+
+    def get(self, handle: int, path: str):
+        parent, name = self._resolve(handle, path)
+        return self.manager.execute_with_lock(getattr, parent, name)
+
+    def get_many(self, handle: int, paths: List[str]) -> List[Any]:
+        """Values of paths in one lock hold (None for paths that cannot be read)"""
+        def _read():
+            values = []
+            for path in paths:
+                try:
+                    parent, name = self._resolve(handle, path)
+                    values.append(getattr(parent, name))
+                except Exception as e:
+                    logger.warning(f"Error reading path {path}: {e}")
+                    values.append(None)
+            return values
+
+        return self.manager.execute_with_lock(_read)
+
+    def set(self, handle: int, path: str, value: Any):
+        parent, name = self._resolve(handle, path)
+        self.manager.execute_with_lock(setattr, parent, name, value)
+
+    def call(self, handle: int, path: str, args: tuple, kwargs: Dict[str, Any]):
+        parent, name = self._resolve(handle, path)
+        return self.manager.execute_with_lock(lambda: getattr(parent, name)(*args, **kwargs))
+
+    def sample(self, handle: Optional[int]):
+        """Point the sampler at the web process's connected device (None to stop sampling)"""
+        self.manager.current_device = self._devices.get(handle)
+
+    def register_paths(self, owner: str, paths: List[str], frequency_class: Optional[str]):
+        self.sampler.register_paths(owner, paths, frequency_class)
+        self._sync_channels()
+
+    def unregister_paths(self, owner: str):
+        self.sampler.unregister_paths(owner)
+        self._sync_channels()
+
+    def serve(self):
+        self.sampler.start()
+        self.conn.send(('ready', self.path_prefix))
+        while True:
+            try:
+                request_id, operation, args = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            if operation == 'shutdown':
+                self.conn.send((request_id, True, None))
+                break
+            try:
+                reply = (request_id, True, self._handlers[operation](*args))
+            except Exception as e:
+                reply = (request_id, False, (type(e).__name__, str(e)))
+            try:
+                self.conn.send(reply)
+            except Exception:
+                # Unpicklable result (e.g. a device object returned by a function)
+                self.conn.send((request_id, True, str(reply[2])))
+        self.sampler.stop()
+        self.ring.close()
+
+
+def run_device_process(conn, ring_name: str):
+    """Child process entry point"""
+    # Ctrl+C reaches the whole process group; the web process decides when the child stops
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - device - %(name)s - %(levelname)s - %(message)s')
+    _DeviceServer(conn, ring_name).serve()
+
+
+# Web process
+
+class DeviceProcessClient:
+    """Request/reply over the pipe to the device process, one request at a time"""
+
+    def __init__(self, conn, process):
+        self._conn = conn
+        self._process = process
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def request(self, operation: str, *args, timeout: float = REQUEST_TIMEOUT):
+        with self._lock:
+            if not self._process.is_alive():
+                raise DeviceProcessError('Device process is not running')
+            self._next_id += 1
+            request_id = self._next_id
+            deadline = time.monotonic() + timeout
+            try:
+                self._conn.send((request_id, operation, args))
+                while True:
+                    if not self._conn.poll(max(0.0, deadline - time.monotonic())):
+                        raise DeviceProcessError(f'Device process did not answer {operation} within {timeout:.0f}s')
+                    reply_id, ok, result = self._conn.recv()
+                    # Replies to requests that timed out earlier are dropped
+                    if reply_id == request_id:
+                        break
+            except (EOFError, OSError) as e:
+                raise DeviceProcessError(f'Device process connection lost: {e}')
+        if ok:
+            return result
+        error_type, message = result
+        raise _FORWARDED_ERRORS.get(error_type, DeviceProcessError)(message)
+
+
+class RemoteProperty:
+    """Schema entry of a device property (mirrors fibre's RemoteProperty for app.path_index)"""
+
+    def __init__(self, property_type: Optional[str], can_write: bool):
+        self._property_type = property_type
+        self._can_write = can_write
+
+
+class RemoteFunction:
+    def __init__(self, client: DeviceProcessClient, handle: int, path: str):
+        self._client = client
+        self._handle = handle
+        self._path = path
+
+    def __call__(self, *args, **kwargs):
+        return self._client.request('call', self._handle, self._path, args, kwargs)
+
+
+class RemoteObject:
+    """Stand-in for an object of a device owned by the device process"""
+
+    def __init__(self, client: DeviceProcessClient, handle: int, schema: Dict[str, Any], path: str = ''):
+        object.__setattr__(self, '_client', client)
+        object.__setattr__(self, '_handle', handle)
+        object.__setattr__(self, '_schema', schema)
+        object.__setattr__(self, '_path', path)
+        object.__setattr__(self, '_objects', {})
+
+    def _member_path(self, name: str) -> str:
+        return f'{self._path}.{name}' if self._path else name
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        schema = self._schema
+        if name in schema['objects']:
+            child = self._objects.get(name)
+            if child is None:
+                child = self._objects[name] = RemoteObject(self._client, self._handle, schema['objects'][name],
+                                                           self._member_path(name))
+            return child
+        if name in schema['properties']:
+            return self._client.request('get', self._handle, self._member_path(name))
+        if name in schema['functions']:
+            return RemoteFunction(self._client, self._handle, self._member_path(name))
+        raise AttributeError(f"'{self._path or 'device'}' has no attribute '{name}'")
+
+    def _read_paths(self, paths: List[str]) -> Dict[str, Any]:
+        """Values of paths below this object, with all property reads in one round trip.
+
+        Objects and functions come from the schema; paths that do not exist are None.
+        """
+        values: Dict[str, Any] = {}
+        remote = []
+        for path in paths:
+            *parent_parts, name = path.split('.')
+            parent = self
+            for part in parent_parts:
+                parent = parent._child(part)
+                if parent is None:
+                    break
+            if parent is None:
+                values[path] = None
+            elif name in parent._schema['properties']:
+                remote.append(path)
+            else:
+                values[path] = getattr(parent, name, None)
+        if remote:
+            fetched = self._client.request('get_many', self._handle, [self._member_path(path) for path in remote])
+            values.update(zip(remote, fetched))
+        return values
+
+    def _child(self, name: str) -> Optional['RemoteObject']:
+        return getattr(self, name) if name in self._schema['objects'] else None
+
+    def __setattr__(self, name, value):
+        if name not in self._schema['properties']:
+            raise AttributeError(f"'{self._path or 'device'}' has no writable attribute '{name}'")
+        self._client.request('set', self._handle, self._member_path(name), value)
+
+    def __dir__(self):
+        schema = self._schema
+        return list(schema['objects']) + list(schema['properties']) + list(schema['functions'])
+
+    @property
+    def _remote_attributes(self) -> Dict[str, Any]:
+        schema = self._schema
+        attributes: Dict[str, Any] = {name: getattr(self, name) for name in schema['objects']}
+        attributes.update((name, RemoteProperty(*entry)) for name, entry in schema['properties'].items())
+        attributes.update((name, RemoteFunction(self._client, self._handle, self._member_path(name)))
+                          for name in schema['functions'])
+        return attributes
+
+
+class DeviceProcessFinder:
+    """ODriveManager device_finder that discovers devices in the device process"""
+
+    def __init__(self, client: DeviceProcessClient, path_prefix: str):
+        self.client = client
+        self.path_prefix = path_prefix
+
+    def __call__(self, timeout: float = None, serial: Optional[str] = None) -> Optional[RemoteObject]:
+        found = self.client.request('find', timeout, serial, timeout=(timeout or 0) + REQUEST_TIMEOUT)
+        return RemoteObject(self.client, *found) if found else None
+
+    def find_all(self, timeout: float = None) -> List[RemoteObject]:
+        found = self.client.request('find_all', timeout, timeout=(timeout or 0) + REQUEST_TIMEOUT)
+        return [RemoteObject(self.client, handle, schema) for handle, schema in found]
+
+
+class RingTelemetrySampler:
+    """TelemetrySampler interface backed by the device process's sampler and sample ring.
+
+    Registrations are forwarded to the device process; samples are read from
+    the ring and handed to listeners here, in the order they were taken.
+    Periods are reported per frequency class, without on_change boosts.
+    """
+
+    def __init__(self, odrive_manager, client: DeviceProcessClient, ring: SharedSampleRing):
+        self.odrive_manager = odrive_manager
+        self.client = client
+        self.ring = ring
+        self._listeners = []
+        self._latest: Dict[str, Any] = {}
+        self._latest_time = 0.0
+        self._next_row = ring.head
+        self._device = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def register_paths(self, owner: str, paths, frequency_class: Optional[str] = None):
+        if frequency_class is not None and frequency_class not in FREQUENCY_CLASSES:
+            raise ValueError(f"Unknown frequency class: {frequency_class}")
+        self.client.request('register_paths', owner, list(paths), frequency_class)
+
+    def unregister_paths(self, owner: str):
+        self.client.request('unregister_paths', owner)
+
+    def add_listener(self, listener):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def get_latest(self) -> Tuple[Dict[str, Any], float]:
+        with self._lock:
+            return dict(self._latest), self._latest_time
+
+    def sampled_paths(self) -> Dict[str, str]:
+        return self.ring.frequency_classes()
+
+    def path_period(self, path: str) -> Optional[float]:
+        frequency_class = self.ring.frequency_class(path)
+        if frequency_class is None:
+            return None
+        period = FREQUENCY_CLASSES[frequency_class]
+        return float('inf') if period is None else period
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.client.request('stats')
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='RingTelemetrySampler', daemon=True)
+        self._thread.start()
+        logger.info("Telemetry sampler started (device process)")
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _check_device(self):
+        """Have the device process sample whichever device this process is connected to"""
+        device = self.odrive_manager.current_device
+        if device is self._device:
+            return
+        self.client.request('sample', device._handle if isinstance(device, RemoteObject) else None)
+        with self._lock:
+            self._device = device
+            self._latest = {}
+
+    def _dispatch(self, rows: List[Tuple[float, Dict[str, Any]]]):
+        with self._lock:
+            for timestamp, values in rows:
+                self._latest.update(values)
+                self._latest_time = timestamp
+            listeners = list(self._listeners)
+        for timestamp, values in rows:
+            if not values:
+                continue
+            self.odrive_manager.note_transaction(ok=any(value is not None for value in values.values()))
+            for listener in listeners:
+                try:
+                    listener(values, timestamp)
+                except Exception as e:
+                    logger.error(f"Sampler listener failed: {e}")
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self._check_device()
+            except DeviceProcessError as e:
+                logger.warning(f"Device process unavailable: {e}")
+                self._stop_event.wait(IDLE_WAIT)
+                continue
+            if self._device is None:
+                self._next_row = self.ring.head
+                self._stop_event.wait(IDLE_WAIT)
+                continue
+
+            self._next_row, rows = self.ring.read_since(self._next_row)
+            if rows:
+                self._dispatch(rows)
+            self._stop_event.wait(RING_POLL_INTERVAL)
+
+
+class DeviceProcess:
+    """Starts the device process and hands out its finder and sampler"""
+
+    def __init__(self, channels: int = DEFAULT_CHANNELS, capacity: int = DEFAULT_CAPACITY):
+        self.ring = self._create_ring(channels, capacity)
+        context = multiprocessing.get_context('spawn')
+        conn, child_conn = context.Pipe()
+        self.process = context.Process(target=run_device_process, args=(child_conn, self.ring.name),
+                                       name='ODriveDeviceProcess', daemon=True)
+        try:
+            self.process.start()
+            child_conn.close()
+            if not conn.poll(STARTUP_TIMEOUT):
+                raise DeviceProcessError('Device process did not start')
+            _, path_prefix = conn.recv()
+        except (DeviceProcessError, EOFError, OSError) as e:
+            if self.process.is_alive():
+                self.process.terminate()
+            close_tap_ring(self.ring)
+            raise DeviceProcessError(f'Device process failed to start: {e}')
+        self.client = DeviceProcessClient(conn, self.process)
+        self.finder = DeviceProcessFinder(self.client, path_prefix)
+        logger.info(f"Device process started (pid {self.process.pid}, sample ring {self.ring.name})")
+
+    @staticmethod
+    def _create_ring(channels: int, capacity: int) -> SharedSampleRing:
+        # Under the telemetry tap's name when the tap is enabled, so analysis scripts can attach to it too
+        if tap_enabled():
+            try:
+                return create_tap_ring(channels=channels, capacity=capacity)
+            except TelemetryTapError as e:
+                logger.error(f"Sample ring not published under the telemetry tap name: {e}")
+        return SharedSampleRing.create(channels=channels, capacity=capacity)
+
+    def create_sampler(self, odrive_manager) -> RingTelemetrySampler:
+        return RingTelemetrySampler(odrive_manager, self.client, self.ring)
+
+    def stop(self):
+        try:
+            self.client.request('shutdown', timeout=SHUTDOWN_TIMEOUT)
+        except DeviceProcessError as e:
+            logger.debug(f"Device process shutdown request failed: {e}")
+        self.process.join(SHUTDOWN_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+        close_tap_ring(self.ring)
+
+
+def start_device_process_from_env() -> Optional[DeviceProcess]:
+    """Start the device process if ODRIVE_DEVICE_PROCESS=1 (never from inside a child process)"""
+    if os.environ.get(DEVICE_PROCESS_ENV) != '1' or multiprocessing.parent_process() is not None:
+        return None
+    # A spawned child re-runs the parent's __main__ (python -m app.app) before parent_process() is set
+    if getattr(multiprocessing.current_process(), '_inheriting', False):
+        return None
+    return DeviceProcess()
@@ -0,0 +1,97 @@
+"""
+Device error watcher
+Runs on the telemetry sampler, detects error bits being set or cleared,
+decodes them once and publishes timestamped events on the event bus.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, List
+
+from .odrive_errors import get_error_register_paths, decode_error_bit, decode_error_register
+
+logger = logging.getLogger(__name__)
+
+ERROR_EVENT_TOPIC = 'device_error'
+
+
+class ErrorWatcher:
+    def __init__(self, sampler, event_bus, axes=(0, 1), history_size: int = 1000):
+        self.sampler = sampler
+        self.event_bus = event_bus
+        self._registers = {path: (error_type, axis)
+                           for path, error_type, axis in get_error_register_paths(axes)}
+        self._values: Dict[str, int] = {}
+        self._history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+        sampler.register_paths('error_watcher', self._registers.keys())
+        sampler.add_listener(self.on_sample)
+
+    def on_sample(self, values: Dict[str, Any], timestamp: float):
+        """Compare error registers against the previous sample and emit edges"""
+        events = []
+        with self._lock:
+            for path, (error_type, axis) in self._registers.items():
+                raw = values.get(path)
+                if raw is None:
+                    continue
+                try:
+                    value = int(raw)
+                except (TypeError, ValueError):
+                    continue
+
+                previous = self._values.get(path, 0)
+                if value == previous:
+                    continue
+                self._values[path] = value
+
+                for edge, bits in (('set', value & ~previous), ('cleared', previous & ~value)):
+                    bit = 1
+                    while bits and bit <= bits:
+                        if bits & bit:
+                            event = decode_error_bit(error_type, bit)
+                            event.update({
+                                'edge': edge,
+                                'path': path,
+                                'error_type': error_type,
+                                'axis': axis,
+                                'register_value': value,
+                                # Host time of the sample that showed the edge (the bus timestamp is publish time)
+                                'sample_timestamp': timestamp * 1000,
+                            })
+                            events.append(event)
+                        bit <<= 1
+            self._history.extend(events)
+
+        for event in events:
+            if event['edge'] == 'set':
+                logger.warning(f"Error set on {event['path']}: {event['name']}")
+            self.event_bus.publish(ERROR_EVENT_TOPIC, event)
+
+    def reset(self):
+        """Forget register state; called on every connect and disconnect (see ODriveManager.add_connection_listener)"""
+        with self._lock:
+            self._values.clear()
+
+    def get_active_errors(self) -> Dict[str, Any]:
+        """Return currently set error bits decoded per register"""
+        with self._lock:
+            values = dict(self._values)
+        active = {}
+        for path, value in values.items():
+            if value:
+                error_type, axis = self._registers[path]
+                active[path] = {
+                    'axis': axis,
+                    'error_type': error_type,
+                    'value': value,
+                    'errors': decode_error_register(error_type, value),
+                }
+        return active
+
+    def get_history(self, limit: int = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            events = list(self._history)
+        return events[-limit:] if limit else events
@@ -0,0 +1,101 @@
+"""
+Event bus for backend-generated device events
+Publishers never block: every subscriber gets a bounded queue and the oldest
+events are dropped when a consumer falls behind.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from queue import Queue, Empty, Full
+from typing import Dict, Any, List, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class EventSubscription:
+    """A single consumer of the event bus"""
+
+    def __init__(self, topics: Optional[Iterable[str]], queue_size: int):
+        self.topics = set(topics) if topics else None
+        self.queue = Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def wants(self, topic: str) -> bool:
+        return self.topics is None or topic in self.topics
+
+    def offer(self, event: Dict[str, Any]):
+        """Queue an event, discarding the oldest one if the queue is full"""
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except Empty:
+                    pass
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Wait for the next event, returning None on timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except Empty:
+            return None
+
+
+class EventBus:
+    """Publish/subscribe hub with a bounded in-memory history"""
+
+    def __init__(self, history_size: int = 500, subscriber_queue_size: int = 1000):
+        self.subscriber_queue_size = subscriber_queue_size
+        self._history = deque(maxlen=history_size)
+        self._subscribers: List[EventSubscription] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def publish(self, topic: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Publish an event to every interested subscriber"""
+        event = {
+            'id': next(self._ids),
+            'topic': topic,
+            'timestamp': time.time() * 1000,
+            'data': data,
+        }
+        with self._lock:
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            if subscription.wants(topic):
+                subscription.offer(event)
+        return event
+
+    def subscribe(self, topics: Optional[Iterable[str]] = None) -> EventSubscription:
+        """Register a new subscriber for the given topics (all topics if None)"""
+        subscription = EventSubscription(topics, self.subscriber_queue_size)
+        with self._lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: EventSubscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def history(self, topic: Optional[str] = None, since_id: int = 0,
+                limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return buffered events, optionally filtered by topic and starting id"""
+        with self._lock:
+            events = [e for e in self._history
+                      if e['id'] > since_id and (topic is None or e['topic'] == topic)]
+        if limit is not None:
+            events = events[-limit:]
+        return events
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
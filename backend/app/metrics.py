@@ -0,0 +1,216 @@
+"""
+Backend metrics
+In-process counters, gauges and fixed-bucket histograms for HTTP endpoints
+and device I/O, rendered in Prometheus text format or as a JSON summary at
+/api/metrics.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds - covers sub-millisecond USB reads up to multi-second scans
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Distinct USB path labels kept before new paths are folded into OTHER_PATH_LABEL
+MAX_USB_PATH_LABELS = 500
+OTHER_PATH_LABEL = 'other'
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside the bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                upper = min(self.buckets[index], self.max) if index < len(self.buckets) else self.max
+                lower = min(self.buckets[index - 1], upper) if index > 0 else 0.0
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.max
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._types: Dict[str, str] = {}
+        self._help: Dict[str, str] = {}
+        self._values: Dict[str, Dict[LabelKey, Any]] = {}
+        self._collectors: List[Callable[['MetricsRegistry'], None]] = []
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def describe(self, name: str, metric_type: str, help_text: str):
+        with self._lock:
+            self._types[name] = metric_type
+            self._help[name] = help_text
+            self._values.setdefault(name, {})
+
+    def register_collector(self, collector: Callable[['MetricsRegistry'], None]):
+        """Add a callback that refreshes gauges right before metrics are read"""
+        self._collectors.append(collector)
+
+    @staticmethod
+    def _key(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def _collect(self):
+        for collector in self._collectors:
+            try:
+                collector(self)
+            except Exception as e:
+                name = getattr(collector, '__qualname__', repr(collector))
+                logger.warning(f"Metrics collector {name} failed: {e}")
+
+    @staticmethod
+    def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = key + extra
+        if not pairs:
+            return ''
+        escaped = []
+        for k, v in pairs:
+            v = v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            escaped.append(f'{k}="{v}"')
+        return '{' + ','.join(escaped) + '}'
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        self._collect()
+        lines = []
+        with self._lock:
+            for name in sorted(self._values):
+                series = self._values[name]
+                metric_type = self._types.get(name, 'untyped')
+                if name in self._help:
+                    lines.append(f'# HELP {name} {self._help[name]}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                for key, value in sorted(series.items()):
+                    if isinstance(value, Histogram):
+                        cumulative = 0
+                        for bound, count in zip(value.buckets, value.counts):
+                            cumulative += count
+                            lines.append(f'{name}_bucket{self._format_labels(key, (("le", repr(bound)),))} {cumulative}')
+                        lines.append(f'{name}_bucket{self._format_labels(key, (("le", "+Inf"),))} {value.count}')
+                        lines.append(f'{name}_sum{self._format_labels(key)} {value.sum}')
+                        lines.append(f'{name}_count{self._format_labels(key)} {value.count}')
+                    else:
+                        lines.append(f'{name}{self._format_labels(key)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-friendly summary with p50/p90/p99 for histograms (in milliseconds)"""
+        self._collect()
+        result = {'uptime_s': round(time.time() - self.started_at, 1), 'metrics': {}}
+        with self._lock:
+            for name, series in self._values.items():
+                entries = []
+                for key, value in series.items():
+                    entry = {'labels': dict(key)}
+                    if isinstance(value, Histogram):
+                        entry.update({
+                            'count': value.count,
+                            'mean_ms': round(value.sum / value.count * 1000, 3) if value.count else 0.0,
+                            'p50_ms': round(value.quantile(0.5) * 1000, 3),
+                            'p90_ms': round(value.quantile(0.9) * 1000, 3),
+                            'p99_ms': round(value.quantile(0.99) * 1000, 3),
+                            'max_ms': round(value.max * 1000, 3),
+                        })
+                    else:
+                        entry['value'] = value
+                    entries.append(entry)
+                result['metrics'][name] = {'type': self._types.get(name, 'untyped'), 'series': entries}
+        return result
+
+
+metrics = MetricsRegistry()
+
+# HTTP layer
+metrics.describe('odrive_http_requests_total', 'counter', 'HTTP requests by endpoint and status')
+metrics.describe('odrive_http_request_errors_total', 'counter', 'HTTP responses with status >= 400 or unhandled exceptions')
+metrics.describe('odrive_http_request_duration_seconds', 'histogram', 'HTTP request latency by endpoint')
+
+# Device layer
+metrics.describe('odrive_usb_read_duration_seconds', 'histogram', 'USB property read round trip by path')
+metrics.describe('odrive_usb_write_duration_seconds', 'histogram', 'USB property write/call round trip by path')
+metrics.describe('odrive_usb_failures_total', 'counter', 'Failed USB transactions by operation and path')
+metrics.describe('odrive_lock_wait_seconds', 'histogram', 'Time spent waiting for the device request lock')
+metrics.describe('odrive_reconnects_total', 'counter', 'Device reconnection attempts by outcome')
+metrics.describe('odrive_property_writes_total', 'counter', 'set_property calls by outcome (written, or superseded by a newer value)')
+metrics.describe('odrive_connects_total', 'counter', 'Device connection attempts by outcome')
+metrics.describe('odrive_usb_error_count', 'gauge', 'Consecutive USB errors seen during scanning (ODriveManager.usb_error_count)')
+metrics.describe('odrive_connected', 'gauge', '1 if a device is connected')
+
+
+_usb_path_labels = set()
+_usb_path_labels_lock = threading.Lock()
+
+
+def usb_path_label(path: str) -> str:
+    """Attribute path of a property or call (arguments dropped), capped at MAX_USB_PATH_LABELS distinct labels"""
+    path = path.split('(', 1)[0].strip()
+    with _usb_path_labels_lock:
+        if path not in _usb_path_labels:
+            if len(_usb_path_labels) >= MAX_USB_PATH_LABELS:
+                return OTHER_PATH_LABEL
+            _usb_path_labels.add(path)
+    return path
+
+
+def record_usb(operation: str, path: str, seconds: float, ok: bool = True):
+    """Record one USB transaction ('read' or 'write')"""
+    path = usb_path_label(path)
+    metrics.observe(f'odrive_usb_{operation}_duration_seconds', seconds, path=path)
+    if not ok:
+        metrics.inc('odrive_usb_failures_total', operation=operation, path=path)
@@ -0,0 +1,150 @@
+"""
+ODrive v0.5.6 error code tables
+Mirrors frontend/src/utils/odriveErrors.js so error registers can be decoded
+once on the backend instead of on every render.
+"""
+
+from typing import Dict, Any, List, Tuple
+
+# Each table maps bit -> (name, description)
+SYSTEM_ERRORS = {
+    0x00000001: ('CONTROL_ITERATION_MISSED', 'Control loop iteration missed'),
+    0x00000002: ('DC_BUS_UNDER_VOLTAGE', 'DC bus voltage below undervoltage trip level'),
+    0x00000004: ('DC_BUS_OVER_VOLTAGE', 'DC bus voltage above overvoltage trip level'),
+    0x00000008: ('DC_BUS_OVER_REGEN_CURRENT', 'DC bus regen current exceeded limit'),
+    0x00000010: ('DC_BUS_OVER_CURRENT', 'DC bus current exceeded limit'),
+    0x00000020: ('BRAKE_DEADTIME_VIOLATION', 'Brake resistor deadtime violation'),
+    0x00000040: ('BRAKE_DUTY_CYCLE_NAN', 'Brake resistor duty cycle is NaN'),
+    0x00000080: ('INVALID_BRAKE_RESISTANCE', 'Invalid brake resistance configured'),
+}
+
+AXIS_ERRORS = {
+    0x00000001: ('INVALID_STATE', 'Invalid state transition requested'),
+    0x00000040: ('MOTOR_FAILED', 'Motor subsystem failure detected'),
+    0x00000080: ('SENSORLESS_ESTIMATOR_FAILED', 'Sensorless position estimator failed'),
+    0x00000100: ('ENCODER_FAILED', 'Encoder subsystem failure detected'),
+    0x00000200: ('CONTROLLER_FAILED', 'Control loop subsystem failure'),
+    0x00000800: ('WATCHDOG_TIMER_EXPIRED', 'Safety watchdog timer expired'),
+    0x00001000: ('MIN_ENDSTOP_PRESSED', 'Minimum endstop limit switch activated'),
+    0x00002000: ('MAX_ENDSTOP_PRESSED', 'Maximum endstop limit switch activated'),
+    0x00004000: ('ESTOP_REQUESTED', 'Emergency stop has been triggered'),
+    0x00020000: ('HOMING_WITHOUT_ENDSTOP', 'Homing attempted without endstop configured'),
+    0x00040000: ('OVER_TEMP', 'Temperature protection activated'),
+    0x00080000: ('UNKNOWN_POSITION', 'Position estimate is not reliable'),
+}
+
+MOTOR_ERRORS = {
+    0x00000001: ('PHASE_RESISTANCE_OUT_OF_RANGE', 'Measured phase resistance outside expected range'),
+    0x00000002: ('PHASE_INDUCTANCE_OUT_OF_RANGE', 'Measured phase inductance outside expected range'),
+    0x00000008: ('DRV_FAULT', 'Gate driver fault detected'),
+    0x00000010: ('CONTROL_DEADLINE_MISSED', 'Motor control loop timing violation'),
+    0x00000080: ('MODULATION_MAGNITUDE', 'PWM modulation magnitude error'),
+    0x00000400: ('CURRENT_SENSE_SATURATION', 'Current sense amplifier saturated'),
+    0x00001000: ('CURRENT_LIMIT_VIOLATION', 'Motor current exceeded safety limit'),
+    0x00010000: ('MODULATION_IS_NAN', 'PWM modulation calculation error (NaN)'),
+    0x00020000: ('MOTOR_THERMISTOR_OVER_TEMP', 'Motor temperature exceeded limit'),
+    0x00040000: ('FET_THERMISTOR_OVER_TEMP', 'FET temperature exceeded limit'),
+    0x00080000: ('TIMER_UPDATE_MISSED', 'Motor timer update missed'),
+    0x00100000: ('CURRENT_MEASUREMENT_UNAVAILABLE', 'Current measurement not available'),
+    0x00200000: ('CONTROLLER_FAILED', 'Motor controller subsystem failed'),
+    0x00400000: ('I_BUS_OUT_OF_RANGE', 'DC bus current out of range'),
+    0x00800000: ('BRAKE_RESISTOR_DISARMED', 'Brake resistor is disabled but required'),
+    0x01000000: ('SYSTEM_LEVEL', 'System level motor error'),
+    0x02000000: ('BAD_TIMING', 'Motor timing error'),
+    0x04000000: ('UNKNOWN_PHASE_ESTIMATE', 'Motor phase estimate unknown'),
+    0x08000000: ('UNKNOWN_PHASE_VEL', 'Motor phase velocity unknown'),
+    0x10000000: ('UNKNOWN_TORQUE', 'Motor torque estimate unknown'),
+    0x20000000: ('UNKNOWN_CURRENT_COMMAND', 'Motor current command unknown'),
+    0x40000000: ('UNKNOWN_CURRENT_MEASUREMENT', 'Motor current measurement unknown'),
+    0x80000000: ('UNKNOWN_VBUS_VOLTAGE', 'DC bus voltage unknown'),
+    0x100000000: ('UNKNOWN_VOLTAGE_COMMAND', 'Motor voltage command unknown'),
+    0x200000000: ('UNKNOWN_GAINS', 'Motor control gains unknown'),
+    0x400000000: ('CONTROLLER_INITIALIZING', 'Motor controller initializing'),
+    0x800000000: ('UNBALANCED_PHASES', 'Motor phases are unbalanced'),
+}
+
+ENCODER_ERRORS = {
+    0x00000001: ('UNSTABLE_GAIN', 'Encoder gain calibration unstable'),
+    0x00000002: ('CPR_POLEPAIRS_MISMATCH', "Encoder CPR doesn't match motor pole pairs"),
+    0x00000004: ('NO_RESPONSE', 'No response from encoder'),
+    0x00000008: ('UNSUPPORTED_ENCODER_MODE', 'Selected encoder mode not supported'),
+    0x00000010: ('ILLEGAL_HALL_STATE', 'Invalid Hall sensor state detected'),
+    0x00000020: ('INDEX_NOT_FOUND_YET', 'Encoder index pulse not found during search'),
+    0x00000040: ('ABS_SPI_TIMEOUT', 'SPI communication timeout with absolute encoder'),
+    0x00000080: ('ABS_SPI_COM_FAIL', 'SPI communication failure with absolute encoder'),
+    0x00000100: ('ABS_SPI_NOT_READY', 'Absolute encoder not ready for communication'),
+    0x00000200: ('HALL_NOT_CALIBRATED_YET', 'Hall sensors not calibrated'),
+}
+
+CONTROLLER_ERRORS = {
+    0x00000001: ('OVERSPEED', 'Velocity exceeded maximum allowed speed'),
+    0x00000002: ('INVALID_INPUT_MODE', 'Selected input mode is invalid'),
+    0x00000004: ('UNSTABLE_GAIN', 'Control gains are causing instability'),
+    0x00000008: ('INVALID_MIRROR_AXIS', 'Mirror axis configuration is invalid'),
+    0x00000010: ('INVALID_LOAD_ENCODER', 'Load encoder configuration is invalid'),
+    0x00000020: ('INVALID_ESTIMATE', 'Position/velocity estimate is invalid'),
+    0x00000040: ('INVALID_CIRCULAR_RANGE', 'Circular setpoint range is invalid'),
+    0x00000080: ('SPINOUT_DETECTED', 'Motor spinout condition detected'),
+}
+
+SENSORLESS_ERRORS = {
+    0x00000001: ('UNSTABLE_GAIN', 'Sensorless estimator gain is unstable'),
+    0x00000002: ('UNKNOWN_CURRENT_MEASUREMENT', 'Current measurement unknown in sensorless mode'),
+}
+
+ERROR_TABLES = {
+    'system': SYSTEM_ERRORS,
+    'axis': AXIS_ERRORS,
+    'motor': MOTOR_ERRORS,
+    'encoder': ENCODER_ERRORS,
+    'controller': CONTROLLER_ERRORS,
+    'sensorless_estimator': SENSORLESS_ERRORS,
+}
+
+# Same critical set as isErrorCritical() in the frontend
+CRITICAL_ERRORS = {
+    'axis': {0x00000040, 0x00000100, 0x00000200, 0x00040000, 0x00004000},
+    'motor': {0x00000008, 0x00001000, 0x00020000, 0x00040000, 0x00000400},
+    'encoder': {0x00000002, 0x00000004},
+}
+
+# Error register path suffix -> error table name
+AXIS_ERROR_REGISTERS = [
+    ('error', 'axis'),
+    ('motor.error', 'motor'),
+    ('encoder.error', 'encoder'),
+    ('controller.error', 'controller'),
+    ('sensorless_estimator.error', 'sensorless_estimator'),
+]
+
+
+def get_error_register_paths(axes=(0, 1)) -> List[Tuple[str, str, Any]]:
+    """Return (path, error_type, axis) for every error register on the device"""
+    registers = [('error', 'system', None)]
+    for axis_num in axes:
+        for suffix, error_type in AXIS_ERROR_REGISTERS:
+            registers.append((f'axis{axis_num}.{suffix}', error_type, axis_num))
+    return registers
+
+
+def decode_error_bit(error_type: str, bit: int) -> Dict[str, Any]:
+    """Decode a single error bit into name, description and severity"""
+    name, description = ERROR_TABLES.get(error_type, {}).get(
+        bit, ('UNKNOWN', f'Unknown error (0x{bit:08X})'))
+    return {
+        'code': bit,
+        'name': name,
+        'description': description,
+        'critical': bit in CRITICAL_ERRORS.get(error_type, ()),
+    }
+
+
+def decode_error_register(error_type: str, value: int) -> List[Dict[str, Any]]:
+    """Decode every set bit of an error register"""
+    errors = []
+    bit = 1
+    while value and bit <= value:
+        if value & bit:
+            errors.append(decode_error_bit(error_type, bit))
+        bit <<= 1
+    return errors
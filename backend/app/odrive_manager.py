@@ -1,23 +1,53 @@
 import time
 import logging
-import odrive
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Callable, List, Optional
 import threading
 from queue import Queue
-import usb.core
-import usb.util
+
+from .startup import timeline, save_startup_profile
+from .metrics import metrics, record_usb
+from .utils.single_flight import SingleFlight
+from .utils.write_coalescer import WriteCoalescer
+
+# odrive (libfibre) and usb are imported lazily - they are slow to load and
+# app.startup preloads them in the background after the server is up
 
 logger = logging.getLogger(__name__)
 
 class ODriveManager:
-    def __init__(self):
+    def __init__(self, device_finder=None):
         self.odrives = {}
+        # Callable(timeout) -> device or None; defaults to odrive.find_any (see app.simulator)
+        self.device_finder = device_finder
         self.current_device = None
         self.current_device_serial = None
         self.expecting_reconnection = False
         self.request_lock = threading.Lock()
         self.usb_error_count = 0  # Track consecutive USB errors
         self.last_usb_reset = 0   # Track when we last reset USB
+        # Monotonic times of the last successful / failed device transaction (see ConnectionMonitor)
+        self.last_transaction = 0.0
+        self.last_failure = 0.0
+        self.connection_monitor = None
+        # Concurrent reads of the same paths share one device traversal
+        self.read_flight = SingleFlight()
+        # Bursts of writes to one path (slider drags) only apply the newest value
+        self.write_coalescer = WriteCoalescer()
+        # Bumped after every write, command, connect and axis state transition (see state_version)
+        self.state_generation = 0
+        self._axis_states: Dict[str, Any] = {}
+        # Called with the new device (None on disconnect) whenever the connection changes
+        self._connection_listeners: List[Callable[[Any], None]] = []
+        metrics.register_collector(self._collect_metrics)
+
+    def _collect_metrics(self, registry):
+        registry.set_gauge('odrive_usb_error_count', self.usb_error_count)
+        registry.set_gauge('odrive_connected', 1 if self.current_device is not None else 0)
+
+    @staticmethod
+    def _metric_path(path: str) -> str:
+        """Strip the device prefix so metrics are labelled like telemetry paths"""
+        return path[len('device.'):] if path.startswith('device.') else path
 
     @property
     def odrv(self):
@@ -28,6 +58,61 @@ class ODriveManager:
         """Check if there's a connected device"""
         return self.current_device is not None
 
+    def is_alive(self) -> bool:
+        """Check liveness through the connection monitor, falling back to a probe"""
+        if self.connection_monitor is not None:
+            return self.connection_monitor.is_alive()
+        return self.check_connection()
+
+    def note_transaction(self, ok: bool = True):
+        """Record the outcome of a device transaction for liveness tracking"""
+        if ok:
+            self.last_transaction = time.monotonic()
+        else:
+            self.last_failure = time.monotonic()
+
+    def bump_state_generation(self):
+        """Mark device state as changed, invalidating versioned config responses"""
+        self.state_generation += 1
+
+    def state_version(self) -> Optional[str]:
+        """Version of the device's configuration as far as the backend can tell, or None if disconnected.
+
+        Config values only change through writes and commands sent from here, or
+        by the firmware during a state transition (calibration results), so the
+        version changes whenever any of those happen.
+        """
+        device = self.current_device
+        if device is None:
+            return None
+        return f'{self.current_device_serial}-{id(device):x}-{self.state_generation}'
+
+    def add_connection_listener(self, listener: Callable[[Any], None]):
+        self._connection_listeners.append(listener)
+
+    def _notify_connection_change(self):
+        device = self.current_device
+        for listener in list(self._connection_listeners):
+            try:
+                listener(device)
+            except Exception as e:
+                logger.warning(f"Connection listener failed: {e}")
+
+    def watch_axis_states(self, sampler, axes=(0, 1)):
+        """Bump the state generation when the sampler sees an axis change state"""
+        paths = [f'axis{axis}.current_state' for axis in axes]
+        sampler.register_paths('state_generation', paths, 'on_change')
+        sampler.add_listener(self._on_axis_state_sample)
+
+    def _on_axis_state_sample(self, values: Dict[str, Any], timestamp: float):
+        for path, value in values.items():
+            if not path.endswith('.current_state') or value is None:
+                continue
+            previous = self._axis_states.get(path)
+            self._axis_states[path] = value
+            if previous is not None and previous != value:
+                self.bump_state_generation()
+
     def check_connection(self) -> bool:
         """Check if the current connection is still valid"""
         if not self.current_device:
@@ -36,9 +121,11 @@ class ODriveManager:
         try:
             # Try to access a basic property to test connection
             _ = self.current_device.vbus_voltage
+            self.note_transaction()
             return True
         except Exception as e:
             logger.debug(f"Connection check failed: {e}")
+            self.note_transaction(ok=False)
             # Clear stale device reference if disconnected
             self.current_device = None
             self.current_device_serial = None
@@ -54,12 +141,12 @@ class ODriveManager:
             self.current_device_serial = None
             
             # Find the specific device
-            odrv = odrive.find_any(timeout=10)
+            expected_serial = device_info.get('serial', '')
+            odrv = self._find_device(timeout=10, serial=expected_serial)
             
             if odrv:
                 # Verify it's the right device if we have a serial
-                expected_serial = device_info.get('serial', '')
-                if expected_serial and expected_serial != 'unknown_0':
+                if expected_serial and not expected_serial.startswith('unknown_'):
                     try:
                         actual_serial = hex(odrv.serial_number)
                         if actual_serial != expected_serial:
@@ -70,16 +157,36 @@ class ODriveManager:
                 
                 self.current_device = odrv
                 self.current_device_serial = device_info.get('serial', 'unknown')
+                self.note_transaction()
+                self.bump_state_generation()
+                self._notify_connection_change()
                 logger.info(f"Connected to ODrive: {self.current_device_serial}")
+                metrics.inc('odrive_connects_total', outcome='success')
                 return True
             else:
                 logger.error("No ODrive found during connection attempt")
+                metrics.inc('odrive_connects_total', outcome='not_found')
                 return False
                 
         except Exception as e:
             logger.error(f"Failed to connect to device: {e}")
+            metrics.inc('odrive_connects_total', outcome='error')
             return False
     
+    def _find_device(self, timeout: float, serial: Optional[str] = None):
+        """Discover a device through the configured finder or libfibre"""
+        if self.device_finder is not None:
+            return self.device_finder(timeout, serial)
+        import odrive
+        return odrive.find_any(timeout=timeout)
+
+    def _find_all_devices(self, timeout: float) -> List[Any]:
+        """Discover every reachable device (libfibre: the first one found)"""
+        if self.device_finder is not None and hasattr(self.device_finder, 'find_all'):
+            return self.device_finder.find_all(timeout)
+        odrv = self._find_device(timeout)
+        return [odrv] if odrv else []
+
     def disconnect_device(self) -> bool:
         """Disconnect from current device"""
         self.expecting_reconnection = False  # Clear on manual disconnect
@@ -87,6 +194,7 @@ class ODriveManager:
             if self.current_device:
                 self.current_device = None
                 self.current_device_serial = None
+                self._notify_connection_change()
                 logger.info("Disconnected from ODrive")
             return True
         except Exception as e:
@@ -107,6 +215,7 @@ class ODriveManager:
             
             # Find and reset ODrive devices
             # ODrive vendor ID is 0x1209, product IDs are 0x0d32, 0x0d33, etc.
+            import usb.core
             devices = usb.core.find(find_all=True, idVendor=0x1209)
             reset_count = 0
             
@@ -161,34 +270,37 @@ class ODriveManager:
                     self.current_device_serial = None
                 
                 # Find all connected ODrives
-                odrv = odrive.find_any(timeout=5)
-                if odrv:
-                    try:
-                        device_info = {
-                            'path': 'USB:0',
-                            'serial': hex(odrv.serial_number) if hasattr(odrv, 'serial_number') else 'unknown_0',
-                            'fw_version': f"v{odrv.fw_version_major}.{odrv.fw_version_minor}.{odrv.fw_version_revision}" if hasattr(odrv, 'fw_version_major') else 'v0.5.6',
-                            'hw_version': f"v{odrv.hw_version_major}.{odrv.hw_version_minor}" if hasattr(odrv, 'hw_version_major') else 'v3.6-56V',
-                            'index': 0
-                        }
-                        devices.append(device_info)
-                        logger.info(f"Found ODrive: {device_info}")
-                        
-                        # Reset error count on successful scan
-                        self.usb_error_count = 0
-                        return devices
-                        
-                    except Exception as e:
-                        logger.error(f"Error getting device info: {e}")
-                        # Add a basic entry even if we can't get details
-                        devices.append({
-                            'path': 'USB:0',
-                            'serial': 'unknown_0',
-                            'fw_version': 'v0.5.6',
-                            'hw_version': 'v3.6-56V',
-                            'index': 0
-                        })
-                        return devices
+                odrvs = self._find_all_devices(timeout=5)
+                if odrvs:
+                    path_prefix = getattr(self.device_finder, 'path_prefix', 'USB')
+                    for index, odrv in enumerate(odrvs):
+                        try:
+                            device_info = {
+                                'path': f'{path_prefix}:{index}',
+                                'serial': hex(odrv.serial_number) if hasattr(odrv, 'serial_number') else f'unknown_{index}',
+                                'fw_version': f"v{odrv.fw_version_major}.{odrv.fw_version_minor}.{odrv.fw_version_revision}" if hasattr(odrv, 'fw_version_major') else 'v0.5.6',
+                                'hw_version': f"v{odrv.hw_version_major}.{odrv.hw_version_minor}" if hasattr(odrv, 'hw_version_major') else 'v3.6-56V',
+                                'index': index
+                            }
+                            devices.append(device_info)
+                            logger.info(f"Found ODrive: {device_info}")
+                            if timeline.mark_once('first device discovered'):
+                                save_startup_profile()
+                            
+                            # Reset error count on successful scan
+                            self.usb_error_count = 0
+                            
+                        except Exception as e:
+                            logger.error(f"Error getting device info: {e}")
+                            # Add a basic entry even if we can't get details
+                            devices.append({
+                                'path': f'{path_prefix}:{index}',
+                                'serial': f'unknown_{index}',
+                                'fw_version': 'v0.5.6',
+                                'hw_version': 'v3.6-56V',
+                                'index': index
+                            })
+                    return devices
                 else:
                     logger.info("No ODrive devices found")
                     if attempt < max_retries:
@@ -233,6 +345,7 @@ class ODriveManager:
             
         try:
             self.expecting_reconnection = True  # Expect device to disconnect/reconnect
+            self.bump_state_generation()
             result = self.current_device.save_configuration()
             return {"success": True, "message": "Configuration saved"}
         except Exception as e:
@@ -265,6 +378,7 @@ class ODriveManager:
                             if self.connect_to_device(device):
                                 self.expecting_reconnection = False
                                 logger.info("Successfully reconnected after save operation")
+                                metrics.inc('odrive_reconnects_total', outcome='success')
                                 return True
                     
                     if attempt < 2:  # Don't sleep after last attempt
@@ -277,10 +391,12 @@ class ODriveManager:
                         time.sleep(2)
         
             logger.warning("Could not reconnect to device after save operation")
+            metrics.inc('odrive_reconnects_total', outcome='failed')
             return False
             
         except Exception as e:
             logger.error(f"Reconnection attempt failed: {e}")
+            metrics.inc('odrive_reconnects_total', outcome='error')
             return False
 
     def _normalize_command(self, command: str) -> str:
@@ -342,17 +458,31 @@ class ODriveManager:
                     # Sanitize and convert the value
                     value = self._sanitize_value(value_str)
                     
+                    started = time.perf_counter()
                     try:
                         # Execute the assignment
-                        exec(f"{path} = {repr(value)}", {}, local_context)
+                        # Pass the value through the context - repr() of inf/nan is not valid Python
+                        local_context['_value'] = value
+                        exec(f"{path} = _value", {}, local_context)
+                        record_usb('write', self._metric_path(path), time.perf_counter() - started)
+                        self.note_transaction()
                         return {'result': f'Set {path} = {value}'}
                     except Exception as e:
+                        record_usb('write', self._metric_path(path), time.perf_counter() - started, ok=False)
+                        self.note_transaction(ok=False)
                         logger.error(f"Error in assignment execution: {e}")
                         return {'error': str(e)}
+                    finally:
+                        self.bump_state_generation()
             else:
                 # Handle function calls and property reads
+                metric_path = self._metric_path(normalized_command)
+                operation = 'write' if normalized_command.endswith(')') else 'read'
+                started = time.perf_counter()
                 try:
                     result = eval(normalized_command, {}, local_context)
+                    record_usb(operation, metric_path, time.perf_counter() - started)
+                    self.note_transaction()
                     
                     # Convert result to a JSON-serializable format
                     if result is None:
@@ -366,41 +496,76 @@ class ODriveManager:
                     # If eval fails, try exec for commands that don't return values
                     try:
                         exec(normalized_command, {}, local_context)
+                        record_usb(operation, metric_path, time.perf_counter() - started)
+                        self.note_transaction()
                         return {'result': 'Command executed successfully'}
                     except Exception as e2:
+                        record_usb(operation, metric_path, time.perf_counter() - started, ok=False)
+                        self.note_transaction(ok=False)
                         logger.error(f"Error in command execution: {e2}")
                         return {'error': str(e2)}
+                finally:
+                    if operation == 'write':
+                        self.bump_state_generation()
         
         except Exception as e:
             logger.error(f"Error executing command '{command}': {e}")
             return {'error': str(e)}
 
     def set_property(self, path: str, value: Any) -> Dict[str, Any]:
-        """Set a property on the ODrive"""
-        if not self.current_device:
+        """Set a property on the ODrive.
+
+        Writes to a path that arrive while an earlier write to it is still
+        running are coalesced: only the newest value is written, and the
+        result reports the value that was applied ('applied_value') and
+        whether this caller's value was replaced by a newer one ('superseded').
+        """
+        device = self.current_device
+        if not device:
             return {'error': 'No device connected'}
         
-        # Check connection first
-        if not self.check_connection():
+        # Normalize the path
+        normalized_path = self._normalize_command(path)
+        result, applied_value, superseded = self.write_coalescer.submit(
+            (id(device), normalized_path), value,
+            lambda latest: self._write_property(device, path, normalized_path, latest))
+        metrics.inc('odrive_property_writes_total', outcome='superseded' if superseded else 'written')
+
+        result = dict(result)
+        if 'error' not in result:
+            result['applied_value'] = applied_value
+        if superseded:
+            result['superseded'] = True
+        return result
+
+    def _write_property(self, device, path: str, normalized_path: str, value: Any) -> Dict[str, Any]:
+        # Check connection first (recent traffic counts, so this rarely touches USB)
+        if not self.is_alive():
             return {'error': 'Device disconnected'}
         
         try:
-            # Normalize the path
-            normalized_path = self._normalize_command(path)
-            
             # Create a local context with the current device
             local_context = {
-                'device': self.current_device,
-                'odrv0': self.current_device,
-                'odrv1': self.current_device,
-                'dev0': self.current_device,
-                'dev1': self.current_device,
-                'my_drive': self.current_device,
-                'odrive': self.current_device,
+                'device': device,
+                'odrv0': device,
+                'odrv1': device,
+                'dev0': device,
+                'dev1': device,
+                'my_drive': device,
+                'odrive': device,
             }
             
             # Set the property
-            exec(f"{normalized_path} = {repr(value)}", {}, local_context)
+            started = time.perf_counter()
+            ok = False
+            try:
+                local_context['_value'] = value
+                exec(f"{normalized_path} = _value", {}, local_context)
+                ok = True
+            finally:
+                record_usb('write', self._metric_path(normalized_path), time.perf_counter() - started, ok=ok)
+                self.note_transaction(ok)
+                self.bump_state_generation()
             
             return {'result': f'Set {normalized_path} = {value}'}
         except Exception as e:
@@ -409,12 +574,17 @@ class ODriveManager:
 
     def execute_with_lock(self, func, *args, **kwargs):
         """Execute a function with exclusive ODrive access"""
+        wait_started = time.perf_counter()
         with self.request_lock:
+            metrics.observe('odrive_lock_wait_seconds', time.perf_counter() - wait_started)
             try:
-                return func(*args, **kwargs)
+                result = func(*args, **kwargs)
             except Exception as e:
                 logger.error(f"ODrive operation failed: {e}")
+                self.note_transaction(ok=False)
                 raise
+            self.note_transaction()
+            return result
     
     def safe_get_property(self, path):
         """Thread-safe property access"""
@@ -424,11 +594,15 @@ class ODriveManager:
                 
             parts = path.split('.')
             current = self.current_device
-            for part in parts:
-                current = getattr(current, part, None)
-                if current is None:
-                    return None
-            return current
+            started = time.perf_counter()
+            try:
+                for part in parts:
+                    current = getattr(current, part, None)
+                    if current is None:
+                        return None
+                return current
+            finally:
+                record_usb('read', path, time.perf_counter() - started, ok=current is not None)
         
         return self.execute_with_lock(_get_property)
     
@@ -440,12 +614,73 @@ class ODriveManager:
             
             parts = path.split('.')
             obj = self.current_device
-            for part in parts[:-1]:
-                obj = getattr(obj, part)
-            setattr(obj, parts[-1], value)
+            started = time.perf_counter()
+            ok = False
+            try:
+                for part in parts[:-1]:
+                    obj = getattr(obj, part)
+                setattr(obj, parts[-1], value)
+                ok = True
+            finally:
+                record_usb('write', path, time.perf_counter() - started, ok=ok)
+                self.bump_state_generation()
         
         return self.execute_with_lock(_set_property)
 
+    def read_properties(self, paths: List[str]) -> Dict[str, Any]:
+        """Read raw property values (None if missing), sharing in-flight reads with concurrent callers.
+
+        Paths are relative to the device root. Identical or overlapping
+        requests (several tabs, or every component refetching after a
+        reconnect) wait for the traversal already running instead of
+        repeating it.
+        """
+        device = self.current_device
+        if device is None:
+            return {path: None for path in paths}
+
+        # Device process stand-ins read a whole batch in one round trip
+        read_paths = getattr(device, '_read_paths', None)
+
+        def _traverse(path):
+            current = device
+            try:
+                for part in path.split('.'):
+                    if hasattr(current, part):
+                        current = getattr(current, part)
+                    else:
+                        return None
+            except Exception as e:
+                logger.warning(f"Error reading path {path}: {e}")
+                return None
+            return current
+
+        def _read(keys):
+            values = {}
+            if read_paths is not None:
+                started = time.perf_counter()
+                try:
+                    batch = read_paths([key[1] for key in keys])
+                except Exception as e:
+                    logger.warning(f"Error reading {len(keys)} paths: {e}")
+                    batch = {}
+                elapsed = (time.perf_counter() - started) / max(1, len(keys))
+                for key in keys:
+                    values[key] = batch.get(key[1])
+                    record_usb('read', key[1], elapsed, ok=values[key] is not None)
+            else:
+                for key in keys:
+                    started = time.perf_counter()
+                    values[key] = _traverse(key[1])
+                    record_usb('read', key[1], time.perf_counter() - started, ok=values[key] is not None)
+            if any(value is not None for value in values.values()):
+                self.note_transaction()
+            return values
+
+        # Keys carry the device identity so reads never straddle a reconnect
+        results = self.read_flight.do_many([(id(device), path) for path in paths], _read)
+        return {path: results[(id(device), path)] for path in paths}
+
     def _sanitize_value(self, value_str: str):
         """Sanitize and convert a string value to appropriate type"""
         try:
@@ -456,6 +691,10 @@ class ODriveManager:
             # Handle None/null
             if value_str.lower() in ['none', 'null']:
                 return None
+
+            # Handle inf/Infinity/nan as sent back from JSON responses
+            if value_str.lower().lstrip('+-') in ['inf', 'infinity', 'nan']:
+                return float(value_str)
             
             # Try to convert to number
             if '.' in value_str:
@@ -3,12 +3,51 @@ ODrive Telemetry Configuration for v0.5.6 firmware
 This module handles the mapping and collection of ODrive properties
 """
 
-import odrive
 import logging
 import time
 
 logger = logging.getLogger(__name__)
 
+# Sampling frequency classes: name -> target period in seconds (None = once per connection)
+FREQUENCY_CLASSES = {
+    'high': 0.01,       # motion signals charted in real time
+    'medium': 0.1,      # bus voltage, temperatures, state
+    'on_change': 0.1,   # error registers - polled slowly, boosted after a change
+    'once': None,       # versions and configuration
+}
+
+# Period used for a while after an on_change path changes (error bits tend to cascade)
+ON_CHANGE_BOOST_PERIOD = 0.01
+ON_CHANGE_BOOST_DURATION = 1.0
+
+DEFAULT_FREQUENCY_CLASS = 'medium'
+
+# Last path component -> class
+_HIGH_FREQUENCY_NAMES = {
+    'Iq_measured', 'Id_measured', 'Iq_setpoint', 'Id_setpoint',
+    'pos_estimate', 'vel_estimate', 'pos_estimate_counts', 'vel_estimate_counts',
+    'pos_circular', 'pos_setpoint', 'vel_setpoint', 'torque_setpoint',
+    'input_pos', 'input_vel', 'input_torque', 'ibus', 'shadow_count', 'count_in_cpr',
+}
+_ONCE_NAMES = {
+    'hw_version_major', 'hw_version_minor', 'hw_version_variant',
+    'fw_version_major', 'fw_version_minor', 'fw_version_revision', 'fw_version_unreleased',
+    'serial_number', 'user_config_loaded',
+}
+
+
+def get_frequency_class(path: str) -> str:
+    """Return the sampling frequency class for a property path"""
+    parts = path.split('.')
+    name = parts[-1]
+    if name in _HIGH_FREQUENCY_NAMES:
+        return 'high'
+    if name == 'error':
+        return 'on_change'
+    if name in _ONCE_NAMES or 'config' in parts[:-1]:
+        return 'once'
+    return DEFAULT_FREQUENCY_CLASS
+
 def safe_get_property(odrv, property_path):
     """Safely get a property from the ODrive, returning None if it doesn't exist or fails"""
     try:
@@ -0,0 +1,276 @@
+"""
+Device path index
+Completion and search over every property, object and function path of a
+connected device. Paths are collected from the device schema once (no values
+are read), then served from a segment trie for prefix completion and a
+trigram index for substring search. Indexes are kept per serial number, and
+devices with an identical schema share one index.
+"""
+
+import inspect
+import logging
+import threading
+from bisect import bisect_left
+from typing import Dict, Any, List, Optional, Tuple
+
+from .script_runner import DEVICE_NAMES
+
+logger = logging.getLogger(__name__)
+
+MAX_DEPTH = 12
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+class PathEntry:
+    __slots__ = ('path', 'name', 'kind', 'type', 'writable', 'lower', 'name_lower')
+
+    def __init__(self, path: str, kind: str, type_name: Optional[str] = None, writable: bool = False):
+        self.path = path
+        self.name = path.rsplit('.', 1)[-1]
+        self.kind = kind
+        self.type = type_name
+        self.writable = writable
+        self.lower = path.lower()
+        self.name_lower = self.name.lower()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'path': self.path, 'name': self.name, 'kind': self.kind, 'type': self.type, 'writable': self.writable}
+
+
+def _type_name(value) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, type):
+        return value.__name__
+    return getattr(value, '__name__', None) or type(value).__name__
+
+
+def object_members(obj) -> List[Tuple[str, str, Optional[str], bool, Any]]:
+    """(name, kind, type, writable, child object) for each public member of a remote object.
+
+    Only the schema is inspected: property values are never read, so walking
+    a real device costs no USB transfers.
+    """
+    members = []
+    attributes = getattr(obj, '_remote_attributes', None)
+    if isinstance(attributes, dict):
+        # fibre 0.5 RemoteObject / RemoteProperty / RemoteFunction (and app.device_process stand-ins)
+        for name, attribute in attributes.items():
+            if isinstance(getattr(attribute, '_remote_attributes', None), dict):
+                members.append((name, 'object', None, False, attribute))
+            elif callable(attribute):
+                members.append((name, 'function', None, False, None))
+            else:
+                members.append((name, 'property', _type_name(getattr(attribute, '_property_type', None)),
+                                bool(getattr(attribute, '_can_write', True)), None))
+        return members
+
+    state = vars(obj) if hasattr(obj, '__dict__') else {}
+    if isinstance(state.get('_children'), dict) and isinstance(state.get('_values'), dict):
+        # Simulated device: values are held locally, so reading them here costs nothing
+        members.extend((name, 'object', None, False, child) for name, child in state['_children'].items())
+        members.extend((name, 'property', type(value).__name__, True, None) for name, value in state['_values'].items())
+        members.extend((name, 'function', None, False, None) for name in state.get('_functions', {}))
+        return members
+
+    # libfibre: properties and functions are class attributes, sub-objects are resolved lazily
+    for name in dir(type(obj)):
+        if name.startswith('_'):
+            continue
+        attribute = inspect.getattr_static(obj, name, None)
+        if isinstance(attribute, property):
+            members.append((name, 'property', None, attribute.fset is not None, None))
+        elif inspect.isfunction(attribute) or inspect.ismethoddescriptor(attribute) and callable(attribute):
+            members.append((name, 'function', None, False, None))
+        elif hasattr(attribute, '__get__'):
+            members.append((name, 'object', None, False, getattr(obj, name)))
+    return members
+
+
+def collect_paths(device) -> List[PathEntry]:
+    """Every path below device, parents before children"""
+    entries = []
+    visited = set()
+
+    def walk(obj, prefix: str, depth: int):
+        if depth > MAX_DEPTH or id(obj) in visited:
+            return
+        visited.add(id(obj))
+        for name, kind, type_name, writable, child in sorted(object_members(obj), key=lambda member: member[0]):
+            if name.startswith('_'):
+                continue
+            path = f'{prefix}.{name}' if prefix else name
+            entries.append(PathEntry(path, kind, type_name, writable))
+            if child is not None:
+                walk(child, path, depth + 1)
+
+    walk(device, '', 0)
+    return entries
+
+
+def _trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ('children', 'names', 'entry')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.names: List[str] = []
+        self.entry: Optional[PathEntry] = None
+
+
+class PathIndex:
+    """Segment trie plus trigram postings over one device schema"""
+
+    def __init__(self, entries: List[PathEntry]):
+        self.entries = entries
+        self._root = _TrieNode()
+        self._trigrams: Dict[str, List[int]] = {}
+
+        for index, entry in enumerate(entries):
+            node = self._root
+            for segment in entry.path.split('.'):
+                child = node.children.get(segment)
+                if child is None:
+                    child = node.children[segment] = _TrieNode()
+                node = child
+            node.entry = entry
+            for trigram in _trigrams(entry.lower):
+                self._trigrams.setdefault(trigram, []).append(index)
+
+        nodes = [self._root]
+        while nodes:
+            node = nodes.pop()
+            node.names = sorted(node.children)
+            nodes.extend(node.children.values())
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def complete(self, prefix: str, limit: int = DEFAULT_LIMIT) -> List[PathEntry]:
+        """Members of the object named before the last '.' whose name starts with the text after it"""
+        parent, _, partial = prefix.rpartition('.')
+        node = self._root
+        if parent:
+            for segment in parent.split('.'):
+                node = node.children.get(segment)
+                if node is None:
+                    return []
+
+        names = node.names
+        matches = []
+        for position in range(bisect_left(names, partial), len(names)):
+            name = names[position]
+            if not name.startswith(partial) or len(matches) >= limit:
+                break
+            matches.append(node.children[name].entry)
+        return matches
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[PathEntry]:
+        """Paths containing query (case-insensitive), best matches first"""
+        query = query.lower()
+        if len(query) < 3:
+            candidates = range(len(self.entries))
+        else:
+            postings = []
+            for trigram in _trigrams(query):
+                posting = self._trigrams.get(trigram)
+                if posting is None:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    return []
+
+        entries = self.entries
+        hits = [entries[index] for index in candidates if query in entries[index].lower]
+        # Name matches before path matches, then exact and prefix name matches, then shallower paths
+        hits.sort(key=lambda entry: (
+            query not in entry.name_lower,
+            entry.name_lower != query,
+            not entry.name_lower.startswith(query),
+            entry.path.count('.'),
+            entry.path,
+        ))
+        return hits[:limit]
+
+
+def _split_device_name(text: str) -> Tuple[str, str]:
+    """('odrv0.', 'axis0.con') for 'odrv0.axis0.con' so console input completes as typed"""
+    head, dot, rest = text.partition('.')
+    if dot and head in DEVICE_NAMES:
+        return head + dot, rest
+    return '', text
+
+
+class PathIndexRegistry:
+    """Path indexes per device serial, built on first use and shared between identical schemas"""
+
+    def __init__(self, odrive_manager):
+        self.odrive_manager = odrive_manager
+        self._by_serial: Dict[str, Tuple[int, PathIndex]] = {}
+        self._by_schema: Dict[int, PathIndex] = {}
+        self._lock = threading.Lock()
+
+    def index_for(self, serial: Optional[str] = None) -> Tuple[Optional[str], Optional[PathIndex]]:
+        """(serial, index) for the given serial, or the connected device if none is given"""
+        manager = self.odrive_manager
+        device = manager.current_device
+        current_serial = manager.current_device_serial if device is not None else None
+        if serial is None:
+            serial = current_serial
+        if serial is None:
+            return None, None
+
+        with self._lock:
+            cached = self._by_serial.get(serial)
+            if serial != current_serial:
+                return serial, cached[1] if cached else None
+            if cached and cached[0] == id(device):
+                return serial, cached[1]
+
+            entries = collect_paths(device)
+            schema = hash(tuple((entry.path, entry.kind, entry.type, entry.writable) for entry in entries))
+            index = self._by_schema.get(schema)
+            if index is None:
+                index = self._by_schema[schema] = PathIndex(entries)
+                logger.info(f"Indexed {len(entries)} paths for device {serial}")
+            self._by_serial[serial] = (id(device), index)
+            return serial, index
+
+    def complete(self, prefix: str, serial: Optional[str] = None, limit: int = DEFAULT_LIMIT) -> Dict[str, Any]:
+        """Completions for console input; a leading device name (odrv0.) is kept in each completion's text"""
+        serial, index = self.index_for(serial)
+        if index is None:
+            return {'error': 'No device indexed'}
+        device_name, path_prefix = _split_device_name(prefix)
+        matches = index.complete(path_prefix, min(limit, MAX_LIMIT))
+        return {
+            'serial': serial,
+            'prefix': prefix,
+            'completions': [dict(entry.to_dict(), text=device_name + entry.path) for entry in matches],
+        }
+
+    def search(self, query: str, serial: Optional[str] = None, limit: int = DEFAULT_LIMIT) -> Dict[str, Any]:
+        """Search one device, or with serial='all' every device indexed so far (limit applies per device)"""
+        limit = min(limit, MAX_LIMIT)
+        if serial == 'all':
+            self.index_for()
+            with self._lock:
+                indexes = [(known, index) for known, (_, index) in self._by_serial.items()]
+        else:
+            serial, index = self.index_for(serial)
+            if index is None:
+                return {'error': 'No device indexed'}
+            indexes = [(serial, index)]
+
+        results = []
+        for known, index in indexes:
+            results.extend(dict(entry.to_dict(), serial=known) for entry in index.search(query, limit))
+        return {'query': query, 'results': results}
@@ -0,0 +1,207 @@
+"""
+Request rate limiting
+Token buckets per client (address, then cookie, then X-Client-Id) and endpoint
+class, capped per address, plus one device-wide bucket that
+every device-touching request draws from. Part of the device bucket is held
+back for safety commands (idle, clear_errors, stopping motion), so a client
+polling flat out can neither starve other stations nor lock out a stop.
+"""
+
+import math
+import re
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from .metrics import metrics
+
+# Endpoint class -> (sustained requests per second, burst) per client
+ENDPOINT_CLASS_LIMITS = {
+    'telemetry': (250.0, 100),
+    'command': (100.0, 50),
+    'config': (30.0, 60),
+    'scan': (1.0, 3),
+}
+
+# Shared device budget (requests per second, burst) and the share only safety commands may use
+DEVICE_LIMIT = (500.0, 200)
+SAFETY_RESERVE = 0.2
+
+SAFETY_CLASS = 'safety'
+
+# Per-client buckets are keyed by address, then by the cookie the backend hands
+# out, then by this header (every local tab and station shares 127.0.0.1).
+# Cookie and header are chosen by the client, so all clients of one address
+# together get at most ADDRESS_SHARE clients' worth of each endpoint class.
+CLIENT_ID_HEADER = 'X-Client-Id'
+CLIENT_ID_COOKIE = 'odrive_client_id'
+MAX_CLIENT_ID_LENGTH = 64
+ADDRESS_SHARE = 8
+
+_ENDPOINT_CLASSES = {
+    'telemetry.get_telemetry': 'telemetry',
+    'device.execute_command': 'command',
+    'device.set_property': 'command',
+    'motion.submit_setpoints': 'command',
+    'motion.start_setpoint_stream': 'command',
+    'motion.start_trajectory': 'command',
+    'calibration.calibrate': 'command',
+    'calibration.auto_continue_calibration': 'command',
+    'calibration.encoder_direction_find': 'command',
+    'script.run_script': 'command',
+    'device.get_single_property': 'config',
+    'config.get_config_batch': 'config',
+    'config.apply_config': 'config',
+    'config.erase_config': 'config',
+    'config.save_config': 'config',
+    'calibration.calibration_status': 'config',
+    'calibration.calibration_prerequisites': 'config',
+    'device.scan_devices': 'scan',
+    'device.connect_device': 'scan',
+    'motion.stop_setpoint_stream': SAFETY_CLASS,
+    'motion.stop_trajectory': SAFETY_CLASS,
+    'script.cancel_script': SAFETY_CLASS,
+    'device.disconnect_device': SAFETY_CLASS,
+}
+
+# Commands that bring the device to a safe state (AXIS_STATE_IDLE, clearing errors)
+_SAFETY_COMMAND = re.compile(r'requested_state\s*=\s*1\s*$|clear_errors\s*\(')
+
+# Buckets idle this long are full again and can be dropped
+BUCKET_IDLE_EXPIRY = 60.0
+MAX_BUCKETS = 1024
+
+metrics.describe('odrive_rate_limited_total', 'counter', 'Requests rejected with 429 by endpoint class and limit')
+
+
+class TokenBucket:
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, now: float, cost: float = 1.0, floor: float = 0.0) -> float:
+        """Seconds until cost tokens are available above floor (0 if they are now)"""
+        self._refill(now)
+        missing = cost + floor - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, cost: float = 1.0):
+        self.tokens -= cost
+
+
+def classify_request(endpoint: Optional[str], payload: Any) -> Optional[str]:
+    """Endpoint class of a request, SAFETY_CLASS for stop/idle commands, None if not limited"""
+    endpoint_class = _ENDPOINT_CLASSES.get(endpoint)
+    if endpoint_class != 'command' or not isinstance(payload, dict):
+        return endpoint_class
+    command = payload.get('command')
+    if isinstance(command, str) and _SAFETY_COMMAND.search(command.strip()):
+        return SAFETY_CLASS
+    path = payload.get('path')
+    if isinstance(path, str) and path.endswith('requested_state') and payload.get('value') == 1:
+        return SAFETY_CLASS
+    return endpoint_class
+
+
+def client_key(remote_addr: Optional[str], cookie_id: Optional[str] = None, client_id: Optional[str] = None) -> str:
+    """Per-client bucket key: the address, sub-keyed by the cookie and then the X-Client-Id header"""
+    parts = [remote_addr or 'unknown']
+    for sub_key in (cookie_id, client_id):
+        parts.append(sub_key if sub_key and len(sub_key) <= MAX_CLIENT_ID_LENGTH else '-')
+    return '/'.join(parts)
+
+
+class RateLimiter:
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 device_limit: Tuple[float, float] = DEVICE_LIMIT, safety_reserve: float = SAFETY_RESERVE,
+                 enabled: bool = True):
+        self.limits = dict(ENDPOINT_CLASS_LIMITS if limits is None else limits)
+        self.safety_reserve = safety_reserve
+        self.enabled = enabled
+        self._device_bucket = TokenBucket(device_limit[0], device_limit[1], time.monotonic())
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, key: Tuple[str, str], rate: float, burst: float, now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                self._prune(now)
+            bucket = self._buckets[key] = TokenBucket(rate, burst, now)
+        return bucket
+
+    def check(self, client: str, endpoint_class: Optional[str],
+              address: Optional[str] = None) -> Tuple[float, Optional[str]]:
+        """Admit one request; returns (retry_after_seconds, exhausted limit) with 0 meaning admitted.
+
+        With an address, the request also draws from that address's bucket
+        (ADDRESS_SHARE times the per-client limit), so clients cannot escape
+        their limits by changing ids. Safety commands are never rejected.
+        They skip the client buckets and may use the device reserve that
+        other requests leave untouched.
+        """
+        if not self.enabled or endpoint_class is None:
+            return 0.0, None
+
+        now = time.monotonic()
+        device = self._device_bucket
+        with self._lock:
+            if endpoint_class == SAFETY_CLASS:
+                if not device.wait_time(now):
+                    device.take()
+                return 0.0, None
+
+            limit = self.limits.get(endpoint_class)
+            if limit is None:
+                return 0.0, None
+            bucket = self._bucket((client, endpoint_class), limit[0], limit[1], now)
+            wait = bucket.wait_time(now)
+            if wait:
+                return wait, 'client'
+            shared = None
+            if address is not None:
+                shared = self._bucket((f'address:{address}', endpoint_class),
+                                      limit[0] * ADDRESS_SHARE, limit[1] * ADDRESS_SHARE, now)
+                wait = shared.wait_time(now)
+                if wait:
+                    return wait, 'address'
+            wait = device.wait_time(now, floor=device.burst * self.safety_reserve)
+            if wait:
+                return wait, 'device'
+            bucket.take()
+            if shared is not None:
+                shared.take()
+            device.take()
+            return 0.0, None
+
+    def _prune(self, now: float):
+        expired = [key for key, bucket in self._buckets.items() if now - bucket.updated > BUCKET_IDLE_EXPIRY]
+        for key in expired:
+            del self._buckets[key]
+        if len(self._buckets) >= MAX_BUCKETS:
+            # Still full: forget the longest-idle half
+            for key, _ in sorted(self._buckets.items(), key=lambda item: item[1].updated)[:MAX_BUCKETS // 2]:
+                del self._buckets[key]
+
+    def reject(self, endpoint_class: str, scope: str, retry_after: float) -> Dict[str, Any]:
+        """Record a rejection and return the 429 body"""
+        metrics.inc('odrive_rate_limited_total', endpoint_class=endpoint_class, limit=scope)
+        return {
+            'error': 'Device busy' if scope == 'device' else 'Rate limit exceeded',
+            'endpoint_class': endpoint_class,
+            'retry_after_ms': round(retry_after * 1000, 1),
+        }
+
+    @staticmethod
+    def retry_after_header(retry_after: float) -> str:
+        # Retry-After only takes whole seconds; clients wanting finer pacing read retry_after_ms
+        return str(max(1, math.ceil(retry_after)))
@@ -1,8 +1,7 @@
 import time
 import logging
-import math
-import json
 from flask import Blueprint, request, jsonify
+from ..utils.conditional import config_etag, etag_matches, not_modified, with_etag
 
 logger = logging.getLogger(__name__)
 config_bp = Blueprint('config', __name__, url_prefix='/api/odrive')
@@ -15,31 +14,6 @@ def init_routes(manager):
     global odrive_manager
     odrive_manager = manager
 
-def safe_json_serialize(value):
-    """Safely serialize a value to JSON, handling NaN, infinity, and None values"""
-    if value is None:
-        return None
-    elif isinstance(value, float):
-        if math.isnan(value):
-            return 0.0  # Default NaN to 0
-        elif math.isinf(value):
-            return 1000.0 if value > 0 else -1000.0  # Default infinity to reasonable values
-        else:
-            return value
-    elif isinstance(value, (int, bool, str)):
-        return value
-    elif hasattr(value, 'value'):  # Enum handling
-        return safe_json_serialize(value.value)
-    elif hasattr(value, '__float__'):
-        return safe_json_serialize(float(value))
-    elif hasattr(value, '__int__'):
-        return safe_json_serialize(int(value))
-    elif hasattr(value, '__bool__'):
-        return safe_json_serialize(bool(value))
-    else:
-        # For any other complex objects, convert to string
-        return str(value)
-
 @config_bp.route('/config/batch', methods=['POST'])
 def get_config_batch():
     """Get multiple configuration values in a single request"""
@@ -56,59 +30,24 @@ def get_config_batch():
         if not odrive_manager.current_device:
             return jsonify({'error': 'No ODrive device connected'}), 400
         
+        # Remove 'device.' prefix if present
+        clean_paths = {path: path.replace('device.', '') if path.startswith('device.') else path
+                       for path in config_paths}
+
+        # Unchanged since the client's copy - answer without reading the device
+        etag = config_etag(odrive_manager, clean_paths.values())
+        if etag_matches(etag):
+            return not_modified(etag)
+
+        values = odrive_manager.read_properties(list(clean_paths.values()))
+
+        # Missing paths and methods are reported as None; the JSON provider handles NaN/Inf
         results = {}
+        for path, clean_path in clean_paths.items():
+            value = values.get(clean_path)
+            results[path] = None if value is None or callable(value) else value
         
-        for path in config_paths:
-            try:
-                # Remove 'device.' prefix if present
-                clean_path = path.replace('device.', '') if path.startswith('device.') else path
-                
-                # Build the actual attribute path for the ODrive object
-                try:
-                    # Split the path and traverse the object
-                    parts = clean_path.split('.')
-                    current_obj = odrive_manager.current_device
-                    
-                    for part in parts:
-                        if hasattr(current_obj, part):
-                            current_obj = getattr(current_obj, part)
-                        else:
-                            current_obj = None
-                            break
-                    
-                    if current_obj is not None:
-                        # Handle different types of values
-                        if hasattr(current_obj, '__call__'):
-                            # It's a method, don't call it
-                            results[path] = None  # Set to None instead of error object
-                        else:
-                            # Safely serialize the value
-                            safe_value = safe_json_serialize(current_obj)
-                            results[path] = safe_value
-                    else:
-                        # Set to None for missing paths instead of error object
-                        results[path] = None
-                        
-                except Exception as e:
-                    logger.warning(f"Error reading path {path}: {e}")
-                    results[path] = None  # Set to None instead of error object
-                    
-            except Exception as e:
-                logger.warning(f"Error processing path {path}: {e}")
-                results[path] = None  # Set to None instead of error object
-        
-        # Double-check that the result can be serialized to JSON
-        try:
-            json.dumps(results)
-        except (TypeError, ValueError) as e:
-            logger.error(f"JSON serialization failed: {e}")
-            # If serialization still fails, create a clean result with safe defaults
-            clean_results = {}
-            for path in config_paths:
-                clean_results[path] = None
-            results = clean_results
-        
-        return jsonify({'results': results})
+        return with_etag(jsonify({'results': results}), etag)
         
     except Exception as e:
         logger.error(f"Error in get_config_batch: {e}")
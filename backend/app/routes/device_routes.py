@@ -1,24 +1,20 @@
 import logging
 from flask import Blueprint, request, jsonify
-
-try:
-    from ..utils.utils import sanitize_for_json
-except Exception as e:
-    print(f"Import failed: {e}")
-    # Use a fallback
-    def sanitize_for_json(data):
-        return data
+from ..utils.conditional import config_etag, etag_matches, not_modified, with_etag
+from ..path_index import DEFAULT_LIMIT, MAX_LIMIT
 
 logger = logging.getLogger(__name__)
 device_bp = Blueprint('device', __name__, url_prefix='/api/odrive')
 
-# Global ODrive manager (will be set by init_routes)
+# Global ODrive manager and path index (will be set by init_routes)
 odrive_manager = None
+path_index = None
 
-def init_routes(manager):
-    """Initialize routes with ODrive manager"""
-    global odrive_manager
+def init_routes(manager, index_registry=None):
+    """Initialize routes with ODrive manager and device path index"""
+    global odrive_manager, path_index
     odrive_manager = manager
+    path_index = index_registry
 
 # Global variable to track scanning state
 _scanning_lock = False
@@ -171,27 +167,22 @@ def get_single_property():
             if not paths:
                 return jsonify({"error": "No paths specified"}), 400
             
-            results = {}
-            for path in paths:
-                try:
-                    value = get_property_value_direct(odrive_manager.current_device, path)
-                    if value is not None:
-                        results[path] = sanitize_for_json(value)
-                    else:
-                        results[path] = None
-                except Exception as e:
-                    logger.debug(f"Error getting property {path}: {e}")
-                    results[path] = None
-            
-            return jsonify({'results': results})
+            # Config-only requests are versioned; a matching If-None-Match skips the device entirely
+            etag = config_etag(odrive_manager, [resolve_property_path(path) for path in paths])
+            if etag_matches(etag):
+                return not_modified(etag)
+
+            # NaN/Inf and remote objects are handled by the JSON provider
+            results = read_property_values(paths)
+            return with_etag(jsonify({'results': results}), etag)
             
         elif 'path' in data:
             # Single property request (existing functionality)
             path = data.get('path')
-            value = get_property_value_direct(odrive_manager.current_device, path)
+            value = read_property_values([path]).get(path)
             
             if value is not None:
-                return jsonify({'value': sanitize_for_json(value)})
+                return jsonify({'value': value})
             else:
                 return jsonify({'error': f'Failed to get property: {path}'}), 400
         else:
@@ -201,34 +192,60 @@ def get_single_property():
         logger.error(f"Error in get_single_property: {e}")
         return jsonify({'error': str(e)}), 500
 
-def get_property_value_direct(odrv, path):
-    """Direct property access for single property requests"""
+def _parse_limit():
+    """?limit= clamped to 1..MAX_LIMIT, None if it is not an integer"""
     try:
-        if not odrv:
-            return None
-        
-        # Handle special system properties that map to config.*
-        if path.startswith('system.'):
-            prop = path.replace('system.', '')
-            if prop in ['dc_bus_overvoltage_trip_level', 'dc_bus_undervoltage_trip_level', 
-                       'dc_max_positive_current', 'dc_max_negative_current', 
-                       'enable_brake_resistor', 'brake_resistance']:
-                actual_path = f'config.{prop}'
-            else:
-                actual_path = prop
-        else:
-            actual_path = path
-        
-        # Navigate to the property
-        current = odrv
-        for part in actual_path.split('.'):
-            if hasattr(current, part):
-                current = getattr(current, part)
-            else:
-                logger.debug(f"Property part '{part}' not found in path '{actual_path}'")
-                return None
-        
-        return current
+        limit = int(request.args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        return None
+    return min(max(limit, 1), MAX_LIMIT)
+
+@device_bp.route('/complete', methods=['GET'])
+def complete_path():
+    """Complete a property path: ?prefix=odrv0.axis0.con[&serial=][&limit=]"""
+    try:
+        limit = _parse_limit()
+        if limit is None:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        result = path_index.complete(request.args.get('prefix', ''), request.args.get('serial'), limit)
+        if 'error' in result:
+            return jsonify(result), 404
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f"Error in complete_path: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@device_bp.route('/search', methods=['GET'])
+def search_paths():
+    """Find property paths containing ?q=[&serial=<serial>|all][&limit=]"""
+    try:
+        query = request.args.get('q', '')
+        if not query:
+            return jsonify({'error': 'No query provided'}), 400
+        limit = _parse_limit()
+        if limit is None:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        result = path_index.search(query, request.args.get('serial'), limit)
+        if 'error' in result:
+            return jsonify(result), 404
+        return jsonify(result)
     except Exception as e:
-        logger.debug(f"Error getting property {path}: {e}")
-        return None
\ No newline at end of file
+        logger.error(f"Error in search_paths: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def resolve_property_path(path):
+    """Map a UI property path to its device path (system.* properties live at the root or in config.*)"""
+    if path.startswith('system.'):
+        prop = path.replace('system.', '')
+        if prop in ['dc_bus_overvoltage_trip_level', 'dc_bus_undervoltage_trip_level', 
+                   'dc_max_positive_current', 'dc_max_negative_current', 
+                   'enable_brake_resistor', 'brake_resistance']:
+            return f'config.{prop}'
+        return prop
+    return path
+
+def read_property_values(paths):
+    """Read UI property paths through the manager's coalesced reader"""
+    actual_paths = {path: resolve_property_path(path) for path in paths}
+    values = odrive_manager.read_properties(list(actual_paths.values()))
+    return {path: values.get(actual_path) for path, actual_path in actual_paths.items()}
\ No newline at end of file
@@ -0,0 +1,82 @@
+import logging
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from ..utils.json_encoding import dumps
+
+logger = logging.getLogger(__name__)
+event_bp = Blueprint('events', __name__, url_prefix='/api/events')
+
+# Global services (will be set by init_routes)
+event_bus = None
+error_watcher = None
+
+# Seconds between keep-alive comments on idle event streams
+STREAM_KEEPALIVE = 15.0
+
+def init_routes(bus, watcher):
+    """Initialize routes with the event bus and error watcher"""
+    global event_bus, error_watcher
+    event_bus = bus
+    error_watcher = watcher
+
+@event_bp.route('/errors', methods=['GET'])
+def get_errors():
+    """Get currently active device errors and recent error edges"""
+    try:
+        limit = int(request.args.get('limit', 100))
+        return jsonify({
+            'active': error_watcher.get_active_errors(),
+            'history': error_watcher.get_history(limit)
+        })
+    except Exception as e:
+        logger.error(f"Error in get_errors: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@event_bp.route('/history', methods=['GET'])
+def get_history():
+    """Get buffered events, optionally filtered by topic and last seen id"""
+    try:
+        topic = request.args.get('topic')
+        since_id = int(request.args.get('since', 0))
+        limit = request.args.get('limit')
+        events = event_bus.history(topic, since_id, int(limit) if limit else None)
+        return jsonify({'events': events})
+    except ValueError:
+        return jsonify({'error': 'since and limit must be integers'}), 400
+    except Exception as e:
+        logger.error(f"Error in get_history: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@event_bp.route('/stream', methods=['GET'])
+def stream_events():
+    """Server-Sent Events stream of backend events"""
+    topics = request.args.get('topics')
+    topics = [t for t in topics.split(',') if t] if topics else None
+    try:
+        since_id = int(request.args.get('since', request.headers.get('Last-Event-ID', 0)))
+    except ValueError:
+        return jsonify({'error': 'since and Last-Event-ID must be integer event ids'}), 400
+
+    subscription = event_bus.subscribe(topics)
+
+    def generate():
+        last_id = since_id
+        try:
+            # Replay anything the client missed before subscribing
+            for event in event_bus.history(since_id=since_id):
+                if subscription.wants(event['topic']):
+                    last_id = event['id']
+                    yield f"id: {event['id']}\nevent: {event['topic']}\ndata: {dumps(event)}\n\n"
+
+            while True:
+                event = subscription.get(timeout=STREAM_KEEPALIVE)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event['id'] <= last_id:
+                    continue  # Already sent during replay
+                yield f"id: {event['id']}\nevent: {event['topic']}\ndata: {dumps(event)}\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -0,0 +1,125 @@
+import logging
+from flask import Blueprint, request, jsonify
+from ..setpoint_stream import DEFAULT_STREAM_PORT, STREAM_HOST_ENV
+
+logger = logging.getLogger(__name__)
+motion_bp = Blueprint('motion', __name__, url_prefix='/api/odrive')
+
+# Global services (will be set by init_routes)
+odrive_manager = None
+setpoint_service = None
+trajectory_player = None
+
+def init_routes(manager, setpoints, player):
+    """Initialize routes with ODrive manager and motion services"""
+    global odrive_manager, setpoint_service, trajectory_player
+    odrive_manager = manager
+    setpoint_service = setpoints
+    trajectory_player = player
+
+@motion_bp.route('/setpoints', methods=['POST'])
+def submit_setpoints():
+    """Queue a batch of setpoints through the latest-wins writer"""
+    try:
+        if not odrive_manager.is_connected():
+            return jsonify({'error': 'No device connected'}), 400
+
+        data = request.get_json() or {}
+        setpoints = data.get('setpoints', [])
+        if not setpoints:
+            return jsonify({'error': 'No setpoints provided'}), 400
+
+        queued = setpoint_service.submit_batch(setpoints)
+        return jsonify({'queued': queued})
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': f'Invalid setpoint: {e}'}), 400
+    except Exception as e:
+        logger.error(f"Error in submit_setpoints: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@motion_bp.route('/setpoints/stream/start', methods=['POST'])
+def start_setpoint_stream():
+    """Open the binary TCP setpoint stream (the bind host is server config, see ODRIVE_SETPOINT_STREAM_HOST)"""
+    try:
+        data = request.get_json() or {}
+        if 'host' in data:
+            return jsonify({'error': f'The stream host is set by the server ({STREAM_HOST_ENV})'}), 400
+        try:
+            port = int(data.get('port', DEFAULT_STREAM_PORT))
+        except (TypeError, ValueError):
+            return jsonify({'error': f"Invalid port: {data.get('port')}"}), 400
+        return jsonify(setpoint_service.start_stream(port))
+    except OSError as e:
+        logger.error(f"Could not open setpoint stream: {e}")
+        return jsonify({'error': f'Could not open setpoint stream: {e}'}), 500
+    except Exception as e:
+        logger.error(f"Error in start_setpoint_stream: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@motion_bp.route('/setpoints/stream/stop', methods=['POST'])
+def stop_setpoint_stream():
+    try:
+        return jsonify(setpoint_service.stop_stream())
+    except Exception as e:
+        logger.error(f"Error in stop_setpoint_stream: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@motion_bp.route('/setpoints/status', methods=['GET'])
+def setpoint_status():
+    """Get stream state and writer statistics"""
+    try:
+        return jsonify(setpoint_service.get_status())
+    except Exception as e:
+        logger.error(f"Error in setpoint_status: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@motion_bp.route('/trajectory', methods=['POST'])
+def upload_trajectory():
+    """Upload trajectories as {"axes": {"0": [[t, pos, vel, torque], ...]}}"""
+    try:
+        data = request.get_json() or {}
+        result = trajectory_player.load(data.get('axes', {}))
+        if result.get('error'):
+            return jsonify(result), 400
+        return jsonify(result)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid trajectory: {e}'}), 400
+    except Exception as e:
+        logger.error(f"Error in upload_trajectory: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@motion_bp.route('/trajectory/start', methods=['POST'])
+def start_trajectory():
+    try:
+        result = trajectory_player.start()
+        if result.get('error'):
+            return jsonify(result), 400
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f"Error in start_trajectory: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@motion_bp.route('/trajectory/stop', methods=['POST'])
+def stop_trajectory():
+    try:
+        return jsonify(trajectory_player.stop())
+    except Exception as e:
+        logger.error(f"Error in stop_trajectory: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@motion_bp.route('/trajectory/status', methods=['GET'])
+def trajectory_status():
+    try:
+        return jsonify(trajectory_player.get_status())
+    except Exception as e:
+        logger.error(f"Error in trajectory_status: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@motion_bp.route('/trajectory/result', methods=['GET'])
+def trajectory_result():
+    """Get telemetry recorded during playback, aligned to trajectory points"""
+    try:
+        return jsonify(trajectory_player.get_result())
+    except Exception as e:
+        logger.error(f"Error in trajectory_result: {e}")
+        return jsonify({'error': str(e)}), 500
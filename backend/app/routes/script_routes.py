@@ -0,0 +1,66 @@
+import logging
+from flask import Blueprint, request, jsonify
+from ..script_runner import ScriptError, compile_script
+
+logger = logging.getLogger(__name__)
+script_bp = Blueprint('script', __name__, url_prefix='/api/odrive/script')
+
+# Global script runner (will be set by init_routes)
+script_runner = None
+
+def init_routes(runner):
+    """Initialize routes with the script runner"""
+    global script_runner
+    script_runner = runner
+
+@script_bp.route('/run', methods=['POST'])
+def run_script():
+    """Compile and start a command script: {"script": "..."}"""
+    try:
+        data = request.get_json() or {}
+        source = data.get('script', '')
+        if not source.strip():
+            return jsonify({'error': 'No script provided'}), 400
+
+        result = script_runner.run(source)
+        if result.get('error'):
+            return jsonify(result), 409 if script_runner.is_running() else 400
+        return jsonify(result)
+    except ScriptError as e:
+        return jsonify({'error': str(e), 'line': e.line}), 400
+    except Exception as e:
+        logger.error(f"Error in run_script: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@script_bp.route('/check', methods=['POST'])
+def check_script():
+    """Compile a script without running it and list the device properties it uses"""
+    try:
+        data = request.get_json() or {}
+        script = compile_script(data.get('script', ''))
+        return jsonify({'ok': True, 'paths': script.paths})
+    except ScriptError as e:
+        return jsonify({'ok': False, 'error': str(e), 'line': e.line}), 400
+    except Exception as e:
+        logger.error(f"Error in check_script: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@script_bp.route('/cancel', methods=['POST'])
+def cancel_script():
+    try:
+        return jsonify(script_runner.cancel())
+    except Exception as e:
+        logger.error(f"Error in cancel_script: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@script_bp.route('/status', methods=['GET'])
+def script_status():
+    """Script state and step results newer than ?since=<result id>"""
+    try:
+        since_id = int(request.args.get('since', 0))
+        return jsonify(script_runner.get_status(since_id))
+    except ValueError:
+        return jsonify({'error': 'since must be an integer result id'}), 400
+    except Exception as e:
+        logger.error(f"Error in script_status: {e}")
+        return jsonify({'error': str(e)}), 500
@@ -3,21 +3,83 @@ import sys
 import logging
 import tempfile
 import subprocess
-import requests
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
 
 logger = logging.getLogger(__name__)
 system_bp = Blueprint('system', __name__, url_prefix='/api')
 
 from ..constants import VERSION
+from ..startup import timeline, get_startup_profile
+from ..metrics import metrics
+from ..sampling_profiler import sampling_profiler
 
 @system_bp.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'ok', 'version': VERSION})
+    return jsonify({'status': 'ok', 'version': VERSION, 'startup': timeline.report()})
+
+@system_bp.route('/system/startup_profile', methods=['GET'])
+def startup_profile():
+    """Startup phases, blueprint registration and per-import timings (ODRIVE_STARTUP_PROFILE=1)"""
+    return jsonify(get_startup_profile())
+
+@system_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text exposition; ?format=json returns p50/p90/p99 summaries instead"""
+    try:
+        if request.args.get('format') == 'json':
+            return jsonify(metrics.summary())
+        return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+    except Exception as e:
+        logger.error(f"Error in get_metrics: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@system_bp.route('/system/profiler/start', methods=['POST'])
+def start_profiler():
+    """Sample every thread's stack for N seconds without restarting the backend"""
+    try:
+        data = request.get_json(silent=True) or {}
+        started = sampling_profiler.start(
+            duration=float(data.get('duration', 10)),
+            interval=float(data.get('interval_ms', 5)) / 1000.0,
+            thread_filter=data.get('thread_filter'),
+            include_idle=bool(data.get('include_idle', False)),
+        )
+        if not started:
+            return jsonify({'error': 'Profiler already running'}), 409
+        return jsonify({'message': 'Profiler started', 'status': sampling_profiler.get_status()})
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid profiler parameters: {e}'}), 400
+    except Exception as e:
+        logger.error(f"Error in start_profiler: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@system_bp.route('/system/profiler/stop', methods=['POST'])
+def stop_profiler():
+    try:
+        sampling_profiler.stop()
+        return jsonify({'message': 'Profiler stopped', 'status': sampling_profiler.get_status()})
+    except Exception as e:
+        logger.error(f"Error in stop_profiler: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@system_bp.route('/system/profiler', methods=['GET'])
+def get_profiler_result():
+    """Status plus top functions; ?format=collapsed returns flamegraph input as text"""
+    try:
+        if request.args.get('format') == 'collapsed':
+            return Response(sampling_profiler.get_collapsed(), mimetype='text/plain')
+        return jsonify({
+            'status': sampling_profiler.get_status(),
+            'top': sampling_profiler.get_top_functions(int(request.args.get('limit', 25))),
+        })
+    except Exception as e:
+        logger.error(f"Error in get_profiler_result: {e}")
+        return jsonify({'error': str(e)}), 500
 
 @system_bp.route('/system/check_updates', methods=['GET'])
 def check_updates():
     try:
+        import requests  # Only needed for update checks - keep it off the startup path
         url = "https://api.github.com/repos/MoonLighTingPY/odrive3.6_web_gui/releases/latest"
         response = requests.get(url)
         
@@ -54,6 +116,7 @@ def check_updates():
 @system_bp.route('/system/update', methods=['POST'])
 def perform_update():
     try:
+        import requests
         data = request.get_json()
         download_url = data.get('download_url')
         file_name = data.get('file_name')
@@ -1,18 +1,22 @@
 import logging
 import time
+import zlib
 from flask import Blueprint, request, jsonify
-from ..utils.utils import sanitize_for_json
 
 logger = logging.getLogger(__name__)
 telemetry_bp = Blueprint('telemetry', __name__, url_prefix='/api/telemetry')
 
-# Global ODrive manager (will be set by init_routes)
+# Global ODrive manager, rate controller and telemetry tap (will be set by init_routes)
 odrive_manager = None
+rate_controller = None
+telemetry_tap = None
 
-def init_routes(manager):
-    """Initialize routes with ODrive manager"""
-    global odrive_manager
+def init_routes(manager, controller, tap=None):
+    """Initialize routes with ODrive manager, telemetry rate controller and telemetry tap"""
+    global odrive_manager, rate_controller, telemetry_tap
     odrive_manager = manager
+    rate_controller = controller
+    telemetry_tap = tap
 
 def get_property_value(odrv, path):
     """Get a single property value - fast and direct"""
@@ -29,30 +33,106 @@ def get_property_value(odrv, path):
 
 @telemetry_bp.route('/get-telemetry', methods=['POST'])
 def get_telemetry():
-    """Get telemetry data for specified paths and include connection heartbeat"""
+    """Get telemetry data for specified paths at a rate the device can sustain.
+
+    Optional body fields: rate_hz (desired poll rate) and client_id (defaults to
+    the caller's address and path set). The response carries a 'sampling' entry
+    with the granted/actual rate, samples dropped and the suggested next poll.
+    """
     try:
         data = request.get_json()
         paths = data.get('paths', [])
 
-        # Heartbeat: check connection before fetching properties
-        connected = odrive_manager.is_connected() and odrive_manager.check_connection()
-        if not connected:
+        # Heartbeat: liveness comes from recent device traffic, probing only when idle
+        if not odrive_manager.is_alive():
+            rate_controller.clear()
+            return jsonify({'connected': False}), 200
+
+        def read_paths(stale_paths):
+            odrv = odrive_manager.current_device
+            if odrv is None:
+                raise ConnectionError('Device disconnected')
+            results = {}
+            for path in stale_paths:
+                try:
+                    results[path] = get_property_value(odrv, path)
+                except Exception as e:
+                    logger.debug(f"Failed to get {path}: {e}")
+                    results[path] = None
+            return results
+
+        # system.* names map to root attributes, so the sampler and cache see one path per property
+        device_paths = {path: path[len('system.'):] if path.startswith('system.') else path for path in paths}
+        client_id = data.get('client_id') or f"{request.remote_addr}:{zlib.crc32(','.join(paths).encode())}"
+        try:
+            values, sampling = rate_controller.sample(list(device_paths.values()), read_paths,
+                                                      data.get('rate_hz'), client_id)
+        except ConnectionError:
+            rate_controller.clear()
             return jsonify({'connected': False}), 200
 
-        results = {}
-        odrv = odrive_manager.current_device
-        for path in paths:
-            try:
-                value = get_property_value(odrv, path)
-                results[path] = value
-            except Exception as e:
-                logger.debug(f"Failed to get {path}: {e}")
-                results[path] = None
+        results = {path: values.get(device_path) for path, device_path in device_paths.items()}
 
         results['connected'] = True
+        results['sampling'] = sampling
         return jsonify(results)
 
     except Exception as e:
         logger.error(f"Telemetry error: {e}")
         return jsonify({'connected': False, 'error': str(e)}), 200
 
+
+@telemetry_bp.route('/rate', methods=['GET'])
+def get_telemetry_rate():
+    """Get the measured device sampling capacity"""
+    try:
+        paths = request.args.get('paths', type=int, default=1)
+        return jsonify({
+            'read_cost_ms': round(rate_controller.read_cost() * 1000, 4),
+            'capacity_hz': round(rate_controller.capacity_hz(paths), 2),
+            'paths': paths,
+            'sampler': rate_controller.sampler.get_stats() if rate_controller.sampler else None,
+        })
+    except Exception as e:
+        logger.error(f"Error in get_telemetry_rate: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@telemetry_bp.route('/tap', methods=['GET'])
+def get_tap_info():
+    """Where local scripts find live samples (shared-memory ring, stream socket) - see app.tap_client"""
+    try:
+        return jsonify(telemetry_tap.get_info())
+    except Exception as e:
+        logger.error(f"Error in get_tap_info: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@telemetry_bp.route('/tap', methods=['POST'])
+def subscribe_tap():
+    """Have the sampler publish paths for a tap client: {"owner": "...", "paths": [...], "frequency_class": "high"}"""
+    try:
+        data = request.get_json() or {}
+        owner = data.get('owner')
+        paths = data.get('paths')
+        if not owner or not isinstance(paths, list):
+            return jsonify({'error': 'owner and paths are required'}), 400
+        if not telemetry_tap.is_running():
+            return jsonify({'error': 'Telemetry tap is not running (enable it with ODRIVE_TELEMETRY_TAP=1)'}), 409
+        telemetry_tap.sampler.register_paths(f'tap:{owner}', paths, data.get('frequency_class'))
+        return jsonify(telemetry_tap.get_info())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in subscribe_tap: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@telemetry_bp.route('/tap', methods=['DELETE'])
+def unsubscribe_tap():
+    try:
+        owner = request.args.get('owner')
+        if not owner:
+            return jsonify({'error': 'owner is required'}), 400
+        telemetry_tap.sampler.unregister_paths(f'tap:{owner}')
+        return jsonify({'success': True})
+    except Exception as e:
+        logger.error(f"Error in unsubscribe_tap: {e}")
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,64 @@
+import logging
+from flask import Blueprint, request, jsonify
+
+logger = logging.getLogger(__name__)
+watchdog_bp = Blueprint('watchdog', __name__, url_prefix='/api/odrive/watchdog')
+
+# Global watchdog service (will be set by init_routes)
+watchdog_service = None
+
+def _parse_axis(value):
+    """Axis number from a request body, or None if it is not 0 or 1"""
+    try:
+        axis = int(value)
+    except (TypeError, ValueError):
+        return None
+    return axis if axis in (0, 1) else None
+
+def init_routes(service):
+    """Initialize routes with the watchdog service"""
+    global watchdog_service
+    watchdog_service = service
+
+@watchdog_bp.route('/start', methods=['POST'])
+def start_watchdog():
+    """Start feeding an axis watchdog from the backend"""
+    try:
+        data = request.get_json() or {}
+        axis_number = _parse_axis(data.get('axis', 0))
+        if axis_number is None:
+            return jsonify({'error': f"Invalid axis: {data.get('axis')}"}), 400
+        period_ms = data.get('period_ms')
+        period = float(period_ms) / 1000 if period_ms is not None else None
+
+        result = watchdog_service.start(axis_number, period)
+        if 'error' in result:
+            return jsonify(result), 400
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f"Error in start_watchdog: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@watchdog_bp.route('/stop', methods=['POST'])
+def stop_watchdog():
+    """Stop feeding one axis (or all axes if none is given)"""
+    try:
+        data = request.get_json() or {}
+        axis_number = data.get('axis')
+        if axis_number is not None:
+            axis_number = _parse_axis(axis_number)
+            if axis_number is None:
+                return jsonify({'error': f"Invalid axis: {data.get('axis')}"}), 400
+        return jsonify(watchdog_service.stop(axis_number))
+    except Exception as e:
+        logger.error(f"Error in stop_watchdog: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@watchdog_bp.route('/status', methods=['GET'])
+def watchdog_status():
+    """Get feeder state and jitter statistics"""
+    try:
+        return jsonify(watchdog_service.get_status())
+    except Exception as e:
+        logger.error(f"Error in watchdog_status: {e}")
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,163 @@
+"""
+In-process sampling profiler
+A timer thread snapshots every thread's stack with sys._current_frames() and
+folds them into collapsed stacks ("thread;module:func;module:func count")
+that flamegraph.pl / speedscope read directly. Timer-based rather than
+signal-based so it works on Windows and samples all Flask worker threads,
+not just the main one.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 0.005
+MIN_INTERVAL = 0.001
+MAX_DURATION = 300.0
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    module = frame.f_globals.get('__name__') or os.path.basename(frame.f_code.co_filename)
+    return f"{module}:{frame.f_code.co_name}"
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self.running = False
+        self.samples = 0
+        self.started_at = None
+        self.stopped_at = None
+        self.interval = DEFAULT_INTERVAL
+        self.duration = 0.0
+        self.thread_filter = None
+        self.include_idle = False
+        self._stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self, duration: float, interval: float = DEFAULT_INTERVAL,
+              thread_filter: Optional[str] = None, include_idle: bool = False) -> bool:
+        """Sample all threads for `duration` seconds; returns False if already running"""
+        with self._lock:
+            if self.running:
+                return False
+            self.duration = min(max(float(duration), 0.1), MAX_DURATION)
+            self.interval = max(float(interval), MIN_INTERVAL)
+            self.thread_filter = thread_filter
+            self.include_idle = include_idle
+            self._stacks = Counter()
+            self.samples = 0
+            self.started_at = time.time()
+            self.stopped_at = None
+            self.running = True
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='SamplingProfiler', daemon=True)
+            self._thread.start()
+        logger.info(f"Sampling profiler started for {self.duration:.1f}s at {self.interval * 1000:.1f}ms")
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+        thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=2)
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        deadline = time.perf_counter() + self.duration
+        next_sample = time.perf_counter()
+        try:
+            while not self._stop_event.is_set() and time.perf_counter() < deadline:
+                self._sample(own_ident)
+                next_sample += self.interval
+                delay = next_sample - time.perf_counter()
+                if delay > 0:
+                    self._stop_event.wait(delay)
+                else:
+                    # Sampling fell behind - don't burst to catch up
+                    next_sample = time.perf_counter()
+        finally:
+            with self._lock:
+                self.running = False
+                self.stopped_at = time.time()
+            logger.info(f"Sampling profiler stopped after {self.samples} samples")
+
+    def _sample(self, own_ident: int):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        frames = sys._current_frames()
+        folded = []
+        for ident, frame in frames.items():
+            if ident == own_ident:
+                continue
+            thread_name = names.get(ident, f'thread-{ident}')
+            if self.thread_filter and self.thread_filter not in thread_name:
+                continue
+            if not self.include_idle and self._is_idle(frame):
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(thread_name.replace(';', ':').replace(' ', '_'))
+            folded.append(';'.join(reversed(stack)))
+        with self._lock:
+            self._stacks.update(folded)
+            self.samples += 1
+
+    @staticmethod
+    def _is_idle(frame) -> bool:
+        """Threads parked in wait/select/accept are noise unless explicitly requested"""
+        name = frame.f_code.co_name
+        module = frame.f_globals.get('__name__', '')
+        if module in ('threading', 'queue', 'selectors', 'socketserver') and name in (
+                'wait', 'get', 'select', 'serve_forever', '_wait_for_tstate_lock'):
+            return True
+        return module.startswith('waitress') and name in ('handler_thread', 'loop')
+
+    def get_collapsed(self) -> str:
+        with self._lock:
+            stacks = self._stacks.most_common()
+        return '\n'.join(f"{stack} {count}" for stack, count in stacks) + ('\n' if stacks else '')
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = ((self.stopped_at or time.time()) - self.started_at) if self.started_at else 0.0
+            return {
+                'running': self.running,
+                'samples': self.samples,
+                'unique_stacks': len(self._stacks),
+                'interval_ms': round(self.interval * 1000, 2),
+                'duration_s': self.duration,
+                'elapsed_s': round(elapsed, 2),
+                'thread_filter': self.thread_filter,
+                'include_idle': self.include_idle,
+            }
+
+    def get_top_functions(self, limit: int = 25) -> Dict[str, Any]:
+        """Self (leaf) and inclusive sample counts per function"""
+        with self._lock:
+            stacks = list(self._stacks.items())
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in stacks:
+            frames = stack.split(';')[1:]  # Drop the thread name
+            if not frames:
+                continue
+            self_counts[frames[-1]] += count
+            for frame in set(frames):
+                total_counts[frame] += count
+        return {
+            'self': [{'function': f, 'samples': c} for f, c in self_counts.most_common(limit)],
+            'inclusive': [{'function': f, 'samples': c} for f, c in total_counts.most_common(limit)],
+        }
+
+
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,510 @@
+"""
+Command script runner
+Runs multi-line command scripts on the backend so sequences like "enter closed
+loop, wait until the state is reached, move, wait until stopped" are timed by
+the device rather than by browser round trips.
+
+Scripts use a small Python subset: property writes, reads and method calls on
+the device (odrv0., device., ...), local variables, if/while/for-range,
+sleep(seconds) and wait_until(condition, timeout=10, poll=0.01). A script is
+compiled once; every device property it touches becomes an accessor whose
+parent object is resolved before the first step runs. Each step runs under
+the device lock on its own (telemetry keeps flowing between steps), and its
+result is published on the event bus. while loops that touch the device run at
+most once per MIN_DEVICE_LOOP_INTERVAL, so a busy-wait cannot starve the
+telemetry sampler; wait_until is the better way to wait for a condition.
+"""
+
+import ast
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+from .metrics import record_usb
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_EVENT_TOPIC = 'script'
+
+DEVICE_NAMES = ('device', 'odrv', 'odrv0', 'odrv1', 'dev0', 'dev1', 'my_drive', 'odrive')
+FUNCTIONS = {'abs': abs, 'min': min, 'max': max, 'round': round, 'int': int, 'float': float, 'bool': bool}
+
+DEFAULT_WAIT_TIMEOUT = 10.0
+DEFAULT_WAIT_POLL = 0.01
+MIN_WAIT_POLL = 0.001
+MIN_DEVICE_LOOP_INTERVAL = DEFAULT_WAIT_POLL
+MAX_SCRIPT_LINES = 1000
+MAX_RANGE = 100000
+RESULT_HISTORY = 2000
+
+_EXPRESSION_NODES = (
+    ast.Expression, ast.BoolOp, ast.BinOp, ast.UnaryOp, ast.Compare, ast.IfExp, ast.Call,
+    ast.Name, ast.Attribute, ast.Constant, ast.keyword, ast.Load,
+    ast.boolop, ast.operator, ast.unaryop, ast.cmpop,
+)
+
+
+class ScriptError(Exception):
+    """A script that cannot be compiled or a step that failed"""
+
+    def __init__(self, message: str, line: Optional[int] = None):
+        super().__init__(message)
+        self.line = line
+
+
+def _device_path(node) -> Optional[str]:
+    """'axis0.controller.input_pos' for odrv0.axis0.controller.input_pos, None if not rooted at the device"""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name) or node.id not in DEVICE_NAMES or not parts:
+        return None
+    return '.'.join(reversed(parts))
+
+
+class _Expression:
+    """A compiled expression and the accessors it reads"""
+    __slots__ = ('code', 'source', 'accessors')
+
+    def __init__(self, code, source: str, accessors: List[int]):
+        self.code = code
+        self.source = source
+        self.accessors = accessors
+
+    @property
+    def uses_device(self) -> bool:
+        return bool(self.accessors)
+
+
+def _uses_device(steps) -> bool:
+    """Whether any of steps (or the blocks nested in them) reads, writes or calls the device"""
+    for step in steps:
+        if step.kind in ('write', 'call'):
+            return True
+        for arg in step.args:
+            values = arg if isinstance(arg, tuple) else (arg,)
+            if any(isinstance(value, _Expression) and value.uses_device for value in values):
+                return True
+        if _uses_device(step.body) or _uses_device(step.orelse):
+            return True
+    return False
+
+
+class _Step:
+    __slots__ = ('kind', 'line', 'source', 'args', 'body', 'orelse')
+
+    def __init__(self, kind: str, line: int, source: str, args: Tuple = (), body=None, orelse=None):
+        self.kind = kind
+        self.line = line
+        self.source = source
+        self.args = args
+        self.body = body or []
+        self.orelse = orelse or []
+
+
+class _Compiler:
+    def __init__(self, source: str):
+        self.source = source
+        self.lines = source.splitlines()
+        self.paths: List[str] = []
+        self._path_index: Dict[str, int] = {}
+        self.variables = set()
+
+    def compile(self) -> List[_Step]:
+        if len(self.lines) > MAX_SCRIPT_LINES:
+            raise ScriptError(f'Script is longer than {MAX_SCRIPT_LINES} lines')
+        try:
+            tree = ast.parse(self.source, '<script>', 'exec')
+        except SyntaxError as e:
+            raise ScriptError(f'Syntax error: {e.msg}', e.lineno)
+        # Names assigned anywhere (including loop variables) may be read anywhere
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+                self.variables.add(node.id)
+        return self._block(tree.body)
+
+    def _accessor(self, path: str, line: int) -> int:
+        if any(part.startswith('_') for part in path.split('.')):
+            raise ScriptError(f'Private attribute in {path}', line)
+        index = self._path_index.get(path)
+        if index is None:
+            index = self._path_index[path] = len(self.paths)
+            self.paths.append(path)
+        return index
+
+    def _line_source(self, node) -> str:
+        return self.lines[node.lineno - 1].strip() if 0 < node.lineno <= len(self.lines) else ''
+
+    def _expression(self, node, line: int) -> _Expression:
+        accessors = []
+        compiler = self
+
+        class Rewriter(ast.NodeTransformer):
+            def visit_Attribute(self, attribute):
+                path = _device_path(attribute)
+                if path is None:
+                    raise ScriptError('Only device properties can be accessed with "."', line)
+                index = compiler._accessor(path, line)
+                accessors.append(index)
+                call = ast.Call(func=ast.Name(id='_read', ctx=ast.Load()),
+                                args=[ast.Constant(value=index)], keywords=[])
+                return ast.copy_location(call, attribute)
+
+            def visit_Name(self, name):
+                if name.id in DEVICE_NAMES:
+                    raise ScriptError(f'{name.id} needs a property path', line)
+                if name.id not in FUNCTIONS and name.id not in compiler.variables:
+                    raise ScriptError(f'Unknown name: {name.id}', line)
+                return name
+
+            def visit_Call(self, call):
+                func = call.func
+                if isinstance(func, ast.Name) and func.id in ('wait_until', 'sleep'):
+                    raise ScriptError(f'{func.id}() must be a statement of its own', line)
+                if not (isinstance(func, ast.Name) and func.id in FUNCTIONS) and _device_path(func) is None:
+                    raise ScriptError('Only device methods and ' + ', '.join(FUNCTIONS) + ' can be called', line)
+                return self.generic_visit(call)
+
+        for child in ast.walk(node):
+            if not isinstance(child, _EXPRESSION_NODES):
+                raise ScriptError(f'Unsupported expression: {type(child).__name__}', line)
+        rewritten = ast.fix_missing_locations(Rewriter().visit(ast.Expression(body=node)))
+        source = ast.get_source_segment(self.source, node) or ''
+        return _Expression(compile(rewritten, f'<script line {line}>', 'eval'), source, accessors)
+
+    def _call_args(self, call: ast.Call, names: Tuple[str, ...], line: int) -> Dict[str, ast.AST]:
+        if len(call.args) > len(names):
+            raise ScriptError(f'Too many arguments to {call.func.id}()', line)
+        args = dict(zip(names, call.args))
+        for keyword in call.keywords:
+            if keyword.arg not in names or keyword.arg in args:
+                raise ScriptError(f'Unexpected argument {keyword.arg} to {call.func.id}()', line)
+            args[keyword.arg] = keyword.value
+        if names[0] not in args:
+            raise ScriptError(f'{call.func.id}() needs {names[0]}', line)
+        return args
+
+    def _block(self, statements) -> List[_Step]:
+        steps = []
+        for node in statements:
+            step = self._statement(node)
+            if step is not None:
+                steps.append(step)
+        return steps
+
+    def _statement(self, node) -> Optional[_Step]:
+        line = node.lineno
+        source = self._line_source(node)
+
+        if isinstance(node, ast.Pass):
+            return None
+
+        if isinstance(node, ast.Assign):
+            if len(node.targets) != 1:
+                raise ScriptError('Chained assignment is not supported', line)
+            target = node.targets[0]
+            value = self._expression(node.value, line)
+            if isinstance(target, ast.Name):
+                if target.id in DEVICE_NAMES or target.id in FUNCTIONS:
+                    raise ScriptError(f'Cannot assign to {target.id}', line)
+                return _Step('let', line, source, (target.id, value))
+            path = _device_path(target)
+            if path is None:
+                raise ScriptError('Can only assign to device properties and variables', line)
+            return _Step('write', line, source, (self._accessor(path, line), value))
+
+        if isinstance(node, ast.Expr):
+            call = node.value
+            if isinstance(call, ast.Call) and isinstance(call.func, ast.Name):
+                if call.func.id == 'wait_until':
+                    args = self._call_args(call, ('condition', 'timeout', 'poll'), line)
+                    return _Step('wait', line, source, (
+                        self._expression(args['condition'], line),
+                        self._expression(args['timeout'], line) if 'timeout' in args else None,
+                        self._expression(args['poll'], line) if 'poll' in args else None,
+                    ))
+                if call.func.id == 'sleep':
+                    args = self._call_args(call, ('seconds',), line)
+                    return _Step('sleep', line, source, (self._expression(args['seconds'], line),))
+            expression = self._expression(call, line)
+            kind = 'call' if isinstance(call, ast.Call) and _device_path(call.func) else 'read'
+            return _Step(kind, line, source, (expression,))
+
+        if isinstance(node, ast.If):
+            return _Step('if', line, source, (self._expression(node.test, line),),
+                         self._block(node.body), self._block(node.orelse))
+
+        if isinstance(node, ast.While):
+            if node.orelse:
+                raise ScriptError('while/else is not supported', line)
+            condition, body = self._expression(node.test, line), self._block(node.body)
+            uses_device = condition.uses_device or _uses_device(body)
+            return _Step('while', line, source, (condition, uses_device), body)
+
+        if isinstance(node, ast.For):
+            iterator = node.iter
+            if (node.orelse or not isinstance(node.target, ast.Name) or not isinstance(iterator, ast.Call)
+                    or not isinstance(iterator.func, ast.Name) or iterator.func.id != 'range'
+                    or iterator.keywords or not 1 <= len(iterator.args) <= 3):
+                raise ScriptError('Only "for <name> in range(...)" loops are supported', line)
+            bounds = tuple(self._expression(arg, line) for arg in iterator.args)
+            return _Step('for', line, source, (node.target.id, bounds), self._block(node.body))
+
+        raise ScriptError(f'Unsupported statement: {type(node).__name__}', line)
+
+
+class CompiledScript:
+    def __init__(self, source: str):
+        compiler = _Compiler(source)
+        self.source = source
+        self.steps = compiler.compile()
+        self.paths = compiler.paths
+
+
+def compile_script(source: str) -> CompiledScript:
+    """Compile a script, raising ScriptError (with the line number) if it is invalid"""
+    return CompiledScript(source)
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class ScriptRunner:
+    def __init__(self, odrive_manager, event_bus=None):
+        self.odrive_manager = odrive_manager
+        self.event_bus = event_bus
+        self.script_id = 0
+        self.state = 'idle'
+        self.error = None
+        self.error_line = None
+        self.steps_run = 0
+        self._results = deque(maxlen=RESULT_HISTORY)
+        self._result_ids = 0
+        self._started = 0.0
+        self._finished = 0.0
+        self._script: Optional[CompiledScript] = None
+        self._parents: List[Any] = []
+        self._names: List[str] = []
+        self._variables: Dict[str, Any] = {}
+        self._globals: Dict[str, Any] = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _publish(self, data: Dict[str, Any]):
+        if self.event_bus:
+            self.event_bus.publish(SCRIPT_EVENT_TOPIC, dict(data, script_id=self.script_id))
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def run(self, source: str) -> Dict[str, Any]:
+        """Compile and start a script; ScriptError if it does not compile, {'error'} if it cannot start"""
+        script = compile_script(source)
+
+        with self._lock:
+            # Checked and started under the lock so two concurrent runs cannot both start
+            if self.is_running():
+                return {'error': 'A script is already running'}
+            if not self.odrive_manager.is_connected():
+                return {'error': 'No device connected'}
+            self._stop_event.clear()
+            self.script_id += 1
+            self._script = script
+            self.state = 'running'
+            self.error = None
+            self.error_line = None
+            self.steps_run = 0
+            self._results.clear()
+            self._started = time.perf_counter()
+            self._finished = 0.0
+            self._thread = threading.Thread(target=self._run, name='ScriptRunner', daemon=True)
+            self._thread.start()
+        self._publish({'state': 'running'})
+        return self.get_status()
+
+    def cancel(self) -> Dict[str, Any]:
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(2.0)
+        return self.get_status()
+
+    def _resolve_accessors(self):
+        """Resolve the parent object of every property path once, failing before any step runs"""
+        device = self.odrive_manager.current_device
+        if device is None:
+            raise ScriptError('No device connected')
+        parents, names = [], []
+        for path in self._script.paths:
+            *parent_parts, name = path.split('.')
+            parent = device
+            for part in parent_parts:
+                parent = getattr(parent, part, None)
+                if parent is None:
+                    raise ScriptError(f'Unknown property: {path}')
+            if not hasattr(parent, name):
+                raise ScriptError(f'Unknown property: {path}')
+            parents.append(parent)
+            names.append(name)
+        self._parents, self._names = parents, names
+
+    def _read(self, index: int):
+        return getattr(self._parents[index], self._names[index])
+
+    def _eval(self, expression: _Expression):
+        if expression.uses_device:
+            return self.odrive_manager.execute_with_lock(eval, expression.code, self._globals, self._variables)
+        return eval(expression.code, self._globals, self._variables)
+
+    def _record(self, step: _Step, ok: bool, started: float, value: Any = None, error: Optional[str] = None):
+        now = time.perf_counter()
+        with self._lock:
+            self._result_ids += 1
+            self.steps_run += 1
+            result = {
+                'id': self._result_ids,
+                'line': step.line,
+                'source': step.source,
+                'kind': step.kind,
+                'ok': ok,
+                'value': value,
+                'error': error,
+                'elapsed_ms': round((now - started) * 1000, 3),
+                't_ms': round((now - self._started) * 1000, 3),
+            }
+            self._results.append(result)
+        self._publish({'step': result})
+
+    def _sleep(self, seconds: float):
+        if seconds > 0 and self._stop_event.wait(seconds):
+            raise _Cancelled()
+        if self._stop_event.is_set():
+            raise _Cancelled()
+
+    def _execute(self, steps: List[_Step]):
+        for step in steps:
+            if self._stop_event.is_set():
+                raise _Cancelled()
+            started = time.perf_counter()
+            try:
+                self._execute_step(step, started)
+            except (_Cancelled, ScriptError):
+                raise
+            except Exception as e:
+                self._record(step, False, started, error=str(e))
+                raise ScriptError(str(e), step.line)
+
+    def _execute_step(self, step: _Step, started: float):
+        kind = step.kind
+        if kind == 'let':
+            name, expression = step.args
+            self._variables[name] = self._eval(expression)
+
+        elif kind == 'write':
+            index, expression = step.args
+            value = self._eval(expression)
+            ok = False
+            try:
+                self.odrive_manager.execute_with_lock(setattr, self._parents[index], self._names[index], value)
+                ok = True
+            finally:
+                record_usb('write', self._script.paths[index], time.perf_counter() - started, ok=ok)
+                self.odrive_manager.bump_state_generation()
+            self._record(step, True, started, value)
+
+        elif kind in ('read', 'call'):
+            try:
+                value = self._eval(step.args[0])
+            finally:
+                if kind == 'call':
+                    self.odrive_manager.bump_state_generation()
+            if value is not None and not isinstance(value, (bool, int, float, str)):
+                value = str(value)
+            self._record(step, True, started, value)
+
+        elif kind == 'sleep':
+            seconds = float(self._eval(step.args[0]))
+            self._sleep(seconds)
+            self._record(step, True, started, seconds)
+
+        elif kind == 'wait':
+            condition, timeout, poll = step.args
+            timeout = DEFAULT_WAIT_TIMEOUT if timeout is None else float(self._eval(timeout))
+            poll = DEFAULT_WAIT_POLL if poll is None else max(MIN_WAIT_POLL, float(self._eval(poll)))
+            deadline = started + timeout
+            polls = 0
+            while True:
+                polls += 1
+                if self._eval(condition):
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    message = f'wait_until timed out after {timeout:g}s: {condition.source}'
+                    self._record(step, False, started, polls, error=message)
+                    raise ScriptError(message, step.line)
+                self._sleep(min(poll, remaining))
+            self._record(step, True, started, polls)
+
+        elif kind == 'if':
+            self._execute(step.body if self._eval(step.args[0]) else step.orelse)
+
+        elif kind == 'while':
+            condition, uses_device = step.args
+            iteration_started = time.perf_counter()
+            while self._eval(condition):
+                self._execute(step.body)
+                if self._stop_event.is_set():
+                    raise _Cancelled()
+                if uses_device:
+                    # Leave the device lock free between iterations for the sampler
+                    self._sleep(iteration_started + MIN_DEVICE_LOOP_INTERVAL - time.perf_counter())
+                    iteration_started = time.perf_counter()
+
+        elif kind == 'for':
+            name, bounds = step.args
+            values = range(*[int(self._eval(bound)) for bound in bounds])
+            if len(values) > MAX_RANGE:
+                raise ScriptError(f'range() is limited to {MAX_RANGE} iterations', step.line)
+            for value in values:
+                self._variables[name] = value
+                self._execute(step.body)
+
+    def _run(self):
+        self._variables = {}
+        self._globals = dict(FUNCTIONS, _read=self._read, __builtins__={})
+        try:
+            self.odrive_manager.execute_with_lock(self._resolve_accessors)
+            self._execute(self._script.steps)
+            state, error, line = 'complete', None, None
+        except _Cancelled:
+            state, error, line = 'cancelled', None, None
+        except ScriptError as e:
+            state, error, line = 'failed', str(e), e.line
+        except Exception as e:
+            logger.error(f"Script failed: {e}")
+            state, error, line = 'failed', str(e), None
+        with self._lock:
+            self.state = state
+            self.error = error
+            self.error_line = line
+            self._finished = time.perf_counter()
+            self._parents = []
+        self._publish({'state': state, 'error': error, 'line': line})
+
+    def get_status(self, since_id: int = 0) -> Dict[str, Any]:
+        """Script state and the step results newer than since_id"""
+        with self._lock:
+            end = self._finished or time.perf_counter()
+            return {
+                'script_id': self.script_id,
+                'state': self.state,
+                'error': self.error,
+                'line': self.error_line,
+                'steps_run': self.steps_run,
+                'elapsed_ms': round((end - self._started) * 1000, 1) if self._started else 0.0,
+                'results': [result for result in self._results if result['id'] > since_id],
+            }
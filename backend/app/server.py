@@ -0,0 +1,117 @@
+"""
+HTTP serving modes for the ODrive GUI backend
+Development mode keeps Flask's built-in server; production mode runs a real
+multi-threaded WSGI server (waitress) with keep-alive, a tunable worker pool
+and graceful shutdown. Both stay in a single process so ODriveManager remains
+the only owner of the USB device.
+"""
+
+import importlib.util
+import logging
+import os
+import signal
+import threading
+from typing import Callable, Optional
+
+from .startup import timeline
+
+logger = logging.getLogger(__name__)
+
+SERVER_MODE_ENV = 'ODRIVE_SERVER_MODE'
+SERVER_THREADS_ENV = 'ODRIVE_SERVER_THREADS'
+DEFAULT_THREADS = 8
+
+
+def get_server_mode(production: Optional[bool] = None) -> str:
+    """Resolve the serving mode from an explicit flag or the ODRIVE_SERVER_MODE env var"""
+    if production is not None:
+        return 'production' if production else 'development'
+    mode = os.environ.get(SERVER_MODE_ENV, 'development').strip().lower()
+    return 'production' if mode in ('production', 'prod', '1') else 'development'
+
+
+def waitress_available() -> bool:
+    return importlib.util.find_spec('waitress') is not None
+
+
+def get_thread_count(threads: Optional[int] = None) -> int:
+    if threads:
+        return threads
+    try:
+        return int(os.environ.get(SERVER_THREADS_ENV, DEFAULT_THREADS))
+    except ValueError:
+        return DEFAULT_THREADS
+
+
+def _install_signal_handlers():
+    """Turn SIGTERM into KeyboardInterrupt so both servers unwind through the same path"""
+    # Signal handlers can only be installed from the main thread (not from the tray app)
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    def _handler(signum, frame):
+        logger.info(f"Received signal {signum}, shutting down server...")
+        raise KeyboardInterrupt
+
+    try:
+        signal.signal(signal.SIGTERM, _handler)
+    except (ValueError, OSError):
+        pass
+
+
+def _run_waitress(app, host: str, port: int, threads: int):
+    from waitress import create_server
+
+    server = create_server(
+        app,
+        host=host,
+        port=port,
+        threads=threads,
+        connection_limit=max(100, threads * 16),
+        channel_timeout=120,
+        ident='ODrive GUI',
+    )
+    _install_signal_handlers()
+    logger.info(f"Serving with waitress on http://{host}:{port} ({threads} threads)")
+    try:
+        server.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        # Let in-flight requests finish before the device is released
+        server.task_dispatcher.shutdown(timeout=5)
+
+
+def _run_threaded_werkzeug(app, host: str, port: int):
+    from werkzeug.serving import make_server, WSGIRequestHandler
+
+    # HTTP/1.1 enables keep-alive so polling clients reuse connections
+    WSGIRequestHandler.protocol_version = 'HTTP/1.1'
+    server = make_server(host, port, app, threaded=True)
+    _install_signal_handlers()
+    logger.info(f"Serving with threaded werkzeug on http://{host}:{port}")
+    server.serve_forever()
+
+
+def run_server(app, host: str = '0.0.0.0', port: int = 5000, production: Optional[bool] = None,
+               threads: Optional[int] = None, on_shutdown: Optional[Callable[[], None]] = None):
+    """Run the Flask app in the selected serving mode until it is stopped"""
+    mode = get_server_mode(production)
+    timeline.mark(f'{mode} server starting')
+    try:
+        if mode == 'production' and waitress_available():
+            _run_waitress(app, host, port, get_thread_count(threads))
+        elif mode == 'production':
+            logger.error("Production mode requested but waitress is not installed (pip install -r requirements.txt): "
+                         "serving with threaded werkzeug instead - no worker limit, --threads ignored, "
+                         "no graceful drain on shutdown")
+            _run_threaded_werkzeug(app, host, port)
+        else:
+            app.run(host=host, port=port, debug=False, use_reloader=False, threaded=True)
+    finally:
+        if on_shutdown:
+            try:
+                on_shutdown()
+            except Exception as e:
+                logger.error(f"Error during shutdown: {e}")
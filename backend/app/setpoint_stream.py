@@ -0,0 +1,258 @@
+"""
+Setpoint streaming for high-rate motion commands
+External software streams packed input_pos/input_vel/input_torque frames over
+a persistent TCP connection; a dedicated writer thread applies them to the
+device with latest-wins coalescing, bypassing Flask and exec entirely.
+
+Frame layout (little endian, 18 bytes):
+    uint8   axis        0 or 1
+    uint8   kind        0 = input_pos, 1 = input_vel, 2 = input_torque
+    float64 timestamp   client timestamp in seconds (echoed in statistics)
+    float64 value
+
+The listener binds 127.0.0.1 (ODRIVE_SETPOINT_STREAM_HOST to change it): there
+is no authentication, so anyone who can reach the port can move the motors.
+"""
+
+import logging
+import math
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FRAME = struct.Struct('<BBdd')
+SETPOINT_KINDS = ('input_pos', 'input_vel', 'input_torque')
+DEFAULT_STREAM_PORT = 5001
+STREAM_HOST_ENV = 'ODRIVE_SETPOINT_STREAM_HOST'
+DEFAULT_STREAM_HOST = '127.0.0.1'
+
+
+def check_setpoint(axis: int, kind: int, value: float):
+    """Raise ValueError for an unknown target or a NaN/inf value"""
+    if axis not in (0, 1) or not 0 <= kind < len(SETPOINT_KINDS):
+        raise ValueError(f'Invalid setpoint target axis={axis} kind={kind}')
+    if not math.isfinite(value):
+        raise ValueError(f'Non-finite setpoint {value} for axis{axis}.{SETPOINT_KINDS[kind]}')
+
+
+class SetpointWriter:
+    """Applies the newest pending setpoint per (axis, kind) from one thread"""
+
+    def __init__(self, odrive_manager):
+        self.odrive_manager = odrive_manager
+        self._pending: Dict[Tuple[int, int], Tuple[float, float, float]] = {}
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._controllers = {}
+        self._controllers_device = None
+        self.received = 0
+        self.applied = 0
+        self.coalesced = 0
+        self.write_errors = 0
+        self.last_error = None
+        self._latency = deque(maxlen=2000)
+        self._apply_times = deque(maxlen=2000)
+        # Counters are updated from stream handler threads and the writer thread
+        self._stats_lock = threading.Lock()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='SetpointWriter', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, axis: int, kind: int, value: float, client_timestamp: float = 0.0):
+        """Queue a setpoint, replacing any not-yet-applied value for the same target"""
+        check_setpoint(axis, kind, value)
+        with self._condition:
+            with self._stats_lock:
+                self.received += 1
+                if (axis, kind) in self._pending:
+                    self.coalesced += 1
+            self._pending[(axis, kind)] = (value, client_timestamp, time.perf_counter())
+            self._condition.notify()
+
+    def _get_controller(self, device, axis: int):
+        # Resolve the controller object once per device instead of walking the tree per write
+        if device is not self._controllers_device:
+            self._controllers = {}
+            self._controllers_device = device
+        controller = self._controllers.get(axis)
+        if controller is None:
+            controller = getattr(device, f'axis{axis}').controller
+            self._controllers[axis] = controller
+        return controller
+
+    def _apply(self, batch):
+        device = self.odrive_manager.current_device
+        if device is None:
+            raise Exception("No device connected")
+        for (axis, kind), (value, _, _) in batch.items():
+            setattr(self._get_controller(device, axis), SETPOINT_KINDS[kind], value)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            with self._condition:
+                while not self._pending and not self._stop_event.is_set():
+                    self._condition.wait(0.5)
+                batch, self._pending = self._pending, {}
+            if not batch:
+                continue
+
+            try:
+                self.odrive_manager.execute_with_lock(self._apply, batch)
+            except Exception as e:
+                with self._stats_lock:
+                    self.write_errors += 1
+                    self.last_error = str(e)
+                logger.debug(f"Setpoint write failed: {e}")
+                continue
+
+            now = time.perf_counter()
+            with self._stats_lock:
+                self.applied += len(batch)
+                self._apply_times.append(now)
+                for _, _, received_at in batch.values():
+                    self._latency.append(now - received_at)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            latency = sorted(self._latency)
+            apply_times = list(self._apply_times)
+            stats = {
+                'received': self.received,
+                'applied': self.applied,
+                'coalesced': self.coalesced,
+                'write_errors': self.write_errors,
+                'last_error': self.last_error,
+                'write_rate_hz': 0.0,
+            }
+        if len(apply_times) > 1 and apply_times[-1] > apply_times[0]:
+            stats['write_rate_hz'] = (len(apply_times) - 1) / (apply_times[-1] - apply_times[0])
+        if latency:
+            stats['latency_ms'] = {
+                'p50': latency[len(latency) // 2] * 1000,
+                'p99': latency[min(len(latency) - 1, int(len(latency) * 0.99))] * 1000,
+                'max': latency[-1] * 1000,
+            }
+        return stats
+
+
+class _SetpointStreamHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        writer = self.server.writer
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        peer = f'{self.client_address[0]}:{self.client_address[1]}'
+        logger.info(f"Setpoint stream client connected: {peer}")
+        buffer = b''
+        try:
+            while True:
+                chunk = self.request.recv(65536)
+                if not chunk:
+                    break
+                buffer += chunk
+                usable = len(buffer) - len(buffer) % FRAME.size
+                for axis, kind, client_timestamp, value in FRAME.iter_unpack(buffer[:usable]):
+                    try:
+                        writer.submit(axis, kind, value, client_timestamp)
+                    except ValueError as e:
+                        logger.warning(f"Dropping setpoint frame from {peer}: {e}")
+                buffer = buffer[usable:]
+        except (ConnectionResetError, OSError) as e:
+            logger.debug(f"Setpoint stream client {peer} error: {e}")
+        finally:
+            logger.info(f"Setpoint stream client disconnected: {peer}")
+
+
+class _SetpointStreamServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SetpointStreamService:
+    """Owns the setpoint writer and the optional TCP stream listener"""
+
+    def __init__(self, odrive_manager, host: Optional[str] = None):
+        self.writer = SetpointWriter(odrive_manager)
+        self.host = host or os.environ.get(STREAM_HOST_ENV) or DEFAULT_STREAM_HOST
+        self._server: Optional[_SetpointStreamServer] = None
+        self._server_thread = None
+
+    @staticmethod
+    def _parse_setpoint(setpoint) -> Tuple[int, int, float, float]:
+        if not isinstance(setpoint, dict):
+            raise ValueError(f'Setpoint must be an object, got {setpoint!r}')
+        kind = setpoint.get('kind', setpoint.get('target'))
+        if isinstance(kind, str) and kind in SETPOINT_KINDS:
+            kind = SETPOINT_KINDS.index(kind)
+        if isinstance(kind, bool) or not isinstance(kind, int):
+            raise ValueError(f"Unknown setpoint kind {kind!r} (expected one of {', '.join(SETPOINT_KINDS)} or 0-2)")
+        try:
+            return int(setpoint.get('axis', 0)), kind, float(setpoint['value']), float(setpoint.get('t', 0.0))
+        except TypeError as e:
+            raise ValueError(str(e))
+
+    def submit_batch(self, setpoints) -> int:
+        """Queue a list of {'axis', 'kind'|'target', 'value', 't'} setpoints (all or none)"""
+        parsed = [self._parse_setpoint(setpoint) for setpoint in setpoints]
+        for axis, kind, value, _ in parsed:
+            check_setpoint(axis, kind, value)
+        self.writer.start()
+        for setpoint in parsed:
+            self.writer.submit(*setpoint)
+        return len(parsed)
+
+    def start_stream(self, port: int = DEFAULT_STREAM_PORT) -> Dict[str, Any]:
+        """Listen for stream clients on the configured host (never taken from a request)"""
+        if self._server:
+            return self.get_status()
+        self.writer.start()
+        host = self.host
+        self._server = _SetpointStreamServer((host, port), _SetpointStreamHandler)
+        self._server.writer = self.writer
+        self._server_thread = threading.Thread(target=self._server.serve_forever,
+                                               name='SetpointStreamServer', daemon=True)
+        self._server_thread.start()
+        logger.info(f"Setpoint stream listening on {host}:{port}")
+        return self.get_status()
+
+    def stop_stream(self) -> Dict[str, Any]:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._server_thread = None
+            logger.info("Setpoint stream stopped")
+        return self.get_status()
+
+    def shutdown(self):
+        self.stop_stream()
+        self.writer.stop()
+
+    def get_status(self) -> Dict[str, Any]:
+        status = {
+            'streaming': self._server is not None,
+            'frame_format': '<BBdd (axis, kind, timestamp, value)',
+            'kinds': list(SETPOINT_KINDS),
+            'stats': self.writer.get_stats(),
+        }
+        if self._server:
+            status['address'] = list(self._server.server_address)
+        return status
@@ -0,0 +1,324 @@
+"""
+Shared-memory sample ring
+A fixed-size ring of telemetry rows in multiprocessing.shared_memory, written
+by one process (the device process) and read in place by any number of others.
+Every row holds a timestamp and the latest value of every channel (paths are
+held between reads), plus a bitmask of the channels that were read for that
+row. Columns are assigned once per path, and every row is stored twice
+(at slot and slot + capacity), so the latest n rows of one path are always a
+single strided view that never wraps.
+
+Layout: header | channel table (JSON) | masks (capacity x words uint64) |
+rows (2 x capacity x (1 + channels) float64, column 0 is the timestamp).
+The writer fills a row and only then advances head; a reader that copied or
+viewed row i checks afterwards that head has not lapped it (is_valid).
+"""
+
+import json
+import logging
+import math
+import os
+import struct
+from array import array
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'ODSR'
+VERSION = 2
+DEFAULT_CHANNELS = 128
+DEFAULT_CAPACITY = 4096
+
+# magic, version, channels, capacity, mask words, layout generation, head
+_HEADER = struct.Struct('<4sIIIIQQ')
+_GENERATION_OFFSET = 20
+_HEAD_OFFSET = 28
+# Creating process, so a name left behind can be told apart from one in use
+_CREATOR_PID = struct.Struct('<I')
+_CREATOR_PID_OFFSET = 36
+_TABLE_OFFSET = 64
+TABLE_SIZE = 65536
+
+# Channel value types, so readers get back ints and bools rather than floats
+TYPE_FLOAT = 'f'
+TYPE_INT = 'i'
+TYPE_BOOL = 'b'
+
+NAN = float('nan')
+
+
+def _value_type(value) -> Optional[str]:
+    if isinstance(value, bool):
+        return TYPE_BOOL
+    if isinstance(value, int):
+        return TYPE_INT
+    if isinstance(value, float):
+        return TYPE_FLOAT
+    return None
+
+
+def decode_value(value: float, value_type: Optional[str]):
+    """Stored float back to the type the device returned (None for unread or non-numeric)"""
+    if math.isnan(value):
+        return None
+    if value_type == TYPE_INT:
+        return int(value)
+    if value_type == TYPE_BOOL:
+        return bool(value)
+    return value
+
+
+def _untrack(shm: shared_memory.SharedMemory):
+    """Keep this process's resource tracker from unlinking a segment it only attached to"""
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception as e:
+        logger.debug(f"Could not unregister shared memory {shm.name}: {e}")
+
+
+class SharedSampleRing:
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        magic, version, channels, capacity, mask_words, _, _ = _HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{shm.name} is not a sample ring (version {VERSION})')
+        self.channels = channels
+        self.capacity = capacity
+        self.mask_words = mask_words
+        self.width = channels + 1
+        self.masks_offset = _TABLE_OFFSET + TABLE_SIZE
+        self.rows_offset = self.masks_offset + capacity * mask_words * 8
+        self._masks = shm.buf[self.masks_offset:self.rows_offset].cast('Q')
+        self._rows = shm.buf[self.rows_offset:self.rows_offset + 2 * capacity * self.width * 8].cast('d')
+
+        # Reader-side copy of the channel table
+        self._layout_generation = -1
+        self._columns: Dict[str, int] = {}
+        self._types: Dict[str, Optional[str]] = {}
+        self._classes: Dict[str, Optional[str]] = {}
+
+        # Writer-side state: the row being carried forward
+        self._row = array('d', [NAN] * self.width)
+        self._paths: List[Optional[str]] = []
+
+    @classmethod
+    def create(cls, channels: int = DEFAULT_CHANNELS, capacity: int = DEFAULT_CAPACITY,
+               name: Optional[str] = None) -> 'SharedSampleRing':
+        mask_words = (channels + 63) // 64
+        size = _TABLE_OFFSET + TABLE_SIZE + capacity * mask_words * 8 + 2 * capacity * (channels + 1) * 8
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, channels, capacity, mask_words, 0, 0)
+        _CREATOR_PID.pack_into(shm.buf, _CREATOR_PID_OFFSET, os.getpid())
+        ring = cls(shm, owner=True)
+        ring._write_table()
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, track: bool = False) -> 'SharedSampleRing':
+        """Open an existing ring. Only pass track=True from a process sharing the creator's resource tracker."""
+        shm = shared_memory.SharedMemory(name=name)
+        if not track:
+            _untrack(shm)
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def head(self) -> int:
+        """Number of rows written so far (the next row's absolute index)"""
+        return struct.unpack_from('<Q', self.shm.buf, _HEAD_OFFSET)[0]
+
+    @property
+    def creator_pid(self) -> int:
+        """Pid of the process that created the ring (0 if unknown)"""
+        return _CREATOR_PID.unpack_from(self.shm.buf, _CREATOR_PID_OFFSET)[0]
+
+    @property
+    def layout_generation(self) -> int:
+        return struct.unpack_from('<Q', self.shm.buf, _GENERATION_OFFSET)[0]
+
+    def is_valid(self, index: int) -> bool:
+        """Whether absolute row index is still intact (check after reading it; the writer may be filling head's slot)"""
+        return self.head - index < self.capacity
+
+    # Writer
+
+    def set_channels(self, paths: Dict[str, Optional[str]]):
+        """Make {path: frequency class} the channel set; existing paths keep their column"""
+        changed = False
+        for path in list(self._classes):
+            if path not in paths:
+                self._paths[self._columns.pop(path) - 1] = None
+                del self._classes[path]
+                self._types.pop(path, None)
+                changed = True
+        for path, frequency_class in paths.items():
+            if path in self._columns:
+                if self._classes[path] != frequency_class:
+                    self._classes[path] = frequency_class
+                    changed = True
+                continue
+            if None in self._paths:
+                column = self._paths.index(None) + 1
+            elif len(self._paths) < self.channels:
+                self._paths.append(None)
+                column = len(self._paths)
+            else:
+                logger.warning(f"Sample ring is full ({self.channels} channels), not publishing {path}")
+                continue
+            self._paths[column - 1] = path
+            self._columns[path] = column
+            self._classes[path] = frequency_class
+            self._row[column] = NAN
+            changed = True
+        if changed:
+            self._write_table()
+
+    def write(self, values: Dict[str, Any], timestamp: float):
+        """Append one row: values read now, everything else held from the previous row"""
+        row = self._row
+        mask = [0] * self.mask_words
+        new_types = False
+        for path, value in values.items():
+            column = self._columns.get(path)
+            if column is None:
+                continue
+            value_type = _value_type(value)
+            row[column] = float(value) if value_type else NAN
+            if value_type and self._types.get(path) is None:
+                self._types[path] = value_type
+                new_types = True
+            mask[(column - 1) >> 6] |= 1 << ((column - 1) & 63)
+        if new_types:
+            self._write_table()
+        row[0] = timestamp
+
+        head = self.head
+        slot = head % self.capacity
+        start = slot * self.width
+        self._rows[start:start + self.width] = row
+        mirror = start + self.capacity * self.width
+        self._rows[mirror:mirror + self.width] = row
+        self._masks[slot * self.mask_words:(slot + 1) * self.mask_words] = array('Q', mask)
+        struct.pack_into('<Q', self.shm.buf, _HEAD_OFFSET, head + 1)
+
+    def _write_table(self):
+        table = json.dumps({
+            'paths': self._paths,
+            'types': [self._types.get(path) if path else None for path in self._paths],
+            'classes': [self._classes.get(path) if path else None for path in self._paths],
+        }, separators=(',', ':')).encode()
+        if len(table) + 4 > TABLE_SIZE:
+            raise ValueError('Sample ring channel table is too large')
+        struct.pack_into('<I', self.shm.buf, _TABLE_OFFSET, len(table))
+        self.shm.buf[_TABLE_OFFSET + 4:_TABLE_OFFSET + 4 + len(table)] = table
+        struct.pack_into('<Q', self.shm.buf, _GENERATION_OFFSET, self.layout_generation + 1)
+
+    # Reader
+
+    def _refresh_layout(self):
+        generation = self.layout_generation
+        if generation == self._layout_generation:
+            return
+        while True:
+            length = struct.unpack_from('<I', self.shm.buf, _TABLE_OFFSET)[0]
+            table = bytes(self.shm.buf[_TABLE_OFFSET + 4:_TABLE_OFFSET + 4 + length])
+            # The writer bumps the generation after the table, so a changed generation means a torn copy
+            current = self.layout_generation
+            if current == generation:
+                break
+            generation = current
+        layout = json.loads(table)
+        self._columns = {path: index + 1 for index, path in enumerate(layout['paths']) if path}
+        self._types = {path: value_type for path, value_type in zip(layout['paths'], layout['types']) if path}
+        self._classes = {path: cls for path, cls in zip(layout['paths'], layout['classes']) if path}
+        self._layout_generation = generation
+
+    def columns(self) -> Dict[str, int]:
+        """{path: row column} for every published path"""
+        self._refresh_layout()
+        return dict(self._columns)
+
+    def channel_types(self) -> Dict[str, Optional[str]]:
+        self._refresh_layout()
+        return dict(self._types)
+
+    def frequency_classes(self) -> Dict[str, Optional[str]]:
+        self._refresh_layout()
+        return dict(self._classes)
+
+    def frequency_class(self, path: str) -> Optional[str]:
+        self._refresh_layout()
+        return self._classes.get(path)
+
+    def read_since(self, index: int, limit: Optional[int] = None) -> Tuple[int, List[Tuple[float, Dict[str, Any]]]]:
+        """Rows from absolute index on as (timestamp, {path: value read for that row}).
+
+        Returns the index to continue from. Rows the writer has already
+        overwritten are skipped.
+        """
+        self._refresh_layout()
+        head = self.head
+        start = max(index, head - self.capacity + 1)
+        if limit is not None:
+            start = max(start, head - limit)
+        columns = [(path, column, self._types.get(path)) for path, column in self._columns.items()]
+        rows = []
+        for absolute in range(start, head):
+            slot = absolute % self.capacity
+            row = self._rows[slot * self.width:(slot + 1) * self.width].tolist()
+            mask = self._masks[slot * self.mask_words:(slot + 1) * self.mask_words].tolist()
+            values = {path: decode_value(row[column], value_type) for path, column, value_type in columns
+                      if mask[(column - 1) >> 6] >> ((column - 1) & 63) & 1}
+            rows.append((row[0], values))
+        # Drop rows that were overwritten while being copied
+        lapped = self.head - self.capacity + 1 - start
+        if lapped > 0:
+            rows = rows[lapped:]
+        return head, rows
+
+    def window(self, rows: int) -> Tuple[int, int, int]:
+        """(head, position of the oldest row, row count) of a contiguous window over the latest rows.
+
+        The window ends at head and holds at most capacity - 1 rows (the slot
+        after them may be mid-write); it stays intact while is_valid(head - count).
+        """
+        head = self.head
+        count = max(0, min(rows, head, self.capacity - 1))
+        return head, head % self.capacity + self.capacity - count, count
+
+    def column_view(self, column: int, position: int, count: int) -> memoryview:
+        """Strided float64 view of one column over count rows from position (no copy)"""
+        start = position * self.width + column
+        return self._rows[start:start + count * self.width:self.width]
+
+    def latest(self) -> Tuple[Dict[str, Any], float]:
+        """Latest value of every published path and the time of the row it came from"""
+        self._refresh_layout()
+        head = self.head
+        if not head:
+            return {}, 0.0
+        slot = (head - 1) % self.capacity
+        row = self._rows[slot * self.width:(slot + 1) * self.width].tolist()
+        return {path: decode_value(row[column], self._types.get(path))
+                for path, column in self._columns.items()}, row[0]
+
+    def close(self):
+        self._masks.release()
+        self._rows.release()
+        try:
+            self.shm.close()
+        except BufferError:
+            # Views handed out by column_view() (or numpy arrays over the buffer) are still alive;
+            # the mapping goes away with the last of them
+            logger.debug(f"Sample ring {self.name} still has views, leaving it mapped")
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,877 @@
+"""
+Simulated ODrive v3.6 (firmware 0.5.x) object model
+Mirrors the axis0/axis1 -> motor/encoder/controller/config tree read by
+odrive_telemetry_config.py and the routes, with configurable per-access
+latency imitating libfibre USB round trips. Used by the benchmark suite
+(backend/benchmarks) so backend performance can be measured without hardware.
+
+Each axis also runs a simple physical model: calibration states 3/4/6/7/10
+with realistic durations, a cascaded pos/vel/torque controller driving an
+inertia in closed loop, and the error bits real hardware raises (invalid
+state, phase resistance out of range, CPR/pole-pair mismatch, overspeed,
+watchdog expiry, DC bus undervoltage). The backend uses it when started with
+--simulate N (or ODRIVE_SIMULATE=N).
+"""
+
+import math
+import os
+import random
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+# Latency of a single property read/write over USB full-speed (seconds)
+DEFAULT_READ_LATENCY = 0.0006
+DEFAULT_WRITE_LATENCY = 0.0008
+DEFAULT_DISCOVERY_LATENCY = 0.05
+DEFAULT_JITTER = 0.2
+
+SIMULATE_ENV = 'ODRIVE_SIMULATE'
+SIMULATE_LATENCY_ENV = 'ODRIVE_SIMULATE_LATENCY_MS'
+SIMULATE_TIME_SCALE_ENV = 'ODRIVE_SIMULATE_TIME_SCALE'
+
+# Axis states (ODrive 0.5.x)
+AXIS_STATE_UNDEFINED = 0
+AXIS_STATE_IDLE = 1
+AXIS_STATE_STARTUP_SEQUENCE = 2
+AXIS_STATE_FULL_CALIBRATION_SEQUENCE = 3
+AXIS_STATE_MOTOR_CALIBRATION = 4
+AXIS_STATE_ENCODER_INDEX_SEARCH = 6
+AXIS_STATE_ENCODER_OFFSET_CALIBRATION = 7
+AXIS_STATE_CLOSED_LOOP_CONTROL = 8
+AXIS_STATE_ENCODER_DIR_FIND = 10
+
+CONTROL_MODE_TORQUE = 1
+CONTROL_MODE_VELOCITY = 2
+CONTROL_MODE_POSITION = 3
+INPUT_MODE_VEL_RAMP = 2
+INPUT_MODE_TRAP_TRAJ = 5
+
+# Error bits raised by the model (see odrive_errors.py)
+SYSTEM_ERROR_DC_BUS_UNDER_VOLTAGE = 0x2
+AXIS_ERROR_INVALID_STATE = 0x1
+AXIS_ERROR_MOTOR_FAILED = 0x40
+AXIS_ERROR_ENCODER_FAILED = 0x100
+AXIS_ERROR_CONTROLLER_FAILED = 0x200
+AXIS_ERROR_WATCHDOG_TIMER_EXPIRED = 0x800
+MOTOR_ERROR_PHASE_RESISTANCE_OUT_OF_RANGE = 0x1
+ENCODER_ERROR_CPR_POLEPAIRS_MISMATCH = 0x2
+CONTROLLER_ERROR_OVERSPEED = 0x1
+
+# Calibration durations in simulated seconds
+MOTOR_CALIBRATION_TIME = 3.5
+INDEX_SEARCH_TIME = 1.5
+DIR_FIND_TIME = 2.0
+OFFSET_LOCKIN_TIME = 1.0
+
+PHYSICS_STEP = 0.0005
+# Longer gaps (nobody polling) are fast-forwarded without integrating physics
+MAX_INTEGRATION_GAP = 0.25
+
+# The "real" motor behind each simulated axis
+MOTOR_POLE_PAIRS = 7
+ENCODER_CPR = 8192
+PHASE_RESISTANCE = 0.05
+PHASE_INDUCTANCE = 2.0e-5
+ROTOR_INERTIA = 2.0e-4    # kg*m^2
+VISCOUS_FRICTION = 0.002  # Nm per turn/s
+
+
+class SimLatency:
+    """Per-access delay model: base latency +/- uniform jitter fraction"""
+
+    def __init__(self, read: float = DEFAULT_READ_LATENCY, write: float = DEFAULT_WRITE_LATENCY,
+                 discovery: float = DEFAULT_DISCOVERY_LATENCY, jitter: float = DEFAULT_JITTER,
+                 seed: Optional[int] = None):
+        self.read = read
+        self.write = write
+        self.discovery = discovery
+        self.jitter = jitter
+        self._random = random.Random(seed)
+
+    def _delay(self, base: float):
+        if base <= 0:
+            return
+        if self.jitter:
+            base *= 1 + self._random.uniform(-self.jitter, self.jitter)
+        # time.sleep releases the GIL like a blocking libfibre transfer does
+        time.sleep(base)
+
+    def wait_read(self):
+        self._delay(self.read)
+
+    def wait_write(self):
+        self._delay(self.write)
+
+    def wait_discovery(self):
+        self._delay(self.discovery)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'read_ms': self.read * 1000, 'write_ms': self.write * 1000,
+                'discovery_ms': self.discovery * 1000, 'jitter': self.jitter}
+
+
+def _axis_tree() -> Dict[str, Any]:
+    return {
+        'error': 0,
+        'current_state': AXIS_STATE_IDLE,
+        'requested_state': 0,
+        'is_homed': False,
+        'config': {
+            'startup_motor_calibration': False,
+            'startup_encoder_index_search': False,
+            'startup_encoder_offset_calibration': False,
+            'startup_closed_loop_control': False,
+            'startup_homing': False,
+            'enable_step_dir': False,
+            'step_dir_always_on': False,
+            'enable_sensorless_mode': False,
+            'enable_watchdog': False,
+            'watchdog_timeout': 0.0,
+            'step_gpio_pin': 1,
+            'dir_gpio_pin': 2,
+            'calibration_lockin': {'current': 10.0, 'ramp_time': 0.4, 'ramp_distance': 3.1415927,
+                                   'accel': 20.0, 'vel': 40.0},
+        },
+        'motor': {
+            'error': 0,
+            'is_armed': False,
+            'is_calibrated': False,
+            'current_meas_phB': 0.0,
+            'current_meas_phC': 0.0,
+            'DC_calib_phB': 0.0,
+            'DC_calib_phC': 0.0,
+            'config': {
+                'pre_calibrated': False,
+                'pole_pairs': 7,
+                'calibration_current': 10.0,
+                'resistance_calib_max_voltage': 4.0,
+                'phase_inductance': 0.0,
+                'phase_resistance': 0.0,
+                'torque_constant': 0.04,
+                'motor_type': 0,
+                'current_lim': 10.0,
+                'current_lim_margin': 8.0,
+                'torque_lim': float('inf'),
+                'requested_current_range': 60.0,
+                'current_control_bandwidth': 1000.0,
+            },
+            'current_control': {
+                'Iq_setpoint': 0.0,
+                'Iq_measured': 0.0,
+                'Id_setpoint': 0.0,
+                'Id_measured': 0.0,
+                'I_bus': 0.0,
+                'v_current_control_integral_d': 0.0,
+                'v_current_control_integral_q': 0.0,
+            },
+            'motor_thermistor': {'temperature': 25.0, 'config': {'enabled': False}},
+            'fet_thermistor': {'temperature': 30.0, 'config': {'enabled': True}},
+        },
+        'encoder': {
+            'error': 0,
+            'is_ready': False,
+            'index_found': False,
+            'shadow_count': 0,
+            'count_in_cpr': 0,
+            'pos_estimate': 0.0,
+            'vel_estimate': 0.0,
+            'pos_circular': 0.0,
+            'phase': 0.0,
+            'config': {
+                'mode': 0,
+                'use_index': False,
+                'cpr': 8192,
+                'pre_calibrated': False,
+                'bandwidth': 1000.0,
+                'direction': 0,
+                'calib_range': 0.02,
+                'calib_scan_distance': 50.26548,
+                'calib_scan_omega': 12.566371,
+            },
+        },
+        'controller': {
+            'error': 0,
+            'input_pos': 0.0,
+            'input_vel': 0.0,
+            'input_torque': 0.0,
+            'pos_setpoint': 0.0,
+            'vel_setpoint': 0.0,
+            'torque_setpoint': 0.0,
+            'trajectory_done': True,
+            'config': {
+                'control_mode': 3,
+                'input_mode': 1,
+                'pos_gain': 20.0,
+                'vel_gain': 0.16666667,
+                'vel_integrator_gain': 0.33333334,
+                'vel_limit': 2.0,
+                'vel_limit_tolerance': 1.2,
+                'enable_vel_limit': True,
+                'enable_overspeed_error': True,
+                'input_filter_bandwidth': 2.0,
+                'vel_ramp_rate': 1.0,
+                'inertia': 0.0,
+                'circular_setpoints': False,
+            },
+        },
+        'sensorless_estimator': {'error': 0, 'pll_pos': 0.0, 'vel_estimate': 0.0},
+        'trap_traj': {'config': {'vel_limit': 2.0, 'accel_limit': 0.5, 'decel_limit': 0.5}},
+    }
+
+
+def _device_tree(serial_number: int) -> Dict[str, Any]:
+    return {
+        'vbus_voltage': 24.0,
+        'ibus': 0.0,
+        'error': 0,
+        'serial_number': serial_number,
+        'hw_version_major': 3,
+        'hw_version_minor': 6,
+        'hw_version_variant': 56,
+        'fw_version_major': 0,
+        'fw_version_minor': 5,
+        'fw_version_revision': 6,
+        'fw_version_unreleased': 0,
+        'user_config_loaded': True,
+        'brake_resistor_armed': True,
+        'config': {
+            'dc_bus_overvoltage_trip_level': 59.92,
+            'dc_bus_undervoltage_trip_level': 8.0,
+            'dc_max_positive_current': float('inf'),
+            'dc_max_negative_current': -0.01,
+            'enable_brake_resistor': True,
+            'brake_resistance': 2.0,
+            'ibus_report_filter_k': 1.0,
+            'enable_uart_a': True,
+            'uart_a_baudrate': 115200,
+            'enable_can_a': True,
+            **{f'gpio{n}_mode': 0 for n in range(1, 9)},
+        },
+        'can': {'error': 0, 'config': {'baud_rate': 250000, 'protocol': 1}},
+        'axis0': _axis_tree(),
+        'axis1': _axis_tree(),
+    }
+
+
+class SimulatedObjectLostError(Exception):
+    """Raised on access to an unplugged device (libfibre raises ObjectLostError)"""
+
+
+class SimNode:
+    """One object in the remote tree; leaf reads and writes cost a USB round trip"""
+
+    def __init__(self, device: 'SimulatedODrive', path: str, spec: Dict[str, Any]):
+        children = {}
+        values = {}
+        for name, value in spec.items():
+            child_path = f'{path}.{name}' if path else name
+            if isinstance(value, dict):
+                children[name] = SimNode(device, child_path, value)
+            else:
+                values[name] = value
+        object.__setattr__(self, '_device', device)
+        object.__setattr__(self, '_path', path)
+        object.__setattr__(self, '_children', children)
+        object.__setattr__(self, '_values', values)
+        object.__setattr__(self, '_functions', {})
+
+    def __getattr__(self, name):
+        children = object.__getattribute__(self, '_children')
+        if name in children:
+            return children[name]
+        functions = object.__getattribute__(self, '_functions')
+        if name in functions:
+            return functions[name]
+        values = object.__getattribute__(self, '_values')
+        if name in values:
+            device = object.__getattribute__(self, '_device')
+            device._before_read(self._path, name)
+            return values[name]
+        raise AttributeError(f"'{self._path or 'device'}' has no attribute '{name}'")
+
+    def __setattr__(self, name, value):
+        values = object.__getattribute__(self, '_values')
+        if name not in values:
+            raise AttributeError(f"'{self._path or 'device'}' has no writable attribute '{name}'")
+        device = object.__getattribute__(self, '_device')
+        device._before_write(self._path, name, value)
+        with device._state_lock:
+            values[name] = type(values[name])(value) if isinstance(values[name], (int, float)) \
+                and not isinstance(values[name], bool) else value
+        device._after_write(self._path, name, values[name])
+
+    def __dir__(self):
+        return list(self._children) + list(self._values) + list(self._functions)
+
+    def _add_function(self, name: str, func):
+        device = self._device
+
+        def remote_call(*args, **kwargs):
+            device._before_call(self._path, name)
+            return func(*args, **kwargs)
+
+        self._functions[name] = remote_call
+
+    def _get(self, name: str):
+        """Local access without simulated latency (for the device model itself)"""
+        return self._values[name]
+
+    def _set(self, name: str, value):
+        self._values[name] = value
+
+    def _leaf_paths(self) -> List[str]:
+        prefix = f'{self._path}.' if self._path else ''
+        paths = [prefix + name for name in self._values]
+        for child in self._children.values():
+            paths.extend(child._leaf_paths())
+        return paths
+
+
+class SimulatedODrive(SimNode):
+    """Root of a simulated device, counting every remote access"""
+
+    def __init__(self, serial_number: int = 0x3063366C3235, latency: Optional[SimLatency] = None,
+                 time_scale: float = 1.0, seed: Optional[int] = None):
+        object.__setattr__(self, 'latency', latency or SimLatency())
+        object.__setattr__(self, 'time_scale', time_scale)
+        object.__setattr__(self, 'reads', 0)
+        object.__setattr__(self, 'writes', 0)
+        object.__setattr__(self, 'calls', 0)
+        object.__setattr__(self, 'sim_time', 0.0)
+        object.__setattr__(self, 'unplugged', False)
+        object.__setattr__(self, '_last_advance', time.monotonic())
+        object.__setattr__(self, '_random', random.Random(seed if seed is not None else serial_number))
+        object.__setattr__(self, '_state_lock', threading.RLock())
+        super().__init__(self, '', _device_tree(serial_number))
+        object.__setattr__(self, 'axis_models', [AxisModel(self, getattr(self, f'axis{n}'), n) for n in (0, 1)])
+        self._add_function('save_configuration', self._save_configuration)
+        self._add_function('erase_configuration', self._erase_configuration)
+        self._add_function('reboot', self._reboot)
+        self._add_function('clear_errors', self._clear_errors)
+        self._add_function('get_adc_voltage', self._get_adc_voltage)
+        for model in self.axis_models:
+            model.axis._add_function('watchdog_feed', model.feed_watchdog)
+            model.axis._add_function('clear_errors', lambda axis=model.axis: self._clear_axis_errors(axis))
+
+    # Access hooks
+    def _check_plugged(self):
+        if self.unplugged:
+            raise SimulatedObjectLostError('Device was disconnected')
+
+    def _before_read(self, path: str, name: str):
+        self._check_plugged()
+        object.__setattr__(self, 'reads', self.reads + 1)
+        self.latency.wait_read()
+        self.advance()
+
+    def _before_write(self, path: str, name: str, value):
+        self._check_plugged()
+        object.__setattr__(self, 'writes', self.writes + 1)
+        self.latency.wait_write()
+        self.advance()
+
+    def _after_write(self, path: str, name: str, value):
+        for model in self.axis_models:
+            if path.startswith(model.prefix):
+                with self._state_lock:
+                    model.on_write(path[len(model.prefix):], name, value)
+                break
+
+    def _before_call(self, path: str, name: str):
+        self._check_plugged()
+        object.__setattr__(self, 'calls', self.calls + 1)
+        self.latency.wait_write()
+        self.advance()
+
+    def advance(self):
+        """Bring the physical model up to the current wall-clock time"""
+        with self._state_lock:
+            now = time.monotonic()
+            elapsed = (now - self._last_advance) * self.time_scale
+            object.__setattr__(self, '_last_advance', now)
+            if elapsed <= 0:
+                return
+            if elapsed > MAX_INTEGRATION_GAP:
+                skipped = elapsed - MAX_INTEGRATION_GAP
+                object.__setattr__(self, 'sim_time', self.sim_time + skipped)
+                for model in self.axis_models:
+                    model.fast_forward(skipped)
+                elapsed = MAX_INTEGRATION_GAP
+            while elapsed > 1e-9:
+                dt = min(PHYSICS_STEP, elapsed)
+                object.__setattr__(self, 'sim_time', self.sim_time + dt)
+                for model in self.axis_models:
+                    model.step(dt)
+                elapsed -= dt
+            self._update_bus()
+
+    def _update_bus(self):
+        power = sum(model.electrical_power() for model in self.axis_models)
+        vbus = self._vbus_nominal - 0.05 * max(power / self._vbus_nominal, 0.0) + self._random.gauss(0, 0.02)
+        self._set('vbus_voltage', vbus)
+        self._set('ibus', power / max(vbus, 1.0))
+        if vbus < self.config._get('dc_bus_undervoltage_trip_level'):
+            self._set('error', self._get('error') | SYSTEM_ERROR_DC_BUS_UNDER_VOLTAGE)
+            for model in self.axis_models:
+                model.enter_idle()
+
+    _vbus_nominal = 24.0
+
+    # Fault injection for load tests
+    def set_supply_voltage(self, voltage: float):
+        """Change the simulated power supply (drop below 8V to trip undervoltage)"""
+        with self._state_lock:
+            object.__setattr__(self, '_vbus_nominal', float(voltage))
+
+    def inject_error(self, axis: int, component: str, bits: int):
+        """Raise error bits on an axis component ('axis', 'motor', 'encoder', 'controller')"""
+        with self._state_lock:
+            model = self.axis_models[axis]
+            node = model.axis if component == 'axis' else getattr(model.axis, component)
+            node._set('error', node._get('error') | bits)
+            if component != 'axis':
+                failed = {'motor': AXIS_ERROR_MOTOR_FAILED, 'encoder': AXIS_ERROR_ENCODER_FAILED,
+                          'controller': AXIS_ERROR_CONTROLLER_FAILED}.get(component, 0)
+                model.axis._set('error', model.axis._get('error') | failed)
+            model.enter_idle()
+
+    def unplug(self):
+        """Simulate pulling the USB cable: every access raises until replug()"""
+        object.__setattr__(self, 'unplugged', True)
+
+    def replug(self):
+        object.__setattr__(self, 'unplugged', False)
+
+    def reset_counters(self):
+        object.__setattr__(self, 'reads', 0)
+        object.__setattr__(self, 'writes', 0)
+        object.__setattr__(self, 'calls', 0)
+
+    def get_counters(self) -> Dict[str, int]:
+        return {'reads': self.reads, 'writes': self.writes, 'calls': self.calls}
+
+    def leaf_paths(self) -> List[str]:
+        return self._leaf_paths()
+
+    def config_paths(self) -> List[str]:
+        """Every writable configuration leaf, as the configuration UI reads them"""
+        return [p for p in self._leaf_paths() if '.config.' in f'.{p}']
+
+    # Remote functions
+    def _save_configuration(self):
+        return True
+
+    def _erase_configuration(self):
+        return None
+
+    def _reboot(self):
+        return None
+
+    def _clear_errors(self):
+        with self._state_lock:
+            self._set('error', 0)
+            for axis in (self.axis0, self.axis1):
+                self._clear_axis_errors(axis)
+
+    def _clear_axis_errors(self, axis: SimNode):
+        with self._state_lock:
+            axis._set('error', 0)
+            for name in ('motor', 'encoder', 'controller', 'sensorless_estimator'):
+                getattr(axis, name)._set('error', 0)
+
+    def _get_adc_voltage(self, gpio: int) -> float:
+        return 0.0
+
+
+class AxisModel:
+    """State machine and mechanics of one simulated axis"""
+
+    def __init__(self, device: SimulatedODrive, axis: SimNode, index: int):
+        self.device = device
+        self.axis = axis
+        self.index = index
+        self.prefix = f'axis{index}'
+        self.motor = axis.motor
+        self.encoder = axis.encoder
+        self.controller = axis.controller
+        # Alternate wiring between axes so polarity calibration has something to find
+        self.wiring_direction = 1 if index == 0 else -1
+        self.pos = 0.0  # Rotor position in turns
+        self.vel = 0.0  # Turns/s
+        self.torque = 0.0
+        self.task_chain: List[int] = []
+        self.task_started = 0.0
+        self.task_duration = 0.0
+        self.vel_integrator = 0.0
+        self.last_feed = 0.0
+
+    # Writes from the host
+    def on_write(self, path: str, name: str, value):
+        if path == '' and name == 'requested_state':
+            self.request_state(int(value))
+        elif path == '.config' and name == 'enable_watchdog':
+            self.last_feed = self.device.sim_time
+
+    def feed_watchdog(self):
+        with self.device._state_lock:
+            self.last_feed = self.device.sim_time
+
+    def request_state(self, state: int):
+        self.axis._set('requested_state', AXIS_STATE_UNDEFINED)
+        if state == AXIS_STATE_IDLE:
+            self.enter_idle()
+            return
+        if self.axis._get('error') or self.device._get('error'):
+            # Firmware refuses to leave idle until errors are cleared
+            return
+
+        motor_calibrated = self.motor._get('is_calibrated')
+        config = self.axis.config
+        if state == AXIS_STATE_FULL_CALIBRATION_SEQUENCE:
+            chain = [AXIS_STATE_MOTOR_CALIBRATION]
+            if self.encoder.config._get('use_index'):
+                chain.append(AXIS_STATE_ENCODER_INDEX_SEARCH)
+            chain += [AXIS_STATE_ENCODER_DIR_FIND, AXIS_STATE_ENCODER_OFFSET_CALIBRATION]
+            chain.append(AXIS_STATE_CLOSED_LOOP_CONTROL if config._get('startup_closed_loop_control')
+                         else AXIS_STATE_IDLE)
+        elif state == AXIS_STATE_STARTUP_SEQUENCE:
+            chain = []
+            if config._get('startup_motor_calibration'):
+                chain.append(AXIS_STATE_MOTOR_CALIBRATION)
+            if config._get('startup_encoder_index_search'):
+                chain.append(AXIS_STATE_ENCODER_INDEX_SEARCH)
+            if config._get('startup_encoder_offset_calibration'):
+                chain.append(AXIS_STATE_ENCODER_OFFSET_CALIBRATION)
+            chain.append(AXIS_STATE_CLOSED_LOOP_CONTROL if config._get('startup_closed_loop_control')
+                         else AXIS_STATE_IDLE)
+        elif state in (AXIS_STATE_ENCODER_DIR_FIND, AXIS_STATE_ENCODER_OFFSET_CALIBRATION,
+                       AXIS_STATE_ENCODER_INDEX_SEARCH):
+            if not motor_calibrated:
+                self.fail(AXIS_ERROR_INVALID_STATE)
+                return
+            chain = [state, AXIS_STATE_IDLE]
+        elif state == AXIS_STATE_MOTOR_CALIBRATION:
+            chain = [state, AXIS_STATE_IDLE]
+        elif state == AXIS_STATE_CLOSED_LOOP_CONTROL:
+            chain = [state]
+        else:
+            self.fail(AXIS_ERROR_INVALID_STATE)
+            return
+        self.task_chain = chain
+        self.start_next_task()
+
+    def start_next_task(self, started_at: Optional[float] = None):
+        if not self.task_chain:
+            self.enter_idle()
+            return
+        state = self.task_chain.pop(0)
+        if state == AXIS_STATE_IDLE:
+            self.enter_idle()
+            return
+        if state == AXIS_STATE_CLOSED_LOOP_CONTROL:
+            if not (self.motor._get('is_calibrated') and self.encoder._get('is_ready')):
+                self.fail(AXIS_ERROR_INVALID_STATE)
+                return
+            controller = self.controller
+            controller._set('input_pos', self.pos_estimate())
+            controller._set('pos_setpoint', self.pos_estimate())
+            controller._set('input_vel', 0.0)
+            controller._set('input_torque', 0.0)
+            self.vel_integrator = 0.0
+            self.last_feed = self.device.sim_time
+            self.motor._set('is_armed', True)
+            self.axis._set('current_state', state)
+            self.task_duration = 0.0
+            return
+
+        durations = {
+            AXIS_STATE_MOTOR_CALIBRATION: MOTOR_CALIBRATION_TIME,
+            AXIS_STATE_ENCODER_INDEX_SEARCH: INDEX_SEARCH_TIME if self.encoder.config._get('use_index') else 0.0,
+            AXIS_STATE_ENCODER_DIR_FIND: DIR_FIND_TIME,
+            AXIS_STATE_ENCODER_OFFSET_CALIBRATION: OFFSET_LOCKIN_TIME + self.offset_scan_time(),
+        }
+        self.axis._set('current_state', state)
+        self.motor._set('is_armed', True)
+        self.task_started = self.device.sim_time if started_at is None else started_at
+        self.task_duration = durations[state]
+
+    def offset_scan_time(self) -> float:
+        config = self.encoder.config
+        omega = config._get('calib_scan_omega') or 12.566371
+        return 2 * config._get('calib_scan_distance') / omega
+
+    def finish_task(self, state: int) -> bool:
+        """Apply the outcome of a calibration step; False if it raised an error"""
+        motor_config = self.motor.config
+        encoder_config = self.encoder.config
+        if state == AXIS_STATE_MOTOR_CALIBRATION:
+            # The measurement needs I_cal * R of voltage - too little headroom fails like the firmware
+            if motor_config._get('calibration_current') * PHASE_RESISTANCE > \
+                    motor_config._get('resistance_calib_max_voltage'):
+                self.motor._set('error', self.motor._get('error') | MOTOR_ERROR_PHASE_RESISTANCE_OUT_OF_RANGE)
+                self.fail(AXIS_ERROR_MOTOR_FAILED)
+                return False
+            rng = self.device._random
+            motor_config._set('phase_resistance', PHASE_RESISTANCE * (1 + rng.uniform(-0.03, 0.03)))
+            motor_config._set('phase_inductance', PHASE_INDUCTANCE * (1 + rng.uniform(-0.03, 0.03)))
+            self.motor._set('is_calibrated', True)
+        elif state == AXIS_STATE_ENCODER_INDEX_SEARCH:
+            self.encoder._set('index_found', True)
+        elif state == AXIS_STATE_ENCODER_DIR_FIND:
+            encoder_config._set('direction', self.wiring_direction)
+        elif state == AXIS_STATE_ENCODER_OFFSET_CALIBRATION:
+            if encoder_config._get('cpr') != ENCODER_CPR or motor_config._get('pole_pairs') != MOTOR_POLE_PAIRS:
+                self.encoder._set('error', self.encoder._get('error') | ENCODER_ERROR_CPR_POLEPAIRS_MISMATCH)
+                self.fail(AXIS_ERROR_ENCODER_FAILED)
+                return False
+            if not encoder_config._get('direction'):
+                encoder_config._set('direction', self.wiring_direction)
+            self.encoder._set('is_ready', True)
+        return True
+
+    def fail(self, axis_error: int):
+        self.axis._set('error', self.axis._get('error') | axis_error)
+        self.enter_idle()
+
+    def enter_idle(self):
+        self.task_chain = []
+        self.task_duration = 0.0
+        self.torque = 0.0
+        self.axis._set('current_state', AXIS_STATE_IDLE)
+        self.motor._set('is_armed', False)
+        self.motor.current_control._set('Iq_setpoint', 0.0)
+        self.controller._set('torque_setpoint', 0.0)
+
+    def fast_forward(self, seconds: float):
+        """Complete calibration steps that would have finished during an unobserved gap"""
+        state = self.axis._get('current_state')
+        while state not in (AXIS_STATE_IDLE, AXIS_STATE_CLOSED_LOOP_CONTROL):
+            finished_at = self.task_started + self.task_duration
+            if self.device.sim_time < finished_at or not self.finish_task(state):
+                break
+            self.start_next_task(started_at=finished_at)
+            state = self.axis._get('current_state')
+        if state == AXIS_STATE_CLOSED_LOOP_CONTROL:
+            self.check_watchdog()
+            self.settle(seconds)
+        else:
+            self.vel = 0.0
+
+    def settle(self, seconds: float):
+        """Jump the closed loop to its steady state instead of integrating a long gap"""
+        controller = self.controller
+        config = controller.config
+        to_rotor = self.wiring_direction * (self.encoder.config._get('direction') or 1)
+        vel_limit = config._get('vel_limit')
+        if config._get('control_mode') >= CONTROL_MODE_POSITION:
+            target = controller._get('input_pos')
+            travel = target - self.pos_estimate()
+            if abs(travel) <= vel_limit * seconds:
+                self.pos = target * to_rotor
+                self.vel = 0.0
+            else:
+                self.pos += math.copysign(vel_limit * seconds, travel) * to_rotor
+            controller._set('pos_setpoint', target)
+        elif config._get('control_mode') == CONTROL_MODE_VELOCITY:
+            vel = max(-vel_limit, min(vel_limit, controller._get('input_vel')))
+            self.vel = vel * to_rotor
+            self.pos += self.vel * seconds
+            controller._set('vel_setpoint', vel)
+
+    def check_watchdog(self):
+        config = self.axis.config
+        timeout = config._get('watchdog_timeout')
+        if config._get('enable_watchdog') and timeout > 0 and self.device.sim_time - self.last_feed > timeout:
+            self.fail(AXIS_ERROR_WATCHDOG_TIMER_EXPIRED)
+
+    # Mechanics
+    def pos_estimate(self) -> float:
+        direction = self.encoder.config._get('direction') or 1
+        return self.pos * self.wiring_direction * direction
+
+    def step(self, dt: float):
+        state = self.axis._get('current_state')
+        motor_config = self.motor.config
+        torque_constant = motor_config._get('torque_constant') or 0.04
+
+        if state == AXIS_STATE_CLOSED_LOOP_CONTROL:
+            self.torque = self.control(dt, torque_constant)
+            self.check_watchdog()
+            if self.axis._get('current_state') != AXIS_STATE_CLOSED_LOOP_CONTROL:
+                self.torque = 0.0
+        elif state == AXIS_STATE_IDLE:
+            self.torque = 0.0
+            if self.vel == 0.0:
+                return
+        else:
+            self.calibration_motion(state, dt)
+            if self.device.sim_time - self.task_started >= self.task_duration:
+                if self.finish_task(state):
+                    self.start_next_task(started_at=self.task_started + self.task_duration)
+            self.update_measurements(torque_constant)
+            return
+
+        # Semi-implicit Euler on J * dw/dt = torque - b * w (w in turns/s)
+        accel = (self.torque - VISCOUS_FRICTION * self.vel) / (2 * math.pi * ROTOR_INERTIA)
+        self.vel += accel * dt
+        if state == AXIS_STATE_IDLE and abs(self.vel) < 1e-4:
+            self.vel = 0.0
+        self.pos += self.vel * dt
+
+        controller_config = self.controller.config
+        if (state == AXIS_STATE_CLOSED_LOOP_CONTROL and controller_config._get('enable_overspeed_error')
+                and abs(self.vel) > controller_config._get('vel_limit') * controller_config._get('vel_limit_tolerance')):
+            self.controller._set('error', self.controller._get('error') | CONTROLLER_ERROR_OVERSPEED)
+            self.fail(AXIS_ERROR_CONTROLLER_FAILED)
+        self.update_measurements(torque_constant)
+
+    def control(self, dt: float, torque_constant: float) -> float:
+        """Cascaded position -> velocity -> torque controller (firmware controller.cpp)"""
+        controller = self.controller
+        config = controller.config
+        control_mode = config._get('control_mode')
+        input_mode = config._get('input_mode')
+        vel_limit = config._get('vel_limit')
+        pos = self.pos_estimate()
+        vel = self.vel * self.wiring_direction * (self.encoder.config._get('direction') or 1)
+
+        input_pos = controller._get('input_pos')
+        pos_setpoint = controller._get('pos_setpoint')
+        if input_mode == INPUT_MODE_TRAP_TRAJ:
+            step = self.axis.trap_traj.config._get('vel_limit') * dt
+            pos_setpoint += max(-step, min(step, input_pos - pos_setpoint))
+            controller._set('trajectory_done', abs(input_pos - pos_setpoint) < 1e-6)
+        else:
+            pos_setpoint = input_pos
+
+        vel_setpoint = controller._get('input_vel')
+        if input_mode == INPUT_MODE_VEL_RAMP and control_mode == CONTROL_MODE_VELOCITY:
+            ramp = config._get('vel_ramp_rate') * dt
+            current = controller._get('vel_setpoint')
+            vel_setpoint = current + max(-ramp, min(ramp, vel_setpoint - current))
+        if control_mode >= CONTROL_MODE_POSITION:
+            vel_setpoint += config._get('pos_gain') * (pos_setpoint - pos)
+        if config._get('enable_vel_limit'):
+            vel_setpoint = max(-vel_limit, min(vel_limit, vel_setpoint))
+
+        torque = controller._get('input_torque')
+        if control_mode >= CONTROL_MODE_VELOCITY:
+            vel_error = vel_setpoint - vel
+            torque += config._get('vel_gain') * vel_error + self.vel_integrator
+            self.vel_integrator += config._get('vel_integrator_gain') * vel_error * dt
+
+        motor_config = self.motor.config
+        torque_limit = min(motor_config._get('torque_lim'), motor_config._get('current_lim') * torque_constant)
+        if abs(torque) > torque_limit:
+            torque = math.copysign(torque_limit, torque)
+            self.vel_integrator *= 0.99  # Anti-windup while saturated
+
+        controller._set('pos_setpoint', pos_setpoint)
+        controller._set('vel_setpoint', vel_setpoint)
+        controller._set('torque_setpoint', torque)
+        # Output torque in rotor coordinates
+        return torque * self.wiring_direction * (self.encoder.config._get('direction') or 1)
+
+    def calibration_motion(self, state: int, dt: float):
+        elapsed = self.device.sim_time - self.task_started
+        if state == AXIS_STATE_MOTOR_CALIBRATION:
+            self.vel = 0.0
+            current = self.motor.config._get('calibration_current')
+            # Resistance then inductance measurement: DC current followed by a square wave
+            self.motor.current_control._set('Iq_setpoint', current if elapsed < 2.0 or int(elapsed * 1000) % 2 else -current)
+            return
+        lockin = self.axis.config.calibration_lockin
+        self.motor.current_control._set('Iq_setpoint', lockin._get('current'))
+        scan_vel = (self.encoder.config._get('calib_scan_omega') or 12.566371) / (2 * math.pi * MOTOR_POLE_PAIRS)
+        if state == AXIS_STATE_ENCODER_OFFSET_CALIBRATION:
+            # Lock in, scan forward, scan back
+            scan = elapsed - OFFSET_LOCKIN_TIME
+            half = self.offset_scan_time() / 2
+            self.vel = 0.0 if scan < 0 else (scan_vel if scan < half else -scan_vel)
+        elif state in (AXIS_STATE_ENCODER_DIR_FIND, AXIS_STATE_ENCODER_INDEX_SEARCH):
+            self.vel = scan_vel
+        self.pos += self.vel * dt
+
+    def update_measurements(self, torque_constant: float):
+        rng = self.device._random
+        current_control = self.motor.current_control
+        if self.axis._get('current_state') == AXIS_STATE_CLOSED_LOOP_CONTROL:
+            current_control._set('Iq_setpoint', self.torque / torque_constant)
+        elif self.axis._get('current_state') == AXIS_STATE_IDLE:
+            current_control._set('Iq_setpoint', 0.0)
+        iq = current_control._get('Iq_setpoint')
+        current_control._set('Iq_measured', iq + rng.gauss(0, 0.01))
+        current_control._set('Id_measured', rng.gauss(0, 0.01))
+
+        direction = self.encoder.config._get('direction') or 1
+        pos = self.pos * self.wiring_direction * direction
+        cpr = self.encoder.config._get('cpr') or ENCODER_CPR
+        self.encoder._set('pos_estimate', pos)
+        self.encoder._set('vel_estimate', self.vel * self.wiring_direction * direction)
+        self.encoder._set('shadow_count', int(pos * cpr))
+        self.encoder._set('count_in_cpr', int(pos * cpr) % cpr)
+        self.encoder._set('pos_circular', pos % 1.0)
+
+        # First-order thermal model driven by I^2 R losses
+        for node, ambient, gain in ((self.motor.motor_thermistor, 25.0, 0.5), (self.motor.fet_thermistor, 30.0, 0.2)):
+            temperature = node._get('temperature')
+            node._set('temperature', temperature + (ambient + gain * iq * iq - temperature) * 1e-4)
+
+    def electrical_power(self) -> float:
+        iq = self.motor.current_control._get('Iq_setpoint')
+        mechanical = self.torque * self.vel * 2 * math.pi
+        return 1.5 * iq * iq * PHASE_RESISTANCE + mechanical
+
+
+class SimulatedDeviceFinder:
+    """Drop-in for odrive.find_any() returning simulated devices"""
+
+    path_prefix = 'SIM'
+
+    def __init__(self, devices: List[SimulatedODrive], latency: Optional[SimLatency] = None):
+        self.devices = devices
+        self.latency = latency or (devices[0].latency if devices else SimLatency())
+        self.find_count = 0
+
+    def __call__(self, timeout: float = None, serial: Optional[str] = None) -> Optional[SimulatedODrive]:
+        self.find_count += 1
+        self.latency.wait_discovery()
+        devices = [device for device in self.devices if not device.unplugged]
+        if serial:
+            for device in devices:
+                if hex(device._get('serial_number')) == serial:
+                    return device
+        return devices[0] if devices else None
+
+    def find_all(self, timeout: float = None) -> List[SimulatedODrive]:
+        self.find_count += 1
+        self.latency.wait_discovery()
+        return [device for device in self.devices if not device.unplugged]
+
+
+def create_simulated_devices(count: int = 1, latency: Optional[SimLatency] = None,
+                             base_serial: int = 0x3063366C3235, time_scale: float = 1.0) -> List[SimulatedODrive]:
+    latency = latency or SimLatency()
+    return [SimulatedODrive(serial_number=base_serial + index, latency=latency, time_scale=time_scale)
+            for index in range(count)]
+
+
+def get_simulated_device_count() -> int:
+    try:
+        return max(0, int(os.environ.get(SIMULATE_ENV, '0')))
+    except ValueError:
+        return 0
+
+
+def create_simulated_finder_from_env() -> Optional[SimulatedDeviceFinder]:
+    """Build the finder for --simulate N / ODRIVE_SIMULATE=N, or None for real hardware"""
+    count = get_simulated_device_count()
+    if not count:
+        return None
+    latency = SimLatency()
+    if os.environ.get(SIMULATE_LATENCY_ENV):
+        read = float(os.environ[SIMULATE_LATENCY_ENV]) / 1000.0
+        latency = SimLatency(read=read, write=read * 4 / 3)
+    time_scale = float(os.environ.get(SIMULATE_TIME_SCALE_ENV, '1') or 1)
+    return SimulatedDeviceFinder(create_simulated_devices(count, latency, time_scale=time_scale), latency)
@@ -0,0 +1,254 @@
+"""
+Staged backend startup
+The HTTP server binds as soon as Flask and the blueprints are loaded; heavy
+device libraries (odrive/libfibre, pyusb) are imported on a background
+thread afterwards. Every phase is timed so startup regressions are visible
+from /api/health.
+
+Setting ODRIVE_STARTUP_PROFILE=1 additionally records the wall time of
+every import (a structured `-X importtime`) and writes the full profile as
+JSON to ODRIVE_STARTUP_PROFILE_PATH (default: temp dir).
+"""
+
+import importlib
+import importlib.abc
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Imported off the request path - the first scan/connect waits for them if needed
+DEFERRED_MODULES = ['odrive', 'usb.core', 'usb.util']
+
+PROFILE_ENV = 'ODRIVE_STARTUP_PROFILE'
+PROFILE_PATH_ENV = 'ODRIVE_STARTUP_PROFILE_PATH'
+
+
+class StartupTimeline:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.phases: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.t0) * 1000
+
+    def mark(self, name: str):
+        """Record that a startup milestone has been reached"""
+        with self._lock:
+            self.phases.append({'phase': name, 'at_ms': round(self.elapsed_ms(), 2)})
+
+    def mark_once(self, name: str) -> bool:
+        """Record a milestone only the first time it is reached"""
+        with self._lock:
+            if any(p['phase'] == name for p in self.phases):
+                return False
+            self.phases.append({'phase': name, 'at_ms': round(self.elapsed_ms(), 2)})
+        return True
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a startup phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.phases.append({
+                    'phase': name,
+                    'at_ms': round(self.elapsed_ms(), 2),
+                    'duration_ms': round(duration, 2),
+                    'thread': threading.current_thread().name,
+                })
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            phases = list(self.phases)
+        return {
+            'uptime_ms': round(self.elapsed_ms(), 2),
+            'device_libraries_ready': device_libraries_ready(),
+            'phases': phases,
+        }
+
+
+class _TimingLoader:
+    """Wraps a module loader to time exec_module()"""
+
+    def __init__(self, loader, profiler: 'ImportProfiler'):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        create = getattr(self._loader, 'create_module', None)
+        return create(spec) if create else None
+
+    def exec_module(self, module):
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        self._profiler.enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.exit(module.__name__)
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """Meta path hook recording self and cumulative import time per module"""
+
+    def __init__(self):
+        self.enabled = False
+        self.records: List[Dict[str, Any]] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def install(self):
+        if not self.enabled:
+            sys.meta_path.insert(0, self)
+            self.enabled = True
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, 'finding', False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                        spec.loader = _TimingLoader(spec.loader, self)
+                    return spec
+            return None
+        finally:
+            self._local.finding = False
+
+    def enter(self, name: str):
+        # [name, start, time spent in nested imports]
+        self._stack().append([name, time.perf_counter(), 0.0])
+
+    def exit(self, name: str):
+        stack = self._stack()
+        if not stack:
+            return
+        _, started, nested = stack.pop()
+        cumulative = time.perf_counter() - started
+        if stack:
+            stack[-1][2] += cumulative
+        with self._lock:
+            self.records.append({
+                'module': name,
+                'parent': stack[-1][0] if stack else None,
+                'depth': len(stack),
+                'self_ms': round((cumulative - nested) * 1000, 3),
+                'cumulative_ms': round(cumulative * 1000, 3),
+                'at_ms': round(timeline.elapsed_ms(), 2),
+                'thread': threading.current_thread().name,
+            })
+
+    def get_records(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.records)
+
+
+timeline = StartupTimeline()
+import_profiler = ImportProfiler()
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get(PROFILE_ENV) == '1'
+
+
+def get_profile_path() -> str:
+    return os.environ.get(PROFILE_PATH_ENV) or os.path.join(tempfile.gettempdir(),
+                                                            'odrive_gui_startup_profile.json')
+
+
+def get_startup_profile() -> Dict[str, Any]:
+    """Full startup profile: phase timeline plus per-import timings"""
+    imports = import_profiler.get_records()
+    top_level = [r for r in imports if r['depth'] == 0]
+    return {
+        'enabled': profiling_enabled(),
+        'frozen': bool(getattr(sys, 'frozen', False)),
+        'timeline': timeline.report(),
+        'imports': {
+            'count': len(imports),
+            'total_ms': round(sum(r['cumulative_ms'] for r in top_level), 2),
+            'slowest_self': sorted(imports, key=lambda r: r['self_ms'], reverse=True)[:25],
+            'modules': imports,
+        },
+    }
+
+
+def save_startup_profile(path: Optional[str] = None) -> Optional[str]:
+    """Write the startup profile as JSON when profiling is enabled"""
+    if not profiling_enabled():
+        return None
+    path = path or get_profile_path()
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(get_startup_profile(), f, indent=2)
+        logger.info(f"Startup profile written to {path}")
+        return path
+    except OSError as e:
+        logger.warning(f"Could not write startup profile: {e}")
+        return None
+
+
+# Install as early as possible: entry points import this module before anything heavy
+if profiling_enabled():
+    import_profiler.install()
+
+_preload_done = threading.Event()
+_preload_started = False
+_preload_lock = threading.Lock()
+
+
+def _preload_device_libraries():
+    try:
+        for module_name in DEFERRED_MODULES:
+            try:
+                with timeline.phase(f'import {module_name}'):
+                    importlib.import_module(module_name)
+            except Exception as e:
+                logger.warning(f"Deferred import of {module_name} failed: {e}")
+    finally:
+        _preload_done.set()
+        timeline.mark('device libraries ready')
+        save_startup_profile()
+
+
+def start_background_preload():
+    """Import device libraries on a background thread (idempotent)"""
+    global _preload_started
+    with _preload_lock:
+        if _preload_started:
+            return
+        _preload_started = True
+    threading.Thread(target=_preload_device_libraries, name='DeviceLibraryPreload', daemon=True).start()
+
+
+def device_libraries_ready() -> bool:
+    return _preload_done.is_set()
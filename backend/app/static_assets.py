@@ -0,0 +1,193 @@
+"""
+Static asset serving for the built frontend (frontend/dist)
+Indexes dist/ once into an in-memory manifest of file metadata (bodies are read
+on demand), serves the .br/.gz variants the frontend build writes (or
+compresses at a fast level and caches the result), and answers hashed Vite
+bundles with immutable cache headers and ETag/304.
+"""
+
+import gzip
+import logging
+import mimetypes
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.html'
+
+# Vite emits bundles as assets/<name>-<hash>.<ext>
+FINGERPRINT_PATTERN = re.compile(r'(^|/)assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$')
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml',
+                      'application/wasm', 'application/xml')
+MIN_COMPRESS_SIZE = 1024
+
+# On-the-fly levels when the build has no precompressed variant; the maximum
+# levels (brotli 11, gzip 9) can stall a cold page load on slow machines
+BROTLI_QUALITY = 5
+GZIP_LEVEL = 6
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Windows registries frequently map .js to text/plain, which browsers refuse for modules
+MIMETYPE_OVERRIDES = {
+    '.js': 'application/javascript',
+    '.mjs': 'application/javascript',
+    '.css': 'text/css',
+    '.svg': 'image/svg+xml',
+    '.json': 'application/json',
+    '.wasm': 'application/wasm',
+    '.ico': 'image/x-icon',
+}
+
+# Minimum seconds between rescans triggered by requests for unknown files
+RESCAN_INTERVAL = 2.0
+
+
+class StaticAsset:
+    def __init__(self, rel_path: str, abs_path: str):
+        self.rel_path = rel_path
+        self.abs_path = abs_path
+        ext = os.path.splitext(rel_path)[1].lower()
+        self.mimetype = MIMETYPE_OVERRIDES.get(ext) or mimetypes.guess_type(rel_path)[0] or 'application/octet-stream'
+        self.immutable = bool(FINGERPRINT_PATTERN.search(rel_path))
+        self.compressible = self.mimetype.startswith(COMPRESSIBLE_TYPES)
+        self.precompressed: Dict[str, str] = {}  # encoding -> path of .br/.gz file
+        self._compressed: Dict[str, bytes] = {}   # encoding ('br', 'gzip') -> bytes compressed here
+        self._lock = threading.Lock()
+
+        stat = os.stat(abs_path)
+        self.size = stat.st_size
+        self.etag = f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def available_encodings(self):
+        encodings = set(self.precompressed)
+        if self.compressible and self.size >= MIN_COMPRESS_SIZE:
+            encodings.add('gzip')
+            if brotli is not None:
+                encodings.add('br')
+        return encodings
+
+    def body(self, encoding: str) -> bytes:
+        """Return the body for an encoding, read from disk or compressed once and cached"""
+        if encoding == 'identity':
+            return self._read(self.abs_path)
+        if encoding in self.precompressed:
+            return self._read(self.precompressed[encoding])
+        cached = self._compressed.get(encoding)
+        if cached is not None:
+            return cached
+        with self._lock:
+            cached = self._compressed.get(encoding)
+            if cached is not None:
+                return cached
+            if encoding == 'br':
+                data = brotli.compress(self._read(self.abs_path), quality=BROTLI_QUALITY)
+            elif encoding == 'gzip':
+                data = gzip.compress(self._read(self.abs_path), compresslevel=GZIP_LEVEL, mtime=0)
+            else:
+                raise ValueError(f'Unsupported encoding: {encoding}')
+            self._compressed[encoding] = data
+            return data
+
+
+class StaticAssetIndex:
+    def __init__(self, root: str, auto_rescan: bool = False):
+        self.root = os.path.abspath(root)
+        self.auto_rescan = auto_rescan
+        self.assets: Dict[str, StaticAsset] = {}
+        self._last_scan = 0.0
+        self._lock = threading.Lock()
+
+    def build(self):
+        """Scan the dist folder into the in-memory manifest"""
+        started = time.perf_counter()
+        assets = {}
+        variants = []
+        if os.path.isdir(self.root):
+            for dirpath, _, filenames in os.walk(self.root):
+                for filename in filenames:
+                    abs_path = os.path.join(dirpath, filename)
+                    rel_path = os.path.relpath(abs_path, self.root).replace(os.sep, '/')
+                    if filename.endswith(('.br', '.gz')):
+                        variants.append(rel_path)
+                        continue
+                    try:
+                        assets[rel_path] = StaticAsset(rel_path, abs_path)
+                    except OSError as e:
+                        logger.warning(f"Could not index static asset {rel_path}: {e}")
+
+            for rel_path in variants:
+                base, ext = os.path.splitext(rel_path)
+                asset = assets.get(base)
+                if asset:
+                    asset.precompressed['br' if ext == '.br' else 'gzip'] = os.path.join(self.root, rel_path)
+        else:
+            logger.warning(f"Frontend dist folder not found: {self.root}")
+
+        with self._lock:
+            self.assets = assets
+            self._last_scan = time.monotonic()
+        logger.info(f"Indexed {len(assets)} static assets in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    def lookup(self, path: str) -> Optional[StaticAsset]:
+        asset = self.assets.get(path)
+        if (asset is None and self.auto_rescan and os.path.splitext(path)[1]
+                and time.monotonic() - self._last_scan > RESCAN_INTERVAL):
+            # The frontend may have been rebuilt since startup (development mode)
+            self.build()
+            asset = self.assets.get(path)
+        return asset
+
+    @staticmethod
+    def _choose_encoding(asset: StaticAsset, accept_encoding: str) -> str:
+        accepted = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+        available = asset.available_encodings()
+        for encoding in ('br', 'gzip'):
+            if encoding in accepted and encoding in available:
+                return encoding
+        return 'identity'
+
+    def serve(self, path: str, request) -> Response:
+        """Serve an asset, falling back to index.html for client-side routes"""
+        asset = self.lookup(path) if path else None
+        if asset is None:
+            asset = self.lookup(INDEX_FILE)
+        if asset is None:
+            return Response('Frontend build not found - run "npm run build" in frontend/', status=404)
+
+        encoding = self._choose_encoding(asset, request.headers.get('Accept-Encoding', ''))
+        etag = f'"{asset.etag}-{encoding}"' if encoding != 'identity' else f'"{asset.etag}"'
+        headers = {
+            'ETag': etag,
+            'Cache-Control': IMMUTABLE_CACHE_CONTROL if asset.immutable else REVALIDATE_CACHE_CONTROL,
+            'Vary': 'Accept-Encoding',
+        }
+
+        if_none_match = request.headers.get('If-None-Match', '')
+        if if_none_match and (if_none_match == '*' or etag in [t.strip() for t in if_none_match.split(',')]):
+            return Response(status=304, headers=headers)
+
+        body = asset.body(encoding)
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        response = Response(b'' if request.method == 'HEAD' else body, mimetype=asset.mimetype, headers=headers)
+        response.content_length = len(body)
+        return response
@@ -0,0 +1,222 @@
+"""
+Telemetry tap client
+Reads live telemetry from a running backend on the same machine, for analysis
+scripts and notebooks. Subscribing is one HTTP request; samples are then read
+straight from the backend's shared-memory ring (zero copy: window() returns
+views into it), or from the tap's Unix socket where the ring cannot be mapped.
+
+    client = TelemetryTapClient()
+    client.subscribe(['axis0.encoder.pos_estimate', 'axis0.encoder.vel_estimate'])
+    window = client.window(['axis0.encoder.pos_estimate'], 1000)
+    positions = window['axis0.encoder.pos_estimate']  # numpy array if numpy is installed
+    if window.valid():
+        ...
+
+The backend must run with the tap enabled (ODRIVE_TELEMETRY_TAP=1 or
+--telemetry-tap). NumPy is optional: without it window() returns strided
+memoryviews.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import urllib.parse
+import urllib.request
+import weakref
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from .shared_ring import SharedSampleRing, DEFAULT_CAPACITY
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = 'http://localhost:5000'
+POLL_INTERVAL = 0.001
+SUBSCRIBE_TIMEOUT = 2.0
+
+
+class TapWindow:
+    """The latest rows of some paths as views into the ring; check valid() after using them"""
+
+    def __init__(self, ring: SharedSampleRing, head: int, position: int, count: int, columns: Dict[str, int]):
+        self.ring = ring
+        self.head = head
+        self.count = count
+        self.time = _column(ring, 0, position, count)
+        self._views = {path: _column(ring, column, position, count) for path, column in columns.items()}
+
+    def __getitem__(self, path: str):
+        return self._views[path]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def paths(self) -> List[str]:
+        return list(self._views)
+
+    def valid(self) -> bool:
+        """Whether the writer has not yet overwritten the oldest row of the window"""
+        return self.ring.is_valid(self.head - self.count)
+
+    def release(self):
+        """Drop the views (memoryviews are released; numpy arrays stay usable until collected)"""
+        for view in [self.time, *self._views.values()]:
+            if isinstance(view, memoryview):
+                view.release()
+        self._views = {}
+
+
+def _column(ring: SharedSampleRing, column: int, position: int, count: int):
+    if numpy is None:
+        return ring.column_view(column, position, count)
+    view = numpy.ndarray((count,), dtype=numpy.float64, buffer=ring.shm.buf,
+                         offset=ring.rows_offset + (position * ring.width + column) * 8,
+                         strides=(ring.width * 8,))
+    view.flags.writeable = False
+    return view
+
+
+class TelemetryTapClient:
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, ring_name: Optional[str] = None,
+                 socket_path: Optional[str] = None, owner: Optional[str] = None):
+        self.base_url = base_url.rstrip('/')
+        self.owner = owner or f'client-{os.getpid()}'
+        self.ring: Optional[SharedSampleRing] = None
+        self._socket = None
+        self._socket_ring = None
+        self._socket_thread = None
+        self._subscribed = False
+        self._windows = weakref.WeakSet()
+
+        if ring_name is None and socket_path is None:
+            info = self.info()
+            if not info.get('enabled'):
+                raise ConnectionError('Telemetry tap is not running on the backend (enable it with ODRIVE_TELEMETRY_TAP=1)')
+            ring_name, socket_path = info.get('ring'), info.get('socket')
+        if ring_name:
+            try:
+                self.ring = SharedSampleRing.attach(ring_name)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not attach telemetry ring {ring_name}: {e}")
+        if self.ring is None:
+            if not socket_path:
+                raise ConnectionError('Telemetry tap has neither a shared ring nor a socket')
+            self._connect_socket(socket_path)
+
+    @property
+    def mode(self) -> str:
+        return 'socket' if self._socket is not None else 'ring'
+
+    def _request(self, method: str, path: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        body = json.dumps(data).encode() if data is not None else None
+        req = urllib.request.Request(f'{self.base_url}/api/telemetry/tap{path}', data=body, method=method,
+                                     headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(req, timeout=5) as response:
+            return json.loads(response.read())
+
+    def info(self) -> Dict[str, Any]:
+        return self._request('GET', '')
+
+    def subscribe(self, paths: List[str], frequency_class: str = 'high', timeout: float = SUBSCRIBE_TIMEOUT) -> Dict[str, Any]:
+        """Have the backend sample paths until unsubscribe() (replaces this client's previous paths).
+
+        Waits up to timeout for the first samples of paths to arrive.
+        """
+        info = self._request('POST', '', {'owner': self.owner, 'paths': list(paths), 'frequency_class': frequency_class})
+        self._subscribed = True
+        deadline = time.monotonic() + timeout
+        while not set(paths).issubset(self.ring.columns()) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return info
+
+    def unsubscribe(self):
+        if self._subscribed:
+            self._request('DELETE', '?' + urllib.parse.urlencode({'owner': self.owner}))
+            self._subscribed = False
+
+    def latest(self) -> Tuple[Dict[str, Any], float]:
+        """Latest value of every published path and its sample time"""
+        return self.ring.latest()
+
+    def window(self, paths: List[str], rows: int) -> TapWindow:
+        """Views over the latest rows (at most capacity - 1) of paths; values between reads are held"""
+        columns = self.ring.columns()
+        missing = [path for path in paths if path not in columns]
+        if missing:
+            raise KeyError(f'Not sampled: {", ".join(missing)}')
+        head, position, count = self.ring.window(rows)
+        window = TapWindow(self.ring, head, position, count, {path: columns[path] for path in paths})
+        self._windows.add(window)
+        return window
+
+    def samples(self, since_now: bool = True) -> Iterator[Tuple[float, Dict[str, Any]]]:
+        """(timestamp, {path: value}) for each sample as it arrives, only the paths read for it"""
+        index = self.ring.head if since_now else 0
+        while self.ring is not None:
+            index, rows = self.ring.read_since(index)
+            if not rows:
+                time.sleep(POLL_INTERVAL)
+                continue
+            for row in rows:
+                yield row
+
+    def close(self):
+        try:
+            self.unsubscribe()
+        except OSError as e:
+            logger.debug(f"Could not unsubscribe from telemetry tap: {e}")
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            self._socket_thread.join(timeout=1.0)
+        for window in list(self._windows):
+            window.release()
+        if self.ring is not None:
+            ring, self.ring = self.ring, None
+            ring.close()
+        if self._socket_ring is not None:
+            self._socket_ring.close()
+            self._socket_ring = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Socket fallback: a reader thread fills a private ring so the API above stays the same
+
+    def _connect_socket(self, socket_path: str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(socket_path)
+        sock.sendall(b'\n')
+        self._socket = sock
+        # Written by the reader thread only; reads go through a second mapping with its own layout state
+        self._socket_ring = SharedSampleRing.create(capacity=DEFAULT_CAPACITY)
+        self.ring = SharedSampleRing.attach(self._socket_ring.name, track=True)
+        self._socket_thread = threading.Thread(target=self._read_socket, args=(sock, self._socket_ring),
+                                               name='TelemetryTapClient', daemon=True)
+        self._socket_thread.start()
+        logger.info(f"Reading telemetry tap from {socket_path}")
+
+    def _read_socket(self, sock: socket.socket, ring: SharedSampleRing):
+        published = set()
+        with sock.makefile('rb') as stream:
+            try:
+                for line in stream:
+                    sample = json.loads(line)
+                    values = sample['values']
+                    if not published.issuperset(values):
+                        published.update(values)
+                        ring.set_channels(dict.fromkeys(published))
+                    ring.write(values, sample['t'])
+            except (OSError, ValueError) as e:
+                if self._socket is sock:
+                    logger.warning(f"Telemetry tap socket closed: {e}")
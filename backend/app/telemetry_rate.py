@@ -0,0 +1,261 @@
+"""
+Adaptive telemetry rate control
+Serves telemetry polls at a rate the device can actually sustain. Each poll
+states a desired rate; values fresh enough for that rate are served from the
+shared cache (fed by the sampler and earlier reads), at most a fixed number of
+device reads run at once, and polls that cannot get a read slot get the latest
+cached values instead of queueing behind the USB lock. Polled paths are also
+registered with the sampler, so steady polls are mostly served from its
+frequency-class schedule.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE_HZ = 20.0
+MIN_RATE_HZ = 0.5
+MAX_RATE_HZ = 1000.0
+
+# Device reads allowed in flight at once for telemetry polls
+MAX_INFLIGHT_READS = 1
+# Longest a poll waits for someone else's in-flight read before taking cached values
+MAX_COALESCE_WAIT = 0.25
+# Assumed per-path read cost until a read has been measured (~USB full-speed round trip)
+DEFAULT_READ_COST = 0.001
+# Fixed per-poll overhead (HTTP + JSON) added to the capacity estimate
+POLL_OVERHEAD = 0.002
+# Sampled paths are served from cache up to this many sampler periods old...
+SAMPLED_AGE_PERIODS = 1.5
+# ...but never older than this (covers 'once' paths)
+MAX_SAMPLED_AGE = 1.0
+
+CLIENT_IDLE_TIMEOUT = 10.0
+MAX_CLIENTS = 64
+# How often the sampler callback looks for idle clients whose paths it still samples
+EXPIRY_CHECK_INTERVAL = 1.0
+
+ReadFunction = Callable[[List[str]], Dict[str, Any]]
+
+metrics.describe('odrive_telemetry_polls_total', 'counter', 'Telemetry polls by how they were served (read/coalesced/dropped)')
+metrics.describe('odrive_telemetry_samples_dropped_total', 'counter', 'Samples requested by clients that could not be delivered')
+
+
+class _ClientState:
+    def __init__(self, now: float):
+        self.last_poll = now
+        self.paths: List[str] = []
+        self.last_sample_time = 0.0
+        self.deliveries = deque(maxlen=32)
+        self.dropped_total = 0
+        self.pending_drop = 0.0
+
+    def actual_rate(self, now: float) -> float:
+        if len(self.deliveries) < 2:
+            return 0.0
+        span = now - self.deliveries[0]
+        return (len(self.deliveries) - 1) / span if span > 0 else 0.0
+
+
+class TelemetryRateController:
+    def __init__(self, sampler=None, max_inflight: int = MAX_INFLIGHT_READS):
+        self.sampler = sampler
+        self._cache: Dict[str, Tuple[Any, float]] = {}
+        self._clients: Dict[str, _ClientState] = {}
+        self._read_cost = 0.0
+        self._read_slots = threading.BoundedSemaphore(max_inflight)
+        self._inflight = 0
+        self._lock = threading.Lock()
+        self._read_done = threading.Condition(self._lock)
+        self._last_expiry_check = 0.0
+        if sampler is not None:
+            sampler.add_listener(self._on_sample)
+
+    def _on_sample(self, values: Dict[str, Any], timestamp: float):
+        now = time.monotonic()
+        with self._lock:
+            for path, value in values.items():
+                self._cache[path] = (value, now)
+            if now - self._last_expiry_check < EXPIRY_CHECK_INTERVAL:
+                return
+            self._last_expiry_check = now
+            expired = self._expire_clients(now)
+        # Polls stop when the last tab closes; drop their paths here so the sampler stops reading them
+        for client_id in expired:
+            self._unregister(client_id)
+
+    def clear(self):
+        """Forget cached values and client state (e.g. on device change)"""
+        with self._lock:
+            self._cache.clear()
+            client_ids = list(self._clients)
+            self._clients.clear()
+        for client_id in client_ids:
+            self._unregister(client_id)
+
+    def _register(self, client_id: str, paths: List[str]):
+        if self.sampler is not None:
+            self.sampler.register_paths(f'poll:{client_id}', paths)
+
+    def _unregister(self, client_id: str):
+        if self.sampler is not None:
+            self.sampler.unregister_paths(f'poll:{client_id}')
+
+    def _max_ages(self, paths: List[str], granted: float) -> Dict[str, float]:
+        """Oldest acceptable cached value per path for a poll at the granted rate"""
+        max_age = 1.0 / granted
+        ages = {}
+        for path in paths:
+            period = self.sampler.path_period(path) if self.sampler is not None else None
+            ages[path] = max_age if period is None else max(max_age, min(period * SAMPLED_AGE_PERIODS, MAX_SAMPLED_AGE))
+        return ages
+
+    def read_cost(self) -> float:
+        """Measured seconds per path read, falling back to the sampler's measurement"""
+        with self._lock:
+            cost = self._read_cost
+        if not cost and self.sampler is not None:
+            cost = self.sampler.get_stats()['read_cost_s']
+        return cost or DEFAULT_READ_COST
+
+    def capacity_hz(self, path_count: int) -> float:
+        """Achievable full refresh rate for a poll of path_count paths"""
+        return 1.0 / (self.read_cost() * max(path_count, 1) + POLL_OVERHEAD)
+
+    def sample(self, paths: List[str], read_fn: ReadFunction, desired_rate: Optional[float] = None,
+               client_id: str = 'default') -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Return (values, sampling metadata) for paths at no more than the achievable rate"""
+        requested = _clamp_rate(desired_rate)
+        now = time.monotonic()
+
+        with self._lock:
+            client, expired = self._client(client_id, now)
+            registered = client.paths == paths
+            client.paths = list(paths)
+        for expired_id in expired:
+            self._unregister(expired_id)
+        if not registered:
+            self._register(client_id, paths)
+
+        # Downsample to what the device can refresh; pollers of the same paths share each read
+        granted = min(requested, self.capacity_hz(len(paths)))
+        max_ages = self._max_ages(paths, granted)
+
+        mode = 'coalesced'
+        stale = self._stale_paths(paths, now, max_ages)
+        if stale:
+            if self._read_slots.acquire(blocking=False):
+                try:
+                    self._read(stale, read_fn)
+                    mode = 'read'
+                finally:
+                    self._read_slots.release()
+            else:
+                # Backpressure: wait for the read already in flight instead of queueing another
+                with self._lock:
+                    if self._inflight:
+                        self._read_done.wait(min(1.0 / granted, MAX_COALESCE_WAIT))
+                if self._stale_paths(paths, time.monotonic(), max_ages):
+                    mode = 'dropped'
+
+        values, meta = self._collect(paths, client, requested, granted, mode)
+        metrics.inc('odrive_telemetry_polls_total', mode=mode)
+        return values, meta
+
+    def _expire_clients(self, now: float) -> List[str]:
+        """Forget clients that stopped polling and return their ids (call with _lock held)"""
+        expired = [cid for cid, c in self._clients.items() if now - c.last_poll > CLIENT_IDLE_TIMEOUT]
+        for stale_id in expired:
+            del self._clients[stale_id]
+        return expired
+
+    def _client(self, client_id: str, now: float) -> Tuple[_ClientState, List[str]]:
+        """Get or create client state; also returns the ids of clients that expired"""
+        expired = self._expire_clients(now)
+        client = self._clients.get(client_id)
+        if client is None:
+            if len(self._clients) >= MAX_CLIENTS:
+                oldest = min(self._clients, key=lambda cid: self._clients[cid].last_poll)
+                del self._clients[oldest]
+                expired.append(oldest)
+            client = self._clients[client_id] = _ClientState(now)
+        return client, expired
+
+    def _stale_paths(self, paths: List[str], now: float, max_ages: Dict[str, float]) -> List[str]:
+        with self._lock:
+            return [path for path in paths
+                    if path not in self._cache or now - self._cache[path][1] > max_ages[path]]
+
+    def _read(self, paths: List[str], read_fn: ReadFunction):
+        with self._lock:
+            self._inflight += 1
+        started = time.monotonic()
+        try:
+            values = read_fn(paths)
+        finally:
+            finished = time.monotonic()
+            with self._lock:
+                self._inflight -= 1
+                self._read_done.notify_all()
+        cost = (finished - started) / max(len(paths), 1)
+        with self._lock:
+            self._read_cost = cost if not self._read_cost else 0.8 * self._read_cost + 0.2 * cost
+            for path, value in values.items():
+                self._cache[path] = (value, finished)
+
+    def _collect(self, paths: List[str], client: _ClientState, requested: float, granted: float,
+                 mode: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            values = {}
+            oldest = now
+            newest = 0.0
+            for path in paths:
+                value, sampled_at = self._cache.get(path, (None, 0.0))
+                values[path] = value
+                if sampled_at:
+                    oldest = min(oldest, sampled_at)
+                    newest = max(newest, sampled_at)
+
+            # Samples the client asked for since its last poll, minus the one delivered now
+            elapsed = min(now - client.last_poll, 1.0) if client.deliveries else 0.0
+            fresh = newest > client.last_sample_time
+            client.pending_drop += elapsed * requested - (1 if fresh else 0)
+            dropped = max(0, int(client.pending_drop))
+            client.pending_drop = max(0.0, client.pending_drop - dropped)
+            client.dropped_total += dropped
+            client.last_poll = now
+            if fresh:
+                client.last_sample_time = newest
+                client.deliveries.append(now)
+
+            meta = {
+                'requested_rate_hz': round(requested, 2),
+                'granted_rate_hz': round(granted, 2),
+                'actual_rate_hz': round(client.actual_rate(now), 2),
+                'samples_dropped': dropped,
+                'samples_dropped_total': client.dropped_total,
+                'mode': mode,
+                'fresh': fresh,
+                'age_ms': round((now - oldest) * 1000, 2) if newest else None,
+                'next_poll_ms': round(1000.0 / granted, 2),
+            }
+        if dropped:
+            metrics.inc('odrive_telemetry_samples_dropped_total', dropped)
+        return values, meta
+
+
+def _clamp_rate(rate) -> float:
+    try:
+        rate = float(rate) if rate is not None else DEFAULT_RATE_HZ
+    except (TypeError, ValueError):
+        rate = DEFAULT_RATE_HZ
+    if rate != rate:
+        rate = DEFAULT_RATE_HZ
+    return min(MAX_RATE_HZ, max(MIN_RATE_HZ, rate))
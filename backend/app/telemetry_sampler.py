@@ -0,0 +1,282 @@
+"""
+Background telemetry sampler
+Reads registered device paths in the background and hands every sample to its
+listeners, so backend services see the device at sampler rate instead of
+browser poll rate. Each path has a frequency class (odrive_telemetry_config);
+reads are scheduled earliest-deadline-first in small batches so high-rate
+signals get most of the USB budget and the device lock is never held long.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Callable, Iterable, Optional, Tuple
+
+from .odrive_telemetry_config import (
+    safe_get_property, get_frequency_class, FREQUENCY_CLASSES,
+    ON_CHANGE_BOOST_PERIOD, ON_CHANGE_BOOST_DURATION,
+)
+
+logger = logging.getLogger(__name__)
+
+SampleListener = Callable[[Dict[str, Any], float], None]
+
+# Longest the device lock is held for one batch of reads
+MAX_BATCH_TIME = 0.005
+# Fraction of USB time the sampler may use; the rest is left to HTTP requests
+DUTY_CYCLE = 0.5
+# Wake-up bounds for the scheduler loop
+MIN_WAIT = 0.001
+IDLE_WAIT = 0.1
+
+_MISSING = object()
+
+
+def _class_period(frequency_class: str) -> float:
+    period = FREQUENCY_CLASSES[frequency_class]
+    return float('inf') if period is None else period
+
+
+class _PathSchedule:
+    __slots__ = ('path', 'frequency_class', 'next_due', 'last_read', 'interval_avg',
+                 'boost_until', 'last_value', 'missed')
+
+    def __init__(self, path: str, frequency_class: str):
+        self.path = path
+        self.frequency_class = frequency_class
+        self.reset()
+
+    def reset(self):
+        self.next_due = 0.0
+        self.last_read = 0.0
+        self.interval_avg = 0.0
+        self.boost_until = 0.0
+        self.last_value = _MISSING
+        self.missed = 0
+
+    def period(self, now: float) -> float:
+        if self.boost_until > now:
+            return ON_CHANGE_BOOST_PERIOD
+        return _class_period(self.frequency_class)
+
+    def record_read(self, value: Any, now: float):
+        if self.last_read:
+            interval = now - self.last_read
+            self.interval_avg = interval if not self.interval_avg else 0.8 * self.interval_avg + 0.2 * interval
+        self.last_read = now
+
+        if (self.frequency_class == 'on_change' and self.last_value is not _MISSING
+                and value != self.last_value):
+            self.boost_until = now + ON_CHANGE_BOOST_DURATION
+        self.last_value = value
+
+        period = self.period(now)
+        if self.next_due and now - self.next_due > period:
+            self.missed += 1
+        # Skip missed deadlines instead of bursting to catch up
+        next_due = self.next_due + period
+        self.next_due = next_due if next_due > now else now + period
+
+
+class TelemetrySampler:
+    def __init__(self, odrive_manager, max_batch_time: float = MAX_BATCH_TIME,
+                 duty_cycle: float = DUTY_CYCLE):
+        self.odrive_manager = odrive_manager
+        self.max_batch_time = max_batch_time
+        self.duty_cycle = duty_cycle
+        self._classes_by_owner: Dict[str, Dict[str, str]] = {}
+        self._schedule: Dict[str, _PathSchedule] = {}
+        self._listeners: List[SampleListener] = []
+        self._latest: Dict[str, Any] = {}
+        self._latest_time = 0.0
+        self._device = None
+        # Measured cost of a device read, used to size batches and advertise achievable rates
+        self._read_cost = 0.0
+        self._last_read_seconds = 0.0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def register_paths(self, owner: str, paths: Iterable[str], frequency_class: Optional[str] = None):
+        """Register the paths a consumer needs sampled.
+
+        The class defaults to get_frequency_class(path); a path registered by
+        several owners is sampled at the fastest of their classes.
+        """
+        if frequency_class is not None and frequency_class not in FREQUENCY_CLASSES:
+            raise ValueError(f"Unknown frequency class: {frequency_class}")
+        with self._lock:
+            self._classes_by_owner[owner] = {path: frequency_class or get_frequency_class(path)
+                                             for path in paths}
+            self._rebuild_schedule()
+
+    def unregister_paths(self, owner: str):
+        with self._lock:
+            if self._classes_by_owner.pop(owner, None) is not None:
+                self._rebuild_schedule()
+
+    def add_listener(self, listener: SampleListener):
+        """Add a callback invoked as listener(values, timestamp) for each batch of reads"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: SampleListener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def get_latest(self) -> Tuple[Dict[str, Any], float]:
+        """Return a copy of the latest value of every sampled path and the last sample time (seconds)"""
+        with self._lock:
+            return dict(self._latest), self._latest_time
+
+    def sampled_paths(self) -> Dict[str, str]:
+        """{path: frequency class} of every path currently scheduled"""
+        with self._lock:
+            return {path: entry.frequency_class for path, entry in self._schedule.items()}
+
+    def path_period(self, path: str) -> Optional[float]:
+        """Current sampling period of a path (inf for 'once'), or None if it is not sampled"""
+        with self._lock:
+            schedule = self._schedule.get(path)
+            return schedule.period(time.monotonic()) if schedule else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the measured read cost and per-class target/achieved rates"""
+        with self._lock:
+            classes = {}
+            for name, period in FREQUENCY_CLASSES.items():
+                entries = [s for s in self._schedule.values() if s.frequency_class == name]
+                rates = [1.0 / s.interval_avg for s in entries if s.interval_avg]
+                classes[name] = {
+                    'paths': len(entries),
+                    'target_hz': round(1.0 / period, 2) if period else None,
+                    'achieved_hz': round(sum(rates) / len(rates), 2) if rates else None,
+                    'missed_deadlines': sum(s.missed for s in entries),
+                }
+            return {
+                'read_cost_s': self._read_cost,
+                'duty_cycle': self.duty_cycle,
+                'classes': classes,
+            }
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='TelemetrySampler', daemon=True)
+        self._thread.start()
+        logger.info("Telemetry sampler started")
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _rebuild_schedule(self):
+        wanted: Dict[str, str] = {}
+        for classes in self._classes_by_owner.values():
+            for path, frequency_class in classes.items():
+                current = wanted.get(path)
+                if current is None or _class_period(frequency_class) < _class_period(current):
+                    wanted[path] = frequency_class
+
+        schedule = {}
+        for path, frequency_class in wanted.items():
+            entry = self._schedule.get(path)
+            if entry is None:
+                entry = _PathSchedule(path, frequency_class)
+            elif entry.frequency_class != frequency_class:
+                entry.frequency_class = frequency_class
+                entry.next_due = 0.0
+            schedule[path] = entry
+        self._schedule = schedule
+
+    def _check_device(self):
+        """Start every schedule over when the connected device changes"""
+        device = self.odrive_manager.current_device
+        if device is self._device:
+            return
+        with self._lock:
+            self._device = device
+            self._latest = {}
+            for entry in self._schedule.values():
+                entry.reset()
+
+    def _due_batch(self, now: float) -> List[_PathSchedule]:
+        """Due paths, earliest deadline first, limited to what fits in one batch"""
+        with self._lock:
+            # A read is due at next_due and must land before the following one (next_due + period),
+            # so short-period classes win when the budget is tight while slow ones still age in
+            due = sorted((s for s in self._schedule.values() if s.next_due <= now),
+                         key=lambda s: s.next_due + min(s.period(now), IDLE_WAIT * 10))
+            if self._read_cost:
+                due = due[:max(1, int(self.max_batch_time / self._read_cost))]
+            return due
+
+    def _next_deadline(self) -> float:
+        with self._lock:
+            return min((s.next_due for s in self._schedule.values()), default=float('inf'))
+
+    def _read_paths(self, paths: List[str]) -> Dict[str, Any]:
+        odrv = self.odrive_manager.current_device
+        if odrv is None:
+            return {}
+        started = time.monotonic()
+        values = {path: safe_get_property(odrv, path) for path in paths}
+        # Device time only - lock wait is excluded so the cost reflects what USB can sustain
+        self._last_read_seconds = time.monotonic() - started
+        return values
+
+    def _sample(self, batch: List[_PathSchedule]) -> Optional[float]:
+        """Read one batch, notify listeners and return the USB time it took (None on failure)"""
+        try:
+            values = self.odrive_manager.execute_with_lock(self._read_paths, [s.path for s in batch])
+        except Exception as e:
+            logger.debug(f"Sampler read failed: {e}")
+            values = {}
+        if not values:
+            return None
+        if all(value is None for value in values.values()):
+            # safe_get_property swallows errors, so an all-None batch is how a lost link shows up here
+            self.odrive_manager.note_transaction(ok=False)
+
+        now = time.monotonic()
+        timestamp = time.time()
+        with self._lock:
+            for entry in batch:
+                if entry.path in values:
+                    entry.record_read(values[entry.path], now)
+            self._latest.update(values)
+            self._latest_time = timestamp
+            cost = self._last_read_seconds / len(batch)
+            self._read_cost = cost if not self._read_cost else 0.8 * self._read_cost + 0.2 * cost
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(values, timestamp)
+            except Exception as e:
+                logger.error(f"Sampler listener failed: {e}")
+        return self._last_read_seconds
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            if not self.odrive_manager.is_connected():
+                self._stop_event.wait(IDLE_WAIT)
+                continue
+
+            self._check_device()
+            batch = self._due_batch(time.monotonic())
+            busy = self._sample(batch) if batch else 0.0
+            if busy is None:
+                self._stop_event.wait(IDLE_WAIT)
+                continue
+
+            # Sleep until the next deadline, but leave the USB idle long enough to honour the duty cycle
+            delay = max(self._next_deadline() - time.monotonic(),
+                        busy * (1.0 - self.duty_cycle) / self.duty_cycle, MIN_WAIT)
+            self._stop_event.wait(min(delay, IDLE_WAIT))
@@ -0,0 +1,309 @@
+"""
+Telemetry tap
+Publishes the sampler's live data for local analysis scripts (app.tap_client)
+without HTTP on the hot path: a shared-memory sample ring under a well-known
+name, and a Unix domain socket streaming the same samples as JSON lines for
+clients that cannot map the ring.
+
+Opt-in (ODRIVE_TELEMETRY_TAP=1 or --telemetry-tap), started by the entry
+points rather than on import. The socket lives in a per-user runtime
+directory and is only readable by its owner. A ring or socket that a running
+backend still uses is never replaced; starting a second tap fails instead.
+
+In device-process mode the device process's ring is published as it is;
+otherwise the tap fills a ring of its own from sampler callbacks.
+"""
+
+import json
+import logging
+import os
+import socket
+import stat
+import tempfile
+import threading
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Optional
+
+from .shared_ring import SharedSampleRing
+from .utils.json_encoding import dumps
+
+logger = logging.getLogger(__name__)
+
+TAP_ENV = 'ODRIVE_TELEMETRY_TAP'
+TAP_RING_ENV = 'ODRIVE_TAP_RING'
+TAP_SOCKET_ENV = 'ODRIVE_TAP_SOCKET'
+DEFAULT_RING_NAME = 'odrive_gui_telemetry'
+DEFAULT_SOCKET_NAME = 'odrive_gui_telemetry.sock'
+
+# Open rings this process created under tap names; attaching to check them would drop their resource tracker entry
+_created_rings = set()
+
+# Bytes a socket client may fall behind before samples are dropped for it
+SOCKET_SEND_BUFFER = 1 << 20
+
+
+class TelemetryTapError(Exception):
+    """The tap cannot publish under its names (e.g. another backend is using them)"""
+
+
+def tap_enabled() -> bool:
+    return os.environ.get(TAP_ENV) == '1'
+
+
+def tap_ring_name() -> str:
+    return os.environ.get(TAP_RING_ENV) or DEFAULT_RING_NAME
+
+
+def tap_runtime_dir() -> str:
+    """Per-user directory for the socket: $XDG_RUNTIME_DIR, else a private directory under the temp dir"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return runtime_dir
+    path = os.path.join(tempfile.gettempdir(), f'odrive_gui-{os.getuid()}')
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    # Someone else may have created it first in the shared temp dir
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) & 0o077:
+        raise TelemetryTapError(f'{path} is not a private directory of this user')
+    return path
+
+
+def tap_socket_path() -> Optional[str]:
+    """Path of the stream socket, None where Unix domain sockets are unavailable"""
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    return os.environ.get(TAP_SOCKET_ENV) or os.path.join(tap_runtime_dir(), DEFAULT_SOCKET_NAME)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user
+        pass
+    return True
+
+
+def _ring_in_use(name: str) -> bool:
+    """Whether the existing shared memory under name may still be in use"""
+    if os.name == 'nt' or name in _created_rings:
+        # Windows frees a mapping with its last handle, so a name that exists is open somewhere
+        return True
+    try:
+        ring = SharedSampleRing.attach(name)
+    except (OSError, ValueError):
+        # Not a ring of ours (or unreadable): leave it alone
+        return True
+    try:
+        pid = ring.creator_pid
+    finally:
+        ring.close()
+    return not pid or _process_alive(pid)
+
+
+def create_tap_ring(**kwargs) -> SharedSampleRing:
+    """Create the ring under the tap name, replacing one left behind by a backend that is no longer running"""
+    name = tap_ring_name()
+    try:
+        ring = SharedSampleRing.create(name=name, **kwargs)
+    except FileExistsError:
+        if _ring_in_use(name):
+            raise TelemetryTapError(f'Telemetry ring {name} is in use by another process '
+                                    f'(set {TAP_RING_ENV} to publish under another name)')
+        logger.warning(f"Replacing stale telemetry ring {name}")
+        stale = shared_memory.SharedMemory(name=name)
+        stale.close()
+        stale.unlink()
+        ring = SharedSampleRing.create(name=name, **kwargs)
+    _created_rings.add(name)
+    return ring
+
+
+def close_tap_ring(ring: SharedSampleRing):
+    """Close (and as the creator, remove) a ring, forgetting it if create_tap_ring made it"""
+    _created_rings.discard(ring.name)
+    ring.close()
+
+
+def _socket_in_use(path: str) -> bool:
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        return False
+    except OSError:
+        # Not a socket we could reach (e.g. a regular file): leave it alone
+        return True
+    finally:
+        probe.close()
+    return True
+
+
+class _SocketClient:
+    __slots__ = ('sock', 'paths', 'dropped')
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.paths = None
+        self.dropped = 0
+
+
+class TelemetryTap:
+    def __init__(self, sampler, ring: Optional[SharedSampleRing] = None):
+        self.sampler = sampler
+        self.ring = ring
+        self._owns_ring = ring is None
+        self._published = set()
+        self._ring_lock = threading.Lock()
+        self.socket_path = None
+        self._server = None
+        self._clients: List[_SocketClient] = []
+        self._clients_lock = threading.Lock()
+        self._thread = None
+        self._running = False
+
+    def is_running(self) -> bool:
+        return self._running
+
+    def start(self):
+        """Publish the ring and socket; TelemetryTapError if another backend is using their names"""
+        if self._running:
+            return
+        if self._owns_ring:
+            try:
+                self.ring = create_tap_ring()
+            except OSError as e:
+                logger.warning(f"Telemetry tap ring unavailable: {e}")
+        try:
+            self._start_socket()
+        except TelemetryTapError:
+            if self._owns_ring and self.ring is not None:
+                close_tap_ring(self.ring)
+                self.ring = None
+            raise
+        self.sampler.add_listener(self._on_sample)
+        self._running = True
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        self.sampler.remove_listener(self._on_sample)
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+            self.socket_path = None
+        with self._clients_lock:
+            for client in self._clients:
+                client.sock.close()
+            self._clients = []
+        if self._owns_ring and self.ring is not None:
+            close_tap_ring(self.ring)
+            self.ring = None
+
+    def get_info(self) -> Dict[str, Any]:
+        """Where clients find the data, and what is being sampled"""
+        ring = self.ring if self._running else None
+        with self._clients_lock:
+            socket_clients = len(self._clients)
+        return {
+            'enabled': self._running,
+            'ring': ring.name if ring is not None else None,
+            'capacity': ring.capacity if ring is not None else None,
+            'socket': self.socket_path,
+            'socket_clients': socket_clients,
+            'paths': self.sampler.sampled_paths(),
+        }
+
+    def _on_sample(self, values: Dict[str, Any], timestamp: float):
+        if self._owns_ring and self.ring is not None:
+            with self._ring_lock:
+                # New registrations show up as unknown paths; stale ones are dropped at the same time
+                if not self._published.issuperset(values):
+                    paths = self.sampler.sampled_paths()
+                    self.ring.set_channels(paths)
+                    self._published = set(paths)
+                self.ring.write(values, timestamp)
+        if self._clients:
+            self._broadcast(values, timestamp)
+
+    # Unix domain socket stream
+
+    def _start_socket(self):
+        path = tap_socket_path()
+        if path is None:
+            return
+        if os.path.exists(path):
+            if _socket_in_use(path):
+                raise TelemetryTapError(f'Telemetry tap socket {path} is in use by another process '
+                                        f'(set {TAP_SOCKET_ENV} to stream on another path)')
+            logger.warning(f"Replacing stale telemetry tap socket {path}")
+            os.unlink(path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(path)
+            os.chmod(path, 0o600)
+            server.listen()
+        except OSError as e:
+            server.close()
+            logger.warning(f"Telemetry tap socket unavailable: {e}")
+            return
+        self._server = server
+        self.socket_path = path
+        self._thread = threading.Thread(target=self._accept, name='TelemetryTapSocket', daemon=True)
+        self._thread.start()
+        logger.info(f"Telemetry tap streaming on {path}")
+
+    def _accept(self):
+        server = self._server
+        while self._server is server:
+            try:
+                sock, _ = server.accept()
+            except OSError:
+                break
+            client = _SocketClient(sock)
+            # An optional first line {"paths": [...]} limits the stream to those paths
+            sock.settimeout(0.2)
+            try:
+                request = sock.recv(65536).split(b'\n', 1)[0]
+                if request:
+                    client.paths = set(json.loads(request).get('paths') or ()) or None
+            except (OSError, ValueError):
+                pass
+            sock.setblocking(False)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_SEND_BUFFER)
+            with self._clients_lock:
+                self._clients.append(client)
+
+    def _broadcast(self, values: Dict[str, Any], timestamp: float):
+        line = None
+        closed = []
+        with self._clients_lock:
+            for client in self._clients:
+                if client.paths is None:
+                    if line is None:
+                        line = (dumps({'t': timestamp, 'values': values}) + '\n').encode()
+                    payload = line
+                else:
+                    selected = {path: value for path, value in values.items() if path in client.paths}
+                    if not selected:
+                        continue
+                    payload = (dumps({'t': timestamp, 'values': selected}) + '\n').encode()
+                try:
+                    sent = client.sock.send(payload)
+                    if sent < len(payload):
+                        # A partial line would corrupt the stream
+                        closed.append(client)
+                except BlockingIOError:
+                    client.dropped += 1
+                except OSError:
+                    closed.append(client)
+            for client in closed:
+                client.sock.close()
+                self._clients.remove(client)
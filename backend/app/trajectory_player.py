@@ -0,0 +1,264 @@
+"""
+Host-side trajectory playback
+Plays uploaded (t, pos, vel, torque) trajectories to the ODrive through
+input_pos with input_vel/input_torque feed-forward, on an absolute monotonic
+schedule so timing errors never accumulate, and records telemetry aligned
+to every trajectory point.
+
+Telemetry comes from the sampler (the recorded paths are registered at the
+'high' class while playing), so a step only costs its three writes; each point
+gets the newest sample at the time it was applied, and t_sample says when that
+sample was read.
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRAJECTORY_EVENT_TOPIC = 'trajectory'
+
+# Per-axis telemetry recorded with every point (same paths as get_dashboard_telemetry)
+RECORDED_PATHS = [
+    'encoder.pos_estimate',
+    'encoder.vel_estimate',
+    'motor.current_control.Iq_measured',
+    'controller.pos_setpoint',
+    'controller.vel_setpoint',
+]
+RESULT_COLUMNS = ['t', 't_actual', 't_sample'] + RECORDED_PATHS
+SAMPLER_OWNER = 'trajectory_player'
+# Longest playback waits for the sampler to deliver the recorded paths once
+FIRST_SAMPLE_TIMEOUT = 0.2
+
+# Time before a deadline at which we stop sleeping and busy-wait
+SPIN_THRESHOLD = 0.002
+
+INPUT_MODE_PASSTHROUGH = 1
+
+
+class TrajectoryPlayer:
+    def __init__(self, odrive_manager, sampler, event_bus=None):
+        self.odrive_manager = odrive_manager
+        self.sampler = sampler
+        self.event_bus = event_bus
+        self.trajectories: Dict[int, List[List[float]]] = {}
+        self.results: Dict[int, List[List[Optional[float]]]] = {}
+        self.state = 'empty'
+        self.error = None
+        self.warnings: List[str] = []
+        self.max_lateness = 0.0
+        self.points_played = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        # Newest sampled value per recorded path and the wall time of that sample
+        self._sampled: Dict[str, Any] = {}
+        self._sampled_time: Dict[str, float] = {}
+
+    def _publish(self, data: Dict[str, Any]):
+        if self.event_bus:
+            self.event_bus.publish(TRAJECTORY_EVENT_TOPIC, data)
+
+    def load(self, trajectories: Dict[Any, List[List[float]]]) -> Dict[str, Any]:
+        """Validate and store trajectories keyed by axis number"""
+        if self.is_playing():
+            return {'error': 'Cannot load a trajectory while playing'}
+
+        parsed = {}
+        for axis_key, points in trajectories.items():
+            axis = int(str(axis_key).replace('axis', ''))
+            if axis not in (0, 1):
+                return {'error': f'Invalid axis: {axis_key}'}
+            if not points:
+                return {'error': f'Trajectory for axis{axis} is empty'}
+
+            rows = []
+            last_t = None
+            for index, point in enumerate(points):
+                if not 2 <= len(point) <= 4:
+                    return {'error': f'axis{axis} point {index}: expected (t, pos[, vel[, torque]])'}
+                t, pos, vel, torque = (list(map(float, point)) + [0.0, 0.0])[:4]
+                if not all(map(math.isfinite, (t, pos, vel, torque))):
+                    return {'error': f'axis{axis} point {index}: values must be finite numbers'}
+                if t < 0 or (last_t is not None and t < last_t):
+                    return {'error': f'axis{axis} point {index}: time must be non-negative and non-decreasing'}
+                rows.append([t, pos, vel, torque])
+                last_t = t
+            parsed[axis] = rows
+
+        if not parsed:
+            return {'error': 'No trajectories provided'}
+
+        with self._lock:
+            self.trajectories = parsed
+            self.results = {}
+            self.state = 'loaded'
+            self.error = None
+        return self.get_status()
+
+    def is_playing(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> Dict[str, Any]:
+        if self.is_playing():
+            return {'error': 'Trajectory already playing'}
+        if not self.trajectories:
+            return {'error': 'No trajectory loaded'}
+        if not self.odrive_manager.is_connected():
+            return {'error': 'No device connected'}
+
+        self.warnings = self._check_input_modes()
+        self._stop_event.clear()
+        self._start_recording()
+        with self._lock:
+            self.results = {axis: [[row[0]] + [None] * (len(RESULT_COLUMNS) - 1) for row in rows]
+                            for axis, rows in self.trajectories.items()}
+            self.state = 'playing'
+            self.error = None
+            self.max_lateness = 0.0
+            self.points_played = 0
+        self._thread = threading.Thread(target=self._run, name='TrajectoryPlayer', daemon=True)
+        self._thread.start()
+        self._publish({'state': 'playing'})
+        return self.get_status()
+
+    def stop(self) -> Dict[str, Any]:
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(2.0)
+        return self.get_status()
+
+    def _check_input_modes(self) -> List[str]:
+        """Feed-forward is only honoured in passthrough input mode"""
+        def _read():
+            device = self.odrive_manager.current_device
+            return {axis: int(getattr(device, f'axis{axis}').controller.config.input_mode)
+                    for axis in self.trajectories}
+        warnings = []
+        try:
+            for axis, input_mode in self.odrive_manager.execute_with_lock(_read).items():
+                if input_mode != INPUT_MODE_PASSTHROUGH:
+                    warnings.append(f'axis{axis} input_mode is {input_mode}; '
+                                    f'vel/torque feed-forward requires INPUT_MODE_PASSTHROUGH')
+        except Exception as e:
+            logger.debug(f"Could not check input modes: {e}")
+        return warnings
+
+    def _build_schedule(self):
+        """Group points from all axes that share a timestamp into one device transaction"""
+        events = {}
+        for axis, rows in self.trajectories.items():
+            for index, row in enumerate(rows):
+                events.setdefault(row[0], []).append((axis, index))
+        return sorted(events.items())
+
+    def _start_recording(self):
+        with self._lock:
+            self._sampled = {}
+            self._sampled_time = {}
+        paths = [f'axis{axis}.{path}' for axis in self.trajectories for path in RECORDED_PATHS]
+        self.sampler.add_listener(self._on_sample)
+        self.sampler.register_paths(SAMPLER_OWNER, paths, 'high')
+
+    def _stop_recording(self):
+        self.sampler.unregister_paths(SAMPLER_OWNER)
+        self.sampler.remove_listener(self._on_sample)
+
+    def _on_sample(self, values: Dict[str, Any], timestamp: float):
+        with self._lock:
+            for path, value in values.items():
+                if value is not None and path.endswith(tuple(RECORDED_PATHS)):
+                    self._sampled[path] = value
+                    self._sampled_time[path] = timestamp
+
+    def _wait_for_first_samples(self, timeout: float = FIRST_SAMPLE_TIMEOUT):
+        """Give the sampler a moment so the first points already have telemetry"""
+        expected = len(self.trajectories) * len(RECORDED_PATHS)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and not self._stop_event.is_set():
+            with self._lock:
+                if len(self._sampled) >= expected:
+                    return
+            time.sleep(0.005)
+
+    def _recorded_row(self, axis: int, start_wall: float) -> List[Optional[float]]:
+        """t_sample and recorded values for an axis, from the newest samples (call with _lock held)"""
+        paths = [f'axis{axis}.{path}' for path in RECORDED_PATHS]
+        times = [self._sampled_time[path] for path in paths if path in self._sampled_time]
+        values = [self._sampled.get(path) for path in paths]
+        return [min(times) - start_wall if times else None] + [None if v is None else float(v) for v in values]
+
+    def _apply_step(self, step):
+        device = self.odrive_manager.current_device
+        if device is None:
+            raise Exception("Device disconnected during playback")
+        for axis, index in step:
+            _, pos, vel, torque = self.trajectories[axis][index]
+            controller = getattr(device, f'axis{axis}').controller
+            controller.input_vel = vel
+            controller.input_torque = torque
+            controller.input_pos = pos
+
+    def _run(self):
+        schedule = self._build_schedule()
+        self._wait_for_first_samples()
+        start = time.perf_counter()
+        start_wall = time.time()
+        try:
+            for t, step in schedule:
+                deadline = start + t
+                while True:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    if remaining > SPIN_THRESHOLD:
+                        if self._stop_event.wait(remaining - SPIN_THRESHOLD):
+                            break
+                if self._stop_event.is_set():
+                    break
+
+                lateness = time.perf_counter() - deadline
+                self.odrive_manager.execute_with_lock(self._apply_step, step)
+                t_actual = time.perf_counter() - start
+
+                with self._lock:
+                    self.max_lateness = max(self.max_lateness, lateness)
+                    for axis, index in step:
+                        self.results[axis][index] = [t, t_actual] + self._recorded_row(axis, start_wall)
+                        self.points_played += 1
+
+            with self._lock:
+                self.state = 'stopped' if self._stop_event.is_set() else 'complete'
+        except Exception as e:
+            logger.error(f"Trajectory playback failed: {e}")
+            with self._lock:
+                self.state = 'failed'
+                self.error = str(e)
+        finally:
+            self._stop_recording()
+        self._publish({'state': self.state, 'error': self.error})
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self.state,
+                'error': self.error,
+                'warnings': self.warnings,
+                'axes': {f'axis{axis}': {'points': len(rows), 'duration': rows[-1][0]}
+                         for axis, rows in self.trajectories.items()},
+                'points_played': self.points_played,
+                'max_lateness_ms': self.max_lateness * 1000,
+            }
+
+    def get_result(self) -> Dict[str, Any]:
+        """Recorded telemetry, one row per trajectory point (None if not reached)"""
+        with self._lock:
+            return {
+                'state': self.state,
+                'columns': RESULT_COLUMNS,
+                'axes': {f'axis{axis}': [list(row) for row in rows] for axis, rows in self.results.items()},
+            }
@@ -0,0 +1,52 @@
+"""
+Conditional responses
+ETags for endpoints returning configuration values, derived from the device
+state version (see ODriveManager.state_version). A client re-fetching the same
+paths with If-None-Match gets 304 without any USB reads or JSON encoding.
+"""
+
+import zlib
+from typing import Iterable, Optional
+
+from flask import request, make_response
+
+from ..metrics import metrics
+from ..odrive_telemetry_config import get_frequency_class
+
+metrics.describe('odrive_http_not_modified_total', 'counter', 'Requests answered with 304 Not Modified by endpoint')
+
+
+def config_etag(odrive_manager, paths: Iterable[str]) -> Optional[str]:
+    """ETag for reading paths, or None if any path can change without a write (live values)"""
+    paths = list(paths)
+    if any(get_frequency_class(path) != 'once' for path in paths):
+        return None
+    # Taken before the read: a write landing mid-read bumps the version, so the next request refetches
+    version = odrive_manager.state_version()
+    if version is None:
+        return None
+    digest = zlib.crc32('\n'.join(sorted(paths)).encode())
+    return f'"{version}-{digest:08x}"'
+
+
+def etag_matches(etag: Optional[str]) -> bool:
+    """True if the request's If-None-Match lists etag"""
+    header = request.headers.get('If-None-Match')
+    if not etag or not header:
+        return False
+    return header.strip() == '*' or etag in [tag.strip() for tag in header.split(',')]
+
+
+def not_modified(etag: str):
+    """Empty 304 response for a matching If-None-Match"""
+    metrics.inc('odrive_http_not_modified_total', endpoint=request.endpoint or 'unknown')
+    response = make_response('', 304)
+    response.headers['ETag'] = etag
+    return response
+
+
+def with_etag(response, etag: Optional[str]):
+    """Attach etag to a response (no-op for uncacheable reads)"""
+    if etag:
+        response.headers['ETag'] = etag
+    return response
@@ -0,0 +1,128 @@
+"""
+JSON encoding for API responses
+One encoder for every endpoint, installed as the Flask JSON provider so
+jsonify() uses it everywhere. Payloads are encoded in a single C-encoder pass;
+values json cannot encode (libfibre/enum/numpy types) go through a per-type
+converter table, and NaN/Inf follow one configurable policy instead of
+per-route sanitizers.
+"""
+
+import json
+import logging
+import os
+import re
+from typing import Any, Callable, Dict
+
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+NON_FINITE_ENV = 'ODRIVE_JSON_NON_FINITE'
+
+# Policy -> JSON text written for NaN, +Inf and -Inf
+NON_FINITE_POLICIES = {
+    # Default: NaN means "no value"; infinity is a meaningful setting (e.g. unlimited vel_limit)
+    'string': {'NaN': 'null', 'Infinity': '"Infinity"', '-Infinity': '"-Infinity"'},
+    'null': {'NaN': 'null', 'Infinity': 'null', '-Infinity': 'null'},
+    'clamp': {'NaN': 'null', 'Infinity': '1e10', '-Infinity': '-1e10'},
+}
+DEFAULT_NON_FINITE_POLICY = 'string'
+
+MAX_STRING_LENGTH = 1000
+
+# Splits encoded text into literal-free segments (even indices) and string literals (odd)
+_STRING_LITERALS = re.compile(r'("[^"\\]*(?:\\.[^"\\]*)*")')
+_NON_FINITE_TOKENS = re.compile(r'-?Infinity|NaN')
+
+_non_finite_policy = DEFAULT_NON_FINITE_POLICY
+_non_finite_text = NON_FINITE_POLICIES[DEFAULT_NON_FINITE_POLICY]
+
+
+def set_non_finite_policy(policy: str):
+    """Select how NaN and +/-Inf are written (see NON_FINITE_POLICIES)"""
+    global _non_finite_policy, _non_finite_text
+    if policy not in NON_FINITE_POLICIES:
+        raise ValueError(f"Unknown non-finite policy '{policy}', expected one of {sorted(NON_FINITE_POLICIES)}")
+    _non_finite_policy = policy
+    _non_finite_text = NON_FINITE_POLICIES[policy]
+
+
+def get_non_finite_policy() -> str:
+    return _non_finite_policy
+
+
+def _truncated_str(value) -> str:
+    # Anything else (remote objects, functions) is reported by its string form
+    text = str(value)
+    return text if len(text) <= MAX_STRING_LENGTH else text[:MAX_STRING_LENGTH] + '...'
+
+
+# Type -> converter to a JSON-native value; types not listed are resolved once and cached
+_CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    set: list,
+    frozenset: list,
+}
+
+
+def _to_primitive(value):
+    """json default hook: convert a value json cannot encode natively"""
+    value_type = type(value)
+    converter = _CONVERTERS.get(value_type)
+    if converter is None:
+        if hasattr(value, 'value'):
+            converter = lambda v: v.value  # Enum handling
+        elif hasattr(value, '__index__'):
+            converter = int
+        elif hasattr(value, '__float__'):
+            converter = float
+        else:
+            converter = _truncated_str
+        _CONVERTERS[value_type] = converter
+    return converter(value)
+
+
+_encoder = json.JSONEncoder(check_circular=False, separators=(',', ':'), default=_to_primitive)
+
+
+def _apply_non_finite_policy(text: str) -> str:
+    """Rewrite the bare NaN/Infinity tokens the encoder wrote, leaving string literals alone"""
+    parts = _STRING_LITERALS.split(text)
+    for i in range(0, len(parts), 2):
+        segment = parts[i]
+        # Outside literals only numbers, punctuation and true/false/null occur, so N/I mark a token
+        if 'N' in segment or 'I' in segment:
+            parts[i] = _NON_FINITE_TOKENS.sub(lambda match: _non_finite_text[match.group(0)], segment)
+    return ''.join(parts)
+
+
+def dumps(value) -> str:
+    """Encode a response payload; a dict entry that cannot be encoded becomes null"""
+    try:
+        text = _encoder.encode(value)
+    except Exception as e:
+        logger.error(f"JSON encoding failed: {e}")
+        if not isinstance(value, dict):
+            return 'null'
+        parts = []
+        for key, item in value.items():
+            try:
+                item_text = _encoder.encode(item)
+            except Exception:
+                item_text = 'null'
+            parts.append(_encoder.encode(str(key)) + ':' + item_text)
+        text = '{' + ','.join(parts) + '}'
+
+    if 'Infinity' in text or 'NaN' in text:
+        text = _apply_non_finite_policy(text)
+    return text
+
+
+class ODriveJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider writing every response through dumps()"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj)
+
+
+if os.environ.get(NON_FINITE_ENV):
+    set_non_finite_policy(os.environ[NON_FINITE_ENV])
@@ -0,0 +1,106 @@
+"""
+Single-flight coalescing
+Concurrent callers asking for the same key share one in-flight call instead of
+repeating it. do_many() works per key, so overlapping key sets split into the
+keys a caller fetches itself and the keys it waits on.
+"""
+
+import threading
+from typing import Dict, Any, Callable, Hashable, Iterable, List
+
+
+class _Call:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs):
+        """Run func once for all concurrent callers of key; waiters get its result or exception"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = func(*args, **kwargs)
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def do_many(self, keys: Iterable[Hashable],
+                func: Callable[[List[Hashable]], Dict[Hashable, Any]]) -> Dict[Hashable, Any]:
+        """Fetch keys with func(missing_keys) -> {key: value}, sharing keys already in flight.
+
+        The caller first runs func for the keys nobody else is fetching, then
+        waits for the rest, so two callers with overlapping sets never wait on
+        each other before finishing their own part.
+        """
+        owned: List[Hashable] = []
+        calls: Dict[Hashable, _Call] = {}
+        with self._lock:
+            for key in keys:
+                if key in calls:
+                    continue
+                call = self._calls.get(key)
+                if call is None:
+                    call = self._calls[key] = _Call()
+                    owned.append(key)
+                else:
+                    self.shared += 1
+                calls[key] = call
+            self.executed += len(owned)
+
+        if owned:
+            error = None
+            values: Dict[Hashable, Any] = {}
+            try:
+                values = func(owned)
+            except BaseException as e:
+                error = e
+            with self._lock:
+                for key in owned:
+                    del self._calls[key]
+            for key in owned:
+                calls[key].value = values.get(key)
+                calls[key].error = error
+                calls[key].done.set()
+            if error is not None:
+                raise error
+
+        results = {}
+        for key, call in calls.items():
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            results[key] = call.value
+        return results
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'executed': self.executed, 'shared': self.shared, 'in_flight': len(self._calls)}
@@ -2,7 +2,6 @@ import os
 import sys
 import time
 import webbrowser
-import math
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,42 +28,3 @@ def get_static_folder():
     else:
         # Running in development
         return os.path.join(os.path.dirname(__file__), '..', 'frontend', 'dist')
-
-def sanitize_for_json(obj, path=""):
-    """Recursively sanitize data to handle problematic values like Infinity and NaN"""
-    try:
-        if obj is None:
-            return None
-        elif isinstance(obj, (int, str, bool)):
-            return obj
-        elif isinstance(obj, float):
-            if math.isnan(obj):
-                return None  # Convert NaN to null
-            elif math.isinf(obj):
-                if obj > 0:
-                    return 1e10  # Replace positive infinity with large number
-                else:
-                    return -1e10  # Replace negative infinity with large negative number
-            else:
-                return obj
-        elif isinstance(obj, dict):
-            result = {}
-            for k, v in obj.items():
-                try:
-                    result[k] = sanitize_for_json(v, f"{path}.{k}")
-                except Exception as e:
-                    logger.warning(f"Error sanitizing key {k} at {path}: {e}")
-                    result[k] = None
-            return result
-        elif isinstance(obj, list):
-            return [sanitize_for_json(item, f"{path}[{i}]") for i, item in enumerate(obj)]
-        else:
-            # Convert any other type to string
-            str_val = str(obj)
-            if len(str_val) > 1000:  # Prevent extremely long strings
-                logger.warning(f"Truncating long string at {path}")
-                return str_val[:1000] + "..."
-            return str_val
-    except Exception as e:
-        logger.warning(f"Error sanitizing object at {path}: {e}")
-        return None
\ No newline at end of file
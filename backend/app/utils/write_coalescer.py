@@ -0,0 +1,92 @@
+"""
+Latest-wins write coalescing
+One write per key runs at a time. Values submitted for a key while its write
+is running replace each other, and only the newest is written next; every
+caller whose value was replaced gets the result of the write that superseded it.
+"""
+
+import threading
+from typing import Dict, Any, Callable, Hashable, Tuple
+
+
+class _Batch:
+    __slots__ = ('value', 'sequence', 'done', 'result', 'error')
+
+    def __init__(self):
+        self.value = None
+        self.sequence = 0
+        self.done = False
+        self.result = None
+        self.error = None
+
+
+class _Slot:
+    __slots__ = ('condition', 'writing', 'pending')
+
+    def __init__(self, lock: threading.Lock):
+        self.condition = threading.Condition(lock)
+        self.writing = False
+        self.pending = None
+
+
+class WriteCoalescer:
+    def __init__(self):
+        self._slots: Dict[Hashable, _Slot] = {}
+        self._lock = threading.Lock()
+        self.written = 0
+        self.superseded = 0
+
+    def submit(self, key: Hashable, value: Any, write: Callable[[Any], Any]) -> Tuple[Any, Any, bool]:
+        """Write value for key (or let a newer value replace it).
+
+        Returns (result of write, value actually written, whether this
+        caller's value was replaced by a newer one). If the write raises,
+        every caller it was written for gets the exception.
+        """
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = _Slot(self._lock)
+            batch = slot.pending
+            if batch is None:
+                batch = slot.pending = _Batch()
+            batch.value = value
+            batch.sequence += 1
+            sequence = batch.sequence
+
+            # Wait for the running write; the first waiter to wake writes the batch's newest value
+            while slot.writing and not batch.done:
+                slot.condition.wait()
+            if batch.done:
+                superseded = sequence != batch.sequence
+                if superseded:
+                    self.superseded += 1
+                if batch.error is not None:
+                    raise batch.error
+                return batch.result, batch.value, superseded
+
+            slot.writing = True
+            slot.pending = None
+            value = batch.value
+            superseded = sequence != batch.sequence
+            if superseded:
+                self.superseded += 1
+
+        try:
+            batch.result = write(value)
+            return batch.result, value, superseded
+        except BaseException as e:
+            batch.error = e
+            raise
+        finally:
+            with self._lock:
+                batch.done = True
+                self.written += 1
+                slot.writing = False
+                if slot.pending is None and self._slots.get(key) is slot:
+                    del self._slots[key]
+                slot.condition.notify_all()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'written': self.written, 'superseded': self.superseded, 'pending': len(self._slots)}
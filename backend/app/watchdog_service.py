@@ -0,0 +1,248 @@
+"""
+Backend watchdog feeder
+Feeds axis watchdogs from dedicated high-priority threads instead of browser
+polling, and deliberately stops feeding when the connection health check
+fails so the ODrive's own watchdog can trip.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+WATCHDOG_EVENT_TOPIC = 'watchdog'
+
+# Windows thread priority constant (winbase.h)
+THREAD_PRIORITY_TIME_CRITICAL = 15
+
+_priority_warning_logged = False
+
+
+def _boost_current_thread_priority() -> bool:
+    """Best-effort raise of the calling thread's scheduling priority.
+
+    Returns True if the Windows timer resolution was raised, which the caller
+    must undo with _restore_timer_resolution().
+    """
+    global _priority_warning_logged
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_PRIORITY_TIME_CRITICAL)
+            # Default Windows timer resolution is ~15ms, far too coarse for tight timeouts
+            return ctypes.windll.winmm.timeBeginPeriod(1) == 0
+        elif hasattr(os, 'sched_setscheduler'):
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(10))
+    except Exception as e:
+        if not _priority_warning_logged:
+            _priority_warning_logged = True
+            # SCHED_FIFO needs root or CAP_SYS_NICE; feeding still works, just with more jitter
+            logger.warning(f"Could not raise watchdog thread priority, feed timing may jitter: {e}")
+    return False
+
+
+def _restore_timer_resolution():
+    try:
+        import ctypes
+        ctypes.windll.winmm.timeEndPeriod(1)
+    except Exception as e:
+        logger.debug(f"Could not restore timer resolution: {e}")
+
+
+class AxisWatchdogFeeder:
+    """Feeds one axis watchdog at a fixed period and tracks timing jitter"""
+
+    def __init__(self, service, axis: int, period: float, timeout: Optional[float]):
+        self.service = service
+        self.axis = axis
+        self.period = period
+        self.timeout = timeout
+        self.state = 'stopped'
+        self.halt_reason = None
+        self.feed_count = 0
+        self.feed_errors = 0
+        self.late_feeds = 0
+        self.max_interval = 0.0
+        self._jitter = deque(maxlen=1000)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._stop_event.clear()
+        self.state = 'feeding'
+        self.halt_reason = None
+        self._thread = threading.Thread(target=self._run, name=f'WatchdogFeeder-axis{self.axis}',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        if self.state == 'feeding':
+            self.state = 'stopped'
+
+    def _halt(self, reason: str):
+        """Stop feeding on purpose so the device watchdog can expire"""
+        self.state = 'halted'
+        self.halt_reason = reason
+        self._stop_event.set()
+        logger.warning(f"Watchdog feeding halted on axis{self.axis}: {reason}")
+        self.service.publish({'axis': self.axis, 'state': 'halted', 'reason': reason})
+
+    def _feed(self):
+        device = self.service.odrive_manager.current_device
+        if device is None:
+            raise Exception("No device connected")
+        getattr(device, f'axis{self.axis}').watchdog_feed()
+
+    def _run(self):
+        timer_raised = _boost_current_thread_priority()
+        try:
+            self._feed_loop()
+        finally:
+            # Halts end the thread without going through stop(), so the timer is restored here
+            if timer_raised:
+                _restore_timer_resolution()
+
+    def _feed_loop(self):
+        manager = self.service.odrive_manager
+        consecutive_errors = 0
+        last_feed = None
+        last_health_check = time.monotonic()
+        deadline = time.monotonic()
+
+        while not self._stop_event.is_set():
+            deadline += self.period
+            delay = deadline - time.monotonic()
+            if delay > 0 and self._stop_event.wait(delay):
+                break
+
+            now = time.monotonic()
+            if now - last_health_check >= self.service.health_check_interval:
+                last_health_check = now
+                if not manager.execute_with_lock(manager.check_connection):
+                    self._halt('Connection health check failed')
+                    break
+
+            try:
+                manager.execute_with_lock(self._feed)
+                consecutive_errors = 0
+            except Exception as e:
+                consecutive_errors += 1
+                with self._lock:
+                    self.feed_errors += 1
+                if consecutive_errors >= self.service.max_consecutive_errors:
+                    self._halt(f'Feed failed {consecutive_errors} times: {e}')
+                    break
+                continue
+
+            fed_at = time.monotonic()
+            with self._lock:
+                self.feed_count += 1
+                self._jitter.append(fed_at - deadline)
+                if last_feed is not None:
+                    interval = fed_at - last_feed
+                    self.max_interval = max(self.max_interval, interval)
+                    if self.timeout and interval > self.timeout:
+                        self.late_feeds += 1
+            last_feed = fed_at
+
+            if fed_at - deadline > self.period:
+                # Overran a whole period - resynchronise instead of bursting
+                deadline = fed_at
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            jitter = sorted(self._jitter)
+            status = {
+                'axis': self.axis,
+                'state': self.state,
+                'halt_reason': self.halt_reason,
+                'period_ms': self.period * 1000,
+                'timeout_ms': self.timeout * 1000 if self.timeout else None,
+                'feed_count': self.feed_count,
+                'feed_errors': self.feed_errors,
+                'late_feeds': self.late_feeds,
+                'max_interval_ms': self.max_interval * 1000,
+            }
+        if jitter:
+            status['jitter_ms'] = {
+                'mean': sum(jitter) / len(jitter) * 1000,
+                'p50': jitter[len(jitter) // 2] * 1000,
+                'p99': jitter[min(len(jitter) - 1, int(len(jitter) * 0.99))] * 1000,
+                'max': jitter[-1] * 1000,
+            }
+        return status
+
+
+class WatchdogService:
+    def __init__(self, odrive_manager, event_bus=None, health_check_interval: float = 0.5,
+                 max_consecutive_errors: int = 3):
+        self.odrive_manager = odrive_manager
+        self.event_bus = event_bus
+        self.health_check_interval = health_check_interval
+        self.max_consecutive_errors = max_consecutive_errors
+        self._feeders: Dict[int, AxisWatchdogFeeder] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, data: Dict[str, Any]):
+        if self.event_bus:
+            self.event_bus.publish(WATCHDOG_EVENT_TOPIC, data)
+
+    def _read_axis_watchdog_config(self, axis: int):
+        def _read():
+            device = self.odrive_manager.current_device
+            if device is None:
+                raise Exception("No device connected")
+            config = getattr(device, f'axis{axis}').config
+            return bool(config.enable_watchdog), float(config.watchdog_timeout)
+        return self.odrive_manager.execute_with_lock(_read)
+
+    def start(self, axis: int, period: Optional[float] = None) -> Dict[str, Any]:
+        """Start feeding the watchdog of an axis; period defaults to a third of the timeout"""
+        enabled, timeout = self._read_axis_watchdog_config(axis)
+        if not enabled:
+            return {'error': f'Watchdog is not enabled on axis{axis} (axis{axis}.config.enable_watchdog)'}
+        if timeout <= 0:
+            return {'error': f'Invalid watchdog timeout on axis{axis}: {timeout}'}
+
+        if period is None:
+            period = timeout / 3
+        if period >= timeout:
+            return {'error': f'Feed period {period * 1000:.1f}ms must be shorter than the watchdog timeout {timeout * 1000:.1f}ms'}
+
+        with self._lock:
+            existing = self._feeders.get(axis)
+            if existing:
+                existing.stop()
+            feeder = AxisWatchdogFeeder(self, axis, period, timeout)
+            self._feeders[axis] = feeder
+            feeder.start()
+
+        logger.info(f"Watchdog feeder started on axis{axis} (period {period * 1000:.1f}ms, timeout {timeout * 1000:.1f}ms)")
+        self.publish({'axis': axis, 'state': 'feeding', 'period_ms': period * 1000})
+        return feeder.get_status()
+
+    def stop(self, axis: Optional[int] = None) -> Dict[str, Any]:
+        """Stop feeding one axis, or all axes when axis is None"""
+        with self._lock:
+            axes = [axis] if axis is not None else list(self._feeders)
+            for axis_num in axes:
+                feeder = self._feeders.get(axis_num)
+                if feeder:
+                    feeder.stop()
+                    self.publish({'axis': axis_num, 'state': 'stopped'})
+        return self.get_status()
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            feeders = list(self._feeders.values())
+        return {'axes': {f'axis{f.axis}': f.get_status() for f in feeders}}
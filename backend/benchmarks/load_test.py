@@ -0,0 +1,422 @@
+"""
+HTTP load test replaying the frontend's polling patterns
+Each simulated browser session runs the same timers as the React app and
+sends requests over a browser-sized keep-alive connection pool (6 per host).
+Requests the pool can't send yet wait in a per-session backlog, like fetch()
+calls queued by the browser:
+
+    charts       useChartsTelemetry      adaptive (see below)  POST /api/telemetry/get-telemetry
+    dashboard    useDashboardTelemetry   every 50 ms           POST /api/telemetry/get-telemetry (12 paths)
+    calibration  useCalibration          every 500 ms          GET  /api/odrive/calibration_status
+    inspector    refreshAllProperties    on demand             POST /api/odrive/property (whole tree)
+
+charts polls like the hook: one request in flight, asking for rate_hz with
+its own client_id, then waiting sampling.next_poll_ms (retry_after_ms after
+a 429) before the next one, clamped to 1-2000 ms.
+
+Latency is measured from when the request was due, so it includes time spent
+queued client-side. Works against a real or simulated backend. The backend
+rate-limits per client, and each session sends its own X-Client-Id like a
+separate browser, but all sessions share one address and its aggregate limit;
+start it with ODRIVE_NO_RATE_LIMIT=1 to measure raw capacity instead.
+
+Usage (from backend/, with the backend running, e.g. start_backend.py --simulate 2):
+    python -m benchmarks.load_test --sessions 4 --duration 30 --connect
+    python -m benchmarks.load_test --ramp 1,2,4,8 --patterns dashboard calibration
+"""
+
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.run_benchmarks import DASHBOARD_PATHS, percentile, RESULTS_DIR
+
+# Browsers allow 6 concurrent HTTP/1.1 connections per host
+BROWSER_CONNECTIONS = 6
+# Cap on requests a session may have waiting for a free connection
+DEFAULT_MAX_BACKLOG = 256
+DEFAULT_TIMEOUT = 5.0
+
+CHART_PATHS = [
+    'axis0.encoder.pos_estimate',
+    'axis0.encoder.vel_estimate',
+    'axis0.motor.current_control.Iq_measured',
+    'axis0.motor.current_control.Iq_setpoint',
+]
+
+# useChartsTelemetry's requested rate and poll delay bounds
+CHARTS_RATE_HZ = 1000
+MIN_POLL_INTERVAL = 0.001
+MAX_POLL_INTERVAL = 2.0
+
+# A session is considered served when a pattern reaches this share of its target rate
+HEALTHY_RATE_FRACTION = 0.9
+
+
+def inspector_paths() -> List[str]:
+    """Property paths of the full tree, as refreshAllProperties requests them"""
+    from app.simulator import SimLatency, SimulatedODrive
+    device = SimulatedODrive(latency=SimLatency(0, 0, 0, 0))
+    return device.leaf_paths()
+
+
+class Pattern:
+    def __init__(self, name: str, method: str, path: str, interval: float, body: Optional[Dict] = None,
+                 telemetry: bool = False):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.interval = interval
+        self.body = json.dumps(body).encode('utf-8') if body is not None else None
+        self.telemetry = telemetry
+
+    @property
+    def target_rate(self) -> float:
+        return 1.0 / self.interval
+
+    def body_for(self, session: int) -> Optional[bytes]:
+        return self.body
+
+
+class AdaptivePattern(Pattern):
+    """A poller that schedules its next request from the previous response (useChartsTelemetry)"""
+
+    def __init__(self, name: str, path: str, rate_hz: float, paths: List[str]):
+        super().__init__(name, 'POST', path, 1.0 / rate_hz, telemetry=True)
+        self.rate_hz = rate_hz
+        self.paths = paths
+        self._bodies: Dict[int, bytes] = {}
+
+    def body_for(self, session: int) -> bytes:
+        body = self._bodies.get(session)
+        if body is None:
+            body = self._bodies[session] = json.dumps({
+                'paths': self.paths, 'rate_hz': self.rate_hz, 'client_id': f'charts-load-test-{session}',
+            }).encode('utf-8')
+        return body
+
+    def next_delay(self, status: Optional[int], body: bytes) -> float:
+        delay = self.interval
+        try:
+            if status == 200:
+                delay = json.loads(body).get('sampling', {}).get('next_poll_ms', delay * 1000) / 1000.0
+            elif status == 429:
+                delay = json.loads(body).get('retry_after_ms', delay * 1000) / 1000.0
+            elif status is None:
+                delay = MAX_POLL_INTERVAL / 4
+        except (ValueError, AttributeError, TypeError):
+            pass
+        return min(MAX_POLL_INTERVAL, max(MIN_POLL_INTERVAL, delay))
+
+
+def build_patterns(args) -> Dict[str, Pattern]:
+    return {
+        'charts': AdaptivePattern('charts', '/api/telemetry/get-telemetry', args.charts_rate_hz, CHART_PATHS),
+        'dashboard': Pattern('dashboard', 'POST', '/api/telemetry/get-telemetry', 0.05,
+                             {'paths': DASHBOARD_PATHS}, telemetry=True),
+        'calibration': Pattern('calibration', 'GET', '/api/odrive/calibration_status?axis=0', 0.5),
+        'inspector': Pattern('inspector', 'POST', '/api/odrive/property', args.inspector_interval,
+                             {'paths': inspector_paths()}),
+    }
+
+
+class PatternStats:
+    def __init__(self):
+        self.scheduled = 0
+        self.completed = 0
+        self.errors = 0
+        self.dropped = 0
+        self.samples = 0
+        self.latencies: List[float] = []
+        self.service_times: List[float] = []
+
+
+class LoadStats:
+    def __init__(self, patterns: List[str]):
+        self.lock = threading.Lock()
+        self.patterns = {name: PatternStats() for name in patterns}
+
+    def record(self, name: str, latency: float, service: float, ok: bool, sample: bool):
+        with self.lock:
+            stats = self.patterns[name]
+            if ok:
+                stats.completed += 1
+                stats.latencies.append(latency)
+                stats.service_times.append(service)
+                if sample:
+                    stats.samples += 1
+            else:
+                stats.errors += 1
+
+    def scheduled(self, name: str, dropped: bool):
+        with self.lock:
+            stats = self.patterns[name]
+            stats.scheduled += 1
+            if dropped:
+                stats.dropped += 1
+
+
+class BrowserSession:
+    def __init__(self, index: int, host: str, port: int, patterns: List[Pattern], stats: LoadStats,
+                 max_backlog: int, timeout: float):
+        self.index = index
+        self.host = host
+        self.port = port
+        self.patterns = patterns
+        self.stats = stats
+        self.max_backlog = max_backlog
+        self.timeout = timeout
+        self.backlog = deque()
+        self.backlog_ready = threading.Condition()
+        self.stop_event = threading.Event()
+        self.threads: List[threading.Thread] = []
+
+    def start(self):
+        self.threads.append(threading.Thread(target=self._timers, name=f'session{self.index}-timers', daemon=True))
+        for pattern in self.patterns:
+            if isinstance(pattern, AdaptivePattern):
+                self.threads.append(threading.Thread(target=self._poll, args=(pattern,),
+                                                     name=f'session{self.index}-{pattern.name}', daemon=True))
+        for n in range(BROWSER_CONNECTIONS):
+            self.threads.append(threading.Thread(target=self._connection, name=f'session{self.index}-conn{n}',
+                                                 daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        with self.backlog_ready:
+            self.backlog_ready.notify_all()
+        for thread in self.threads:
+            thread.join(timeout=self.timeout + 1)
+
+    def _enqueue(self, pattern: Pattern, due: float, reply: Optional[Dict[str, Any]] = None) -> bool:
+        with self.backlog_ready:
+            dropped = len(self.backlog) >= self.max_backlog
+            if not dropped:
+                self.backlog.append((pattern, due, reply))
+                self.backlog_ready.notify()
+        self.stats.scheduled(pattern.name, dropped)
+        return not dropped
+
+    def _poll(self, pattern: AdaptivePattern):
+        # Stagger sessions so they don't all start on the same tick
+        self.stop_event.wait((self.index % 10) * 0.003)
+        while not self.stop_event.is_set():
+            reply = {'done': threading.Event(), 'status': None, 'body': b''}
+            if self._enqueue(pattern, time.perf_counter(), reply):
+                while not reply['done'].wait(0.1):
+                    if self.stop_event.is_set():
+                        return
+            self.stop_event.wait(pattern.next_delay(reply['status'], reply['body']))
+
+    def _timers(self):
+        # Stagger sessions so they don't all fire on the same tick
+        start = time.perf_counter() + (self.index % 10) * 0.003
+        timed = [pattern for pattern in self.patterns if not isinstance(pattern, AdaptivePattern)]
+        if not timed:
+            return
+        next_fire = {pattern.name: start for pattern in timed}
+        while not self.stop_event.is_set():
+            now = time.perf_counter()
+            for pattern in timed:
+                fire_at = next_fire[pattern.name]
+                if now < fire_at:
+                    continue
+                # setInterval doesn't catch up on missed ticks
+                next_fire[pattern.name] = max(fire_at + pattern.interval, now)
+                self._enqueue(pattern, now)
+            delay = min(next_fire.values()) - time.perf_counter()
+            if delay > 0:
+                self.stop_event.wait(delay)
+
+    def _connection(self):
+        connection = None
+        while not self.stop_event.is_set():
+            with self.backlog_ready:
+                while not self.backlog and not self.stop_event.is_set():
+                    self.backlog_ready.wait(0.1)
+                if self.stop_event.is_set():
+                    break
+                pattern, fired_at, reply = self.backlog.popleft()
+
+            if connection is None:
+                connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            sent_at = time.perf_counter()
+            ok = sample = False
+            status, body = None, b''
+            try:
+                headers = {'X-Client-Id': f'load-test-{self.index}'}
+                payload = pattern.body_for(self.index)
+                if payload is not None:
+                    headers['Content-Type'] = 'application/json'
+                connection.request(pattern.method, pattern.path, body=payload, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+                status = response.status
+                ok = status == 200
+                if ok and pattern.telemetry:
+                    data = json.loads(body)
+                    # Cached repeats of the previous sample are not forwarded to the chart
+                    sample = data.get('connected') is True and data.get('sampling', {}).get('fresh') is not False
+            except Exception:
+                connection.close()
+                connection = None
+            done = time.perf_counter()
+            self.stats.record(pattern.name, done - fired_at, done - sent_at, ok, sample)
+            if reply is not None:
+                reply['status'], reply['body'] = status, body
+                reply['done'].set()
+        if connection is not None:
+            connection.close()
+
+
+def connect_first_device(host: str, port: int, timeout: float) -> Optional[Dict[str, Any]]:
+    """Scan and connect so telemetry requests hit a device (useful with --simulate)"""
+    connection = http.client.HTTPConnection(host, port, timeout=max(timeout, 30))
+    try:
+        connection.request('GET', '/api/odrive/scan')
+        devices = json.loads(connection.getresponse().read())
+        if not isinstance(devices, list) or not devices:
+            return None
+        body = json.dumps({'device': devices[0]}).encode('utf-8')
+        connection.request('POST', '/api/odrive/connect', body=body, headers={'Content-Type': 'application/json'})
+        result = json.loads(connection.getresponse().read())
+        return devices[0] if result.get('success') else None
+    finally:
+        connection.close()
+
+
+def summarize(stats: LoadStats, patterns: Dict[str, Pattern], sessions: int, duration: float) -> Dict[str, Any]:
+    summary = {}
+    for name, pattern_stats in stats.patterns.items():
+        pattern = patterns[name]
+        latencies = sorted(pattern_stats.latencies)
+        service = sorted(pattern_stats.service_times)
+        achieved = pattern_stats.completed / duration / sessions if duration > 0 else 0.0
+        summary[name] = {
+            'target_rate_hz': round(pattern.target_rate, 2),
+            'achieved_rate_hz_per_session': round(achieved, 2),
+            'achieved_fraction': round(achieved / pattern.target_rate, 3),
+            'sample_rate_hz_per_session': round(pattern_stats.samples / duration / sessions, 2)
+            if pattern.telemetry and duration > 0 else None,
+            'scheduled': pattern_stats.scheduled,
+            'completed': pattern_stats.completed,
+            'errors': pattern_stats.errors,
+            'dropped': pattern_stats.dropped,
+            'latency_ms': {
+                'p50': round(percentile(latencies, 0.50) * 1000, 2),
+                'p90': round(percentile(latencies, 0.90) * 1000, 2),
+                'p99': round(percentile(latencies, 0.99) * 1000, 2),
+                'max': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            },
+            'service_ms_p50': round(percentile(service, 0.50) * 1000, 2),
+        }
+    return summary
+
+
+def run_load(base_url: str, sessions: int, duration: float, patterns: Dict[str, Pattern],
+             selected: List[str], max_backlog: int, timeout: float) -> Dict[str, Any]:
+    parsed = urlparse(base_url)
+    host, port = parsed.hostname or 'localhost', parsed.port or 80
+    stats = LoadStats(selected)
+    clients = [BrowserSession(index, host, port, [patterns[name] for name in selected], stats, max_backlog, timeout)
+               for index in range(sessions)]
+    started = time.perf_counter()
+    for client in clients:
+        client.start()
+    try:
+        time.sleep(duration)
+    finally:
+        for client in clients:
+            client.stop_event.set()
+        elapsed = time.perf_counter() - started
+        for client in clients:
+            client.stop()
+    return {'sessions': sessions, 'duration_s': round(elapsed, 2),
+            'patterns': summarize(stats, patterns, sessions, elapsed)}
+
+
+def print_summary(result: Dict[str, Any]):
+    print(f"\n{result['sessions']} session(s), {result['duration_s']}s")
+    print(f"{'pattern':<13}{'target Hz':>10}{'got Hz':>9}{'samples':>9}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'errors':>8}{'dropped':>9}")
+    for name, p in result['patterns'].items():
+        samples = '-' if p['sample_rate_hz_per_session'] is None else f"{p['sample_rate_hz_per_session']:.1f}"
+        print(f"{name:<13}{p['target_rate_hz']:>10.1f}{p['achieved_rate_hz_per_session']:>9.1f}{samples:>9}"
+              f"{p['latency_ms']['p50']:>9.1f}{p['latency_ms']['p99']:>9.1f}{p['errors']:>8}{p['dropped']:>9}")
+
+
+def is_healthy(result: Dict[str, Any], pattern_names: List[str]) -> bool:
+    return all(result['patterns'][name]['achieved_fraction'] >= HEALTHY_RATE_FRACTION
+               and result['patterns'][name]['errors'] == 0 for name in pattern_names)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay frontend polling against a running backend')
+    parser.add_argument('--url', default='http://localhost:5000', help='Backend base URL')
+    parser.add_argument('--sessions', type=int, default=1, help='Concurrent browser sessions')
+    parser.add_argument('--ramp', help='Comma-separated session counts to run in turn, e.g. 1,2,4,8')
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds per run')
+    parser.add_argument('--patterns', nargs='+', default=['charts', 'dashboard', 'calibration'],
+                        choices=['charts', 'dashboard', 'calibration', 'inspector'])
+    parser.add_argument('--charts-rate-hz', type=float, default=CHARTS_RATE_HZ,
+                        help='Rate useChartsTelemetry asks the backend for (it polls at the rate the backend grants)')
+    parser.add_argument('--inspector-interval', type=float, default=10.0,
+                        help='Seconds between Inspector refreshAllProperties calls')
+    parser.add_argument('--healthy-patterns', nargs='+', default=['dashboard'],
+                        help='Patterns that must hold their target rate for a session count to count as served')
+    parser.add_argument('--max-backlog', type=int, default=DEFAULT_MAX_BACKLOG,
+                        help='Queued requests per session before new ticks are dropped')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Per-request timeout in seconds')
+    parser.add_argument('--connect', action='store_true', help='Scan and connect the first device before starting')
+    parser.add_argument('--output', help='Write results as JSON (default: benchmarks/results/load-<timestamp>.json)')
+    args = parser.parse_args(argv)
+
+    parsed = urlparse(args.url)
+    if args.connect:
+        device = connect_first_device(parsed.hostname or 'localhost', parsed.port or 80, args.timeout)
+        if not device:
+            print("No device found to connect to")
+            return 1
+        print(f"Connected to {device.get('path')} ({device.get('serial')})")
+
+    patterns = build_patterns(args)
+    session_counts = [int(n) for n in args.ramp.split(',')] if args.ramp else [args.sessions]
+    runs = []
+    for sessions in session_counts:
+        print(f"Running {sessions} session(s) for {args.duration:.0f}s: {', '.join(args.patterns)}", flush=True)
+        result = run_load(args.url, sessions, args.duration, patterns, args.patterns, args.max_backlog, args.timeout)
+        print_summary(result)
+        runs.append(result)
+
+    checked = [name for name in args.healthy_patterns if name in args.patterns]
+    served = [run['sessions'] for run in runs if checked and is_healthy(run, checked)]
+    if checked:
+        print(f"\nMax sessions holding {', '.join(checked)} at >= {HEALTHY_RATE_FRACTION:.0%} of target: "
+              f"{max(served) if served else 0}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'timestamp': datetime.now().isoformat(timespec='seconds'), 'url': args.url,
+                   'patterns': args.patterns, 'charts_rate_hz': args.charts_rate_hz,
+                   'max_sessions_served': max(served) if served else 0, 'runs': runs}, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
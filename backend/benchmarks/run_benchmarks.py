@@ -0,0 +1,283 @@
+"""
+Backend benchmark suite
+Runs the HTTP routes in-process (Flask test client) against simulated ODrives
+with USB-like per-access latency and reports throughput and p50/p99 latency.
+Results are written as JSON so runs can be compared for regressions.
+
+Usage (from backend/):
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --latency-ms 0 --only telemetry_poll
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Callable
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.simulator import SimLatency, SimulatedDeviceFinder, create_simulated_devices
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Percent change in p50/p99/throughput treated as a regression by --compare
+DEFAULT_REGRESSION_THRESHOLD = 10.0
+
+# The dashboard's 12-path poll (useDashboardTelemetry.js)
+DASHBOARD_PATHS = [
+    'vbus_voltage',
+    'axis0.motor.current_control.Iq_measured',
+    'axis0.encoder.pos_estimate',
+    'axis0.encoder.vel_estimate',
+    'axis0.motor.motor_thermistor.temperature',
+    'axis0.motor.fet_thermistor.temperature',
+    'axis0.current_state',
+    'axis0.error',
+    'axis0.motor.error',
+    'axis0.encoder.error',
+    'axis0.controller.error',
+    'axis0.sensorless_estimator.error',
+]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class BenchmarkContext:
+    """Flask test client wired to a backend whose manager discovers simulated devices"""
+
+    def __init__(self, latency: SimLatency, device_count: int = 1):
+        # Keep route logging from dominating the measurement
+        logging.disable(logging.WARNING)
+        import app.app as backend
+
+        self.backend = backend
+        self.devices = create_simulated_devices(device_count, latency)
+        self.finder = SimulatedDeviceFinder(self.devices, latency)
+        backend.odrive_manager.device_finder = self.finder
+        # Measure the request path, not the per-client budget (scan alone allows 1/s)
+        backend.rate_limiter.enabled = False
+        self.client = backend.app.test_client()
+        self.device_info = None
+
+    @property
+    def device(self):
+        return self.devices[0]
+
+    def connect(self):
+        response = self.client.get('/api/odrive/scan')
+        devices = response.get_json()
+        if response.status_code != 200 or not devices:
+            raise RuntimeError(f"Scan failed ({response.status_code}): {devices}")
+        self.device_info = devices[0]
+        self.client.post('/api/odrive/connect', json={'device': self.device_info})
+
+    def shutdown(self):
+        self.backend.shutdown_services()
+        logging.disable(logging.NOTSET)
+
+
+def bench_telemetry_poll(ctx: BenchmarkContext):
+    response = ctx.client.post('/api/telemetry/get-telemetry', json={'paths': DASHBOARD_PATHS})
+    return response.status_code == 200 and response.get_json().get('connected') is True
+
+
+def bench_config_batch(ctx: BenchmarkContext):
+    response = ctx.client.post('/api/odrive/config/batch', json={'paths': ctx.config_paths})
+    return response.status_code == 200
+
+
+def bench_apply_config(ctx: BenchmarkContext):
+    response = ctx.client.post('/api/odrive/apply_config', json={'commands': ctx.apply_commands})
+    return response.status_code == 200
+
+
+def bench_calibration_status(ctx: BenchmarkContext):
+    response = ctx.client.get('/api/odrive/calibration_status?axis=0')
+    return response.status_code == 200
+
+
+def bench_scan_reconnect(ctx: BenchmarkContext):
+    response = ctx.client.get('/api/odrive/scan')
+    devices = response.get_json()
+    if response.status_code != 200 or not devices:
+        return False
+    ctx.client.post('/api/odrive/disconnect')
+    response = ctx.client.post('/api/odrive/connect', json={'device': devices[0]})
+    return response.status_code == 200
+
+
+def _prepare_config(ctx: BenchmarkContext):
+    ctx.config_paths = [f'device.{path}' for path in ctx.device.config_paths()]
+    commands = []
+    for path in ctx.device.config_paths():
+        if path.startswith('axis1.'):
+            continue
+        obj = ctx.device
+        for part in path.split('.')[:-1]:
+            obj = getattr(obj, part)
+        value = obj._get(path.split('.')[-1])
+        if isinstance(value, float) and value in (float('inf'), float('-inf')):
+            continue
+        commands.append(f'odrv0.{path} = {value}')
+    ctx.apply_commands = commands
+
+
+# name -> (function, default iterations)
+BENCHMARKS: Dict[str, tuple] = {
+    'telemetry_poll': (bench_telemetry_poll, 500),
+    'config_batch': (bench_config_batch, 30),
+    'apply_config': (bench_apply_config, 20),
+    'calibration_status': (bench_calibration_status, 200),
+    'scan_reconnect': (bench_scan_reconnect, 20),
+}
+
+
+def run_benchmark(ctx: BenchmarkContext, name: str, func: Callable, iterations: int,
+                  warmup: int) -> Dict[str, Any]:
+    for _ in range(warmup):
+        func(ctx)
+
+    ctx.device.reset_counters()
+    durations = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        op_started = time.perf_counter()
+        try:
+            ok = func(ctx)
+        except Exception:
+            ok = False
+        durations.append(time.perf_counter() - op_started)
+        if not ok:
+            errors += 1
+    total = time.perf_counter() - started
+    counters = ctx.device.get_counters()
+
+    durations.sort()
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'total_s': round(total, 4),
+        'throughput_ops': round(iterations / total, 2) if total > 0 else 0.0,
+        'mean_ms': round(sum(durations) / len(durations) * 1000, 3),
+        'p50_ms': round(percentile(durations, 0.50) * 1000, 3),
+        'p90_ms': round(percentile(durations, 0.90) * 1000, 3),
+        'p99_ms': round(percentile(durations, 0.99) * 1000, 3),
+        'max_ms': round(durations[-1] * 1000, 3),
+        'usb_reads_per_op': round(counters['reads'] / iterations, 2),
+        'usb_writes_per_op': round((counters['writes'] + counters['calls']) / iterations, 2),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return 'unknown'
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float) -> List[str]:
+    """Print a comparison table and return the names of regressed benchmarks"""
+    regressions = []
+    print(f"\nComparison against {baseline.get('revision', '?')} ({baseline.get('timestamp', '?')}):")
+    print(f"{'benchmark':<22}{'p50 ms':>18}{'p99 ms':>18}{'ops/s':>18}")
+    for name, result in current['benchmarks'].items():
+        old = baseline.get('benchmarks', {}).get(name)
+        if not old:
+            print(f"{name:<22}{'(new)':>18}")
+            continue
+
+        def change(key):
+            return (result[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+
+        p50, p99, ops = change('p50_ms'), change('p99_ms'), change('throughput_ops')
+        regressed = p50 > threshold or p99 > threshold or ops < -threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<22}{result['p50_ms']:>10.3f} {p50:+6.1f}%{result['p99_ms']:>10.3f} {p99:+6.1f}%"
+              f"{result['throughput_ops']:>10.1f} {ops:+6.1f}%{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ODrive GUI backend benchmarks (simulated device)')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help='Run only these benchmarks')
+    parser.add_argument('--iterations', type=int, help='Override iterations for every benchmark')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed iterations per benchmark')
+    parser.add_argument('--latency-ms', type=float, default=None,
+                        help='Simulated USB read latency in ms (write is scaled by 4/3); 0 measures pure backend overhead')
+    parser.add_argument('--jitter', type=float, default=0.2, help='Latency jitter fraction')
+    parser.add_argument('--seed', type=int, default=1234, help='Random seed for latency jitter')
+    parser.add_argument('--output', help='Result file (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--compare', help='Previous result file to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help='Percent change treated as a regression')
+    args = parser.parse_args(argv)
+
+    if args.latency_ms is None:
+        latency = SimLatency(jitter=args.jitter, seed=args.seed)
+    else:
+        read = args.latency_ms / 1000.0
+        latency = SimLatency(read=read, write=read * 4 / 3, discovery=read * 80, jitter=args.jitter,
+                             seed=args.seed)
+
+    ctx = BenchmarkContext(latency)
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'latency': latency.to_dict(),
+        'benchmarks': {},
+    }
+
+    try:
+        ctx.connect()
+        _prepare_config(ctx)
+        for name in args.only or list(BENCHMARKS):
+            func, default_iterations = BENCHMARKS[name]
+            iterations = args.iterations or default_iterations
+            print(f"Running {name} ({iterations} iterations)...", flush=True)
+            result = run_benchmark(ctx, name, func, iterations, args.warmup)
+            results['benchmarks'][name] = result
+            print(f"  {result['throughput_ops']:.1f} ops/s  p50 {result['p50_ms']:.3f}ms  "
+                  f"p99 {result['p99_ms']:.3f}ms  errors {result['errors']}")
+            if name == 'scan_reconnect':
+                ctx.connect()
+    finally:
+        ctx.shutdown()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, results, args.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0f}%: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
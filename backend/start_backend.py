@@ -1,10 +1,14 @@
 import os
 import sys
 import time
+import argparse
 import threading
 import webbrowser
 import importlib.util
 
+# Imported first so ODRIVE_STARTUP_PROFILE can time every import that follows
+from app.startup import timeline
+
 class Colors:
     RED = '\033[91m'
     GREEN = '\033[92m'
@@ -26,13 +30,13 @@ def colored_print(message, color=Colors.WHITE):
         clean_message = re.sub(r'[^\x00-\x7F]+', '', message)
         print(f"{color}{clean_message}{Colors.RESET}")
 
-def check_dependencies():
+def check_dependencies(require_odrive=True):
     """Check if all required dependencies are available"""
     try:
         colored_print("Checking dependencies...", Colors.BLUE)
         
-        # Check for ODrive
-        if importlib.util.find_spec("odrive") is None:
+        # Check for ODrive (not needed when simulating devices)
+        if require_odrive and importlib.util.find_spec("odrive") is None:
             colored_print("Error: ODrive library not found!", Colors.RED)
             colored_print("Install with: pip install odrive", Colors.YELLOW)
             return False
@@ -64,8 +68,25 @@ def open_browser():
         colored_print(f"Could not open browser: {e}", Colors.YELLOW)
         colored_print("Please open http://localhost:5000 manually", Colors.WHITE)
 
-def main():
+def parse_args(argv=None):
+    """Parse command line options for the backend"""
+    parser = argparse.ArgumentParser(description="ODrive GUI backend")
+    parser.add_argument('--production', action='store_true', default=None,
+                        help="Serve with the multi-threaded production server (or set ODRIVE_SERVER_MODE=production)")
+    parser.add_argument('--threads', type=int, default=None,
+                        help="Worker threads for production mode (or set ODRIVE_SERVER_THREADS)")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--simulate', type=int, default=None, metavar='N',
+                        help="Use N simulated ODrives instead of USB devices (or set ODRIVE_SIMULATE)")
+    parser.add_argument('--telemetry-tap', action='store_true',
+                        help="Publish live telemetry to local analysis scripts (or set ODRIVE_TELEMETRY_TAP=1)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main entry point for starting the ODrive GUI backend"""
+    args = parse_args(argv)
+    timeline.mark('start_backend.main')
     colored_print("ODrive GUI v3.6 Backend Starting...", Colors.CYAN)
     
     if is_running_as_executable():
@@ -73,8 +94,20 @@ def main():
     else:
         colored_print("Running in development mode", Colors.BLUE)
     
+    if args.simulate is not None:
+        # Must be set before app.app creates the ODrive manager
+        os.environ['ODRIVE_SIMULATE'] = str(args.simulate)
+    simulating = os.environ.get('ODRIVE_SIMULATE', '0') not in ('', '0')
+    if args.telemetry_tap:
+        # Also read by app.app on import (the device process ring is named for the tap)
+        os.environ['ODRIVE_TELEMETRY_TAP'] = '1'
+    if simulating:
+        colored_print(f"Simulator mode: {os.environ['ODRIVE_SIMULATE']} simulated ODrive(s)", Colors.MAGENTA)
+
     # Check dependencies
-    if not check_dependencies():
+    with timeline.phase('check dependencies'):
+        dependencies_ok = check_dependencies(require_odrive=not simulating)
+    if not dependencies_ok:
         if is_running_as_executable():
             input("Press Enter to close...")
         return 1
@@ -82,8 +115,10 @@ def main():
     colored_print("Initializing ODrive GUI...", Colors.BLUE)
     
     try:
-        # Import Flask app from app folder
-        from app.app import app
+        # Import Flask app from app folder (odrive/usb are loaded in the background)
+        with timeline.phase('import app.app'):
+            from app.app import app, shutdown_services, start_telemetry_tap
+        from app.server import run_server, get_server_mode, waitress_available
         
         colored_print("Starting ODrive GUI server...", Colors.GREEN)
         
@@ -100,7 +135,15 @@ def main():
             colored_print("   Open: http://localhost:5000", Colors.WHITE)
         
         # Start the Flask server
-        app.run(host='0.0.0.0', port=5000, debug=False)
+        server_mode = get_server_mode(args.production)
+        if server_mode == 'production' and not waitress_available():
+            colored_print("Server mode: production requested, but waitress is not installed - using werkzeug fallback", Colors.RED)
+        else:
+            colored_print(f"Server mode: {server_mode}", Colors.BLUE)
+        if start_telemetry_tap():
+            colored_print("Telemetry tap enabled for local analysis scripts", Colors.BLUE)
+        run_server(app, host=args.host, port=args.port, production=args.production,
+                   threads=args.threads, on_shutdown=shutdown_services)
         
     except KeyboardInterrupt:
         colored_print("\nODrive GUI Backend stopped", Colors.YELLOW)
@@ -1,13 +1,17 @@
 import sys
 import os
 import threading
+import multiprocessing
 import time
 import webbrowser
 import subprocess
 import logging
+
+# Imported first so ODRIVE_STARTUP_PROFILE can time every import that follows
+from app.startup import timeline, save_startup_profile
+
 import psutil
 import socket
-from tkinter import messagebox, Tk
 from PIL import Image
 import pystray
 from pystray import MenuItem as item
@@ -102,6 +106,9 @@ class ODriveTrayApp:
     def show_already_running_message(self):
         """Show message that ODrive GUI is already running and exit"""
         try:
+            # tkinter is only needed for this dialog - don't pay for it on normal startup
+            from tkinter import messagebox, Tk
+
             # Create a hidden root window for the message box
             root = Tk()
             root.withdraw()
@@ -143,19 +150,25 @@ class ODriveTrayApp:
             self.backend_starting = True
             self.update_status("Starting Backend...")
             logger.info("Starting Flask backend...")
+            timeline.mark('tray start_backend')
             
             def run_backend():
                 try:
                     # Import Flask modules in the background thread to avoid blocking UI
                     self.update_status("Loading Modules...")
-                    import app.app as flask_app  # Updated import path
+                    with timeline.phase('import app.app'):
+                        import app.app as flask_app  # Updated import path
                     logger.info("Flask app imported successfully")
                     
                     # Disable auto-browser opening in the backend
                     os.environ['ODRIVE_NO_AUTO_BROWSER'] = '1'
                     
                     self.update_status("Backend Starting...")
-                    flask_app.app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
+                    from app.server import run_server
+                    flask_app.start_telemetry_tap()
+                    # The packaged tray app always uses the production server
+                    run_server(flask_app.app, host='0.0.0.0', port=5000, production=True,
+                               on_shutdown=flask_app.shutdown_services)
                 except Exception as e:
                     logger.error(f"Error running Flask backend: {e}")
                     self.update_status("Backend Failed")
@@ -175,36 +188,44 @@ class ODriveTrayApp:
     def check_backend_ready(self):
         """Check if backend is ready in background"""
         def check_ready():
-            max_attempts = 30  # 30 seconds max wait
-            for attempt in range(max_attempts):
+            import urllib.request  # Much lighter than requests, keeps the tray responsive
+
+            max_wait = 30.0  # 30 seconds max wait
+            poll_interval = 0.1
+            started = time.monotonic()
+            last_status_second = -1
+            while time.monotonic() - started < max_wait:
                 try:
-                    import requests
-                    response = requests.get('http://localhost:5000/api/health', timeout=2)
-                    if response.status_code == 200:
-                        logger.info(f"Backend ready after {attempt + 1} seconds")
-                        self.backend_started = True
-                        self.backend_starting = False
-                        self.update_status("Ready")
-                        
-                        # Auto-open GUI after backend is ready
-                        if not self.gui_opened:
-                            self.gui_opened = True
-                            time.sleep(0.5)  # Small delay to ensure backend is fully ready
-                            self.open_gui()
-                        return
-                except:
+                    with urllib.request.urlopen('http://localhost:5000/api/health', timeout=2) as response:
+                        if response.status == 200:
+                            logger.info(f"Backend ready after {time.monotonic() - started:.2f} seconds")
+                            timeline.mark('tray backend ready')
+                            save_startup_profile()
+                            self.backend_started = True
+                            self.backend_starting = False
+                            self.update_status("Ready")
+
+                            # Auto-open GUI as soon as the backend answers
+                            if not self.gui_opened:
+                                self.gui_opened = True
+                                self.open_gui()
+                            return
+                except Exception:
                     pass  # Continue waiting
-                
-                # Update status during wait
-                if attempt < 10:
-                    self.update_status(f"Backend Starting... ({attempt + 1}s)")
-                elif attempt < 20:
-                    self.update_status(f"Loading ODrive... ({attempt + 1}s)")
-                else:
-                    self.update_status(f"Almost Ready... ({attempt + 1}s)")
-                
-                time.sleep(1)
-            
+
+                # Update status once per second during wait
+                elapsed = int(time.monotonic() - started)
+                if elapsed != last_status_second:
+                    last_status_second = elapsed
+                    if elapsed < 10:
+                        self.update_status(f"Backend Starting... ({elapsed + 1}s)")
+                    elif elapsed < 20:
+                        self.update_status(f"Loading ODrive... ({elapsed + 1}s)")
+                    else:
+                        self.update_status(f"Almost Ready... ({elapsed + 1}s)")
+
+                time.sleep(poll_interval)
+
             logger.warning("Backend did not become ready within 30 seconds")
             self.update_status("Backend Timeout")
         
@@ -326,6 +347,8 @@ class ODriveTrayApp:
             input("Press Enter to close...")
 
 if __name__ == '__main__':
+    # The frozen executable is re-launched for the device process (ODRIVE_DEVICE_PROCESS=1)
+    multiprocessing.freeze_support()
     # Move slow imports to after tray icon creation
     try:
         app = ODriveTrayApp()
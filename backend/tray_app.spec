@@ -105,6 +105,7 @@ all_hiddenimports = [
     'odrive.utils',
     'flask',
     'flask_cors',
+    'waitress',
     'psutil',
     'psutil._common',
     'psutil._compat',
@@ -113,11 +114,41 @@ all_hiddenimports = [
     'app.odrive_telemetry_config',
     'app.utils.utils',
     'app.utils.calibration_utils',
+    'app.utils.single_flight',
+    'app.utils.write_coalescer',
+    'app.utils.json_encoding',
+    'app.utils.conditional',
     'app.routes.device_routes',
     'app.routes.config_routes',
     'app.routes.calibration_routes',
     'app.routes.telemetry_routes',
     'app.routes.system_routes',
+    'app.routes.event_routes',
+    'app.routes.watchdog_routes',
+    'app.routes.motion_routes',
+    'app.routes.script_routes',
+    'app.event_bus',
+    'app.telemetry_sampler',
+    'app.telemetry_rate',
+    'app.connection_monitor',
+    'app.error_watcher',
+    'app.odrive_errors',
+    'app.watchdog_service',
+    'app.setpoint_stream',
+    'app.trajectory_player',
+    'app.script_runner',
+    'app.path_index',
+    'app.shared_ring',
+    'app.device_process', 'app.telemetry_tap', 'app.tap_client',
+    'app.server',
+    'app.static_assets',
+    'app.startup',
+    'app.metrics',
+    'app.rate_limiter',
+    'app.sampling_profiler',
+    'app.simulator',
+    'usb.core',
+    'usb.util',
     'threading',
     'webbrowser',
     'json',
@@ -1,18 +1,30 @@
-import React, { useState } from 'react'
+import React, { useState, useEffect, useRef } from 'react'
 import { useSelector } from 'react-redux'
 import { useToast } from '@chakra-ui/react'
 import { ODriveCommands } from '../utils/odriveUnifiedRegistry'
 import {
   Box, VStack, HStack, Input, Button, Text, Select, FormControl, FormLabel,
-  SimpleGrid, Code, Tooltip, IconButton, Badge
+  SimpleGrid, Code, Tooltip, IconButton, Badge, Textarea, ButtonGroup
 } from '@chakra-ui/react'
-import { Send, Copy, Clock, Trash2, CheckCircle, AlertCircle } from 'lucide-react'
+import { Send, Copy, Clock, Trash2, CheckCircle, AlertCircle, Play, Square } from 'lucide-react'
+
+const SCRIPT_POLL_INTERVAL = 100 // milliseconds
+const COMPLETION_DELAY = 80 // milliseconds
+const MAX_COMPLETIONS = 8
+
+// The device path being typed at the end of the input, e.g. "odrv0.axis0.con"
+const PATH_TOKEN = /[A-Za-z_][\w.]*$/
 
 const CommandConsole = ({ isConnected }) => {
   const [commandInput, setCommandInput] = useState('')
   const [selectedCategory, setSelectedCategory] = useState('')
   const [selectedCommand, setSelectedCommand] = useState('')
   const [commandHistory, setCommandHistory] = useState([])
+  const [scriptMode, setScriptMode] = useState(false)
+  const [scriptInput, setScriptInput] = useState('')
+  const [scriptRunning, setScriptRunning] = useState(false)
+  const lastResultIdRef = useRef(0)
+  const [completions, setCompletions] = useState([])
   
   const toast = useToast()
   
@@ -96,10 +108,154 @@ const CommandConsole = ({ isConnected }) => {
     }
   }
 
+  // Poll the backend script runner while a script is running and append each step to the history
+  useEffect(() => {
+    if (!scriptRunning) return
+
+    let cancelled = false
+    let timeoutId = null
+
+    const poll = async () => {
+      try {
+        const response = await fetch(`/api/odrive/script/status?since=${lastResultIdRef.current}`)
+        if (response.ok) {
+          const status = await response.json()
+          if (cancelled) return
+
+          if (status.results.length > 0) {
+            lastResultIdRef.current = status.results[status.results.length - 1].id
+            setCommandHistory(prev => [...prev, ...status.results.map(step => ({
+              command: step.source,
+              timestamp: new Date().toLocaleTimeString(),
+              success: step.ok,
+              result: step.ok
+                ? (step.value !== null ? `${step.value}  (${step.elapsed_ms} ms)` : `${step.elapsed_ms} ms`)
+                : `Line ${step.line}: ${step.error}`
+            }))])
+          }
+
+          if (status.state !== 'running') {
+            setScriptRunning(false)
+            toast({
+              title: `Script ${status.state}`,
+              description: status.error
+                ? `Line ${status.line}: ${status.error}`
+                : `${status.steps_run} steps in ${status.elapsed_ms} ms`,
+              status: status.state === 'complete' ? 'success' : status.state === 'cancelled' ? 'warning' : 'error',
+              duration: 3000,
+            })
+            return
+          }
+        }
+      } catch (error) {
+        console.warn('Script status error:', error)
+      }
+      if (!cancelled) {
+        timeoutId = setTimeout(poll, SCRIPT_POLL_INTERVAL)
+      }
+    }
+
+    poll()
+
+    return () => {
+      cancelled = true
+      if (timeoutId) clearTimeout(timeoutId)
+    }
+  }, [scriptRunning, toast])
+
+  // Ask the backend path index for completions of the path at the end of the input
+  useEffect(() => {
+    const token = commandInput.match(PATH_TOKEN)?.[0]
+    if (scriptMode || !isConnected || !token) {
+      setCompletions([])
+      return
+    }
+
+    const controller = new AbortController()
+    const timer = setTimeout(async () => {
+      try {
+        const response = await fetch(
+          `/api/odrive/complete?prefix=${encodeURIComponent(token)}&limit=${MAX_COMPLETIONS}`,
+          { signal: controller.signal }
+        )
+        if (response.ok) {
+          const { completions: found } = await response.json()
+          // Hide the list once the token is already a complete path
+          setCompletions(found.length === 1 && found[0].text === token ? [] : found)
+        }
+      } catch (error) {
+        if (error.name !== 'AbortError') console.warn('Completion error:', error)
+      }
+    }, COMPLETION_DELAY)
+
+    return () => {
+      clearTimeout(timer)
+      controller.abort()
+    }
+  }, [commandInput, scriptMode, isConnected])
+
+  const acceptCompletion = (completion) => {
+    const suffix = completion.kind === 'object' ? '.' : completion.kind === 'function' ? '()' : ''
+    setCommandInput(prev => prev.replace(PATH_TOKEN, completion.text + suffix))
+    setCompletions([])
+  }
+
+  const handleCommandKeyDown = (e) => {
+    if (e.key === 'Tab' && completions.length > 0) {
+      e.preventDefault()
+      acceptCompletion(completions[0])
+    } else if (e.key === 'Escape') {
+      setCompletions([])
+    }
+  }
+
+  const runScriptHandler = async () => {
+    if (!scriptInput.trim()) return
+
+    try {
+      const response = await fetch('/api/odrive/script/run', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ script: scriptInput })
+      })
+      const result = await response.json()
+      if (!response.ok) {
+        throw new Error(result.line ? `Line ${result.line}: ${result.error}` : (result.error || 'Script failed to start'))
+      }
+      lastResultIdRef.current = 0
+      setScriptRunning(true)
+    } catch (error) {
+      setCommandHistory(prev => [...prev, {
+        command: scriptInput.split('\n')[0] + (scriptInput.includes('\n') ? ' ...' : ''),
+        timestamp: new Date().toLocaleTimeString(),
+        success: false,
+        result: error.message
+      }])
+      toast({
+        title: 'Script failed to start',
+        description: error.message,
+        status: 'error',
+        duration: 3000,
+      })
+    }
+  }
+
+  const cancelScriptHandler = async () => {
+    try {
+      await fetch('/api/odrive/script/cancel', { method: 'POST' })
+    } catch (error) {
+      console.warn('Script cancel error:', error)
+    }
+  }
+
   const insertCommand = (command) => {
     // Replace axis placeholders with selected axis
     const axisAwareCommand = command.replace(/axis0/g, `axis${selectedAxis}`)
-    setCommandInput(axisAwareCommand)
+    if (scriptMode) {
+      setScriptInput(prev => (prev && !prev.endsWith('\n') ? `${prev}\n` : prev) + axisAwareCommand)
+    } else {
+      setCommandInput(axisAwareCommand)
+    }
   }
 
   const clearHistory = () => {
@@ -206,6 +362,67 @@ const CommandConsole = ({ isConnected }) => {
 
       {/* Command Input Section */}
       <Box p={4} bg="gray.700" borderBottom="1px solid" borderColor="gray.600">
+        <HStack justify="space-between" mb={3}>
+          <Text fontWeight="semibold" color="white" fontSize="sm">
+            {scriptMode ? 'Script' : 'Command'}
+          </Text>
+          <ButtonGroup size="xs" isAttached variant="outline">
+            <Button
+              colorScheme={scriptMode ? 'gray' : 'blue'}
+              variant={scriptMode ? 'outline' : 'solid'}
+              onClick={() => setScriptMode(false)}
+            >
+              Single
+            </Button>
+            <Button
+              colorScheme={scriptMode ? 'blue' : 'gray'}
+              variant={scriptMode ? 'solid' : 'outline'}
+              onClick={() => setScriptMode(true)}
+            >
+              Script
+            </Button>
+          </ButtonGroup>
+        </HStack>
+        {scriptMode ? (
+          <VStack spacing={2} align="stretch">
+            <Textarea
+              value={scriptInput}
+              onChange={(e) => setScriptInput(e.target.value)}
+              placeholder={`odrv0.axis${selectedAxis}.requested_state = 8\nwait_until(odrv0.axis${selectedAxis}.current_state == 8, timeout=2)\nodrv0.axis${selectedAxis}.controller.input_pos = 5\nwait_until(abs(odrv0.axis${selectedAxis}.encoder.vel_estimate) < 0.01)`}
+              bg="gray.600"
+              border="1px solid"
+              borderColor="gray.500"
+              color="white"
+              fontFamily="mono"
+              fontSize="sm"
+              rows={6}
+              isDisabled={scriptRunning}
+            />
+            <HStack justify="flex-end" spacing={2}>
+              <Button
+                colorScheme="red"
+                onClick={cancelScriptHandler}
+                isDisabled={!scriptRunning}
+                leftIcon={<Square size={14} />}
+                size="sm"
+                minW="80px"
+              >
+                Cancel
+              </Button>
+              <Button
+                colorScheme="green"
+                onClick={runScriptHandler}
+                isDisabled={!scriptInput.trim() || !isConnected || scriptRunning}
+                isLoading={scriptRunning}
+                leftIcon={<Play size={14} />}
+                size="sm"
+                minW="80px"
+              >
+                Run
+              </Button>
+            </HStack>
+          </VStack>
+        ) : (
         <HStack spacing={2}>
           <Input
             value={commandInput}
@@ -218,6 +435,7 @@ const CommandConsole = ({ isConnected }) => {
             fontFamily="mono"
             fontSize="sm"
             onKeyPress={(e) => e.key === 'Enter' && sendCommandHandler()}
+            onKeyDown={handleCommandKeyDown}
           />
           <Button
             colorScheme="green"
@@ -230,6 +448,27 @@ const CommandConsole = ({ isConnected }) => {
             Send
           </Button>
         </HStack>
+        )}
+        {!scriptMode && completions.length > 0 && (
+          <HStack spacing={1} mt={2} flexWrap="wrap">
+            <Text fontSize="xs" color="gray.400">Tab:</Text>
+            {completions.map(completion => (
+              <Tooltip
+                key={completion.path}
+                label={`${completion.kind}${completion.type ? ` (${completion.type})` : ''}`}
+              >
+                <Code
+                  fontSize="xs"
+                  colorScheme={completion.kind === 'function' ? 'purple' : completion.kind === 'object' ? 'blue' : 'gray'}
+                  cursor="pointer"
+                  onClick={() => acceptCompletion(completion)}
+                >
+                  {completion.name}{completion.kind === 'function' ? '()' : ''}
+                </Code>
+              </Tooltip>
+            ))}
+          </HStack>
+        )}
       </Box>
 
       {/* Command History Section */}
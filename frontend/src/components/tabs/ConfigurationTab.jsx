@@ -21,7 +21,7 @@ import ControlConfigStep from '../config-steps/ControlConfigStep'
 import InterfaceConfigStep from '../config-steps/InterfaceConfigStep'
 import FinalConfigStep from '../config-steps/FinalConfigStep'
 import DebugConfigStep from '../config-steps/DebugConfigStep'
-import { convertTorqueConstantToKv } from '../../utils/valueHelpers'
+import { convertTorqueConstantToKv, fromJsonValue } from '../../utils/valueHelpers'
 import { applyAndSaveConfiguration } from '../../utils/configurationActions'
 import {
   loadAllConfigurationBatch
@@ -301,7 +301,7 @@ const ConfigurationTab = memo(() => {
       
       if (response.ok) {
         const data = await response.json()
-        let value = data.value
+        let value = fromJsonValue(data.value)
 
         // Handle special conversions
         if (configKey === 'motor_kv' && odriveCommand.includes('torque_constant')) {
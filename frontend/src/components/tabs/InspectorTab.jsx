@@ -47,12 +47,16 @@ const InspectorTab = memo(() => {
       })
 
       if (response.ok) {
-        toast({
-          title: 'Success',
-          description: `Updated ${path} = ${value}`,
-          status: 'success',
-          duration: 2000,
-        })
+        const result = await response.json()
+        // During a drag the backend only writes the newest value; superseded writes need no toast
+        if (!result.superseded) {
+          toast({
+            title: 'Success',
+            description: `Updated ${path} = ${result.applied_value ?? value}`,
+            status: 'success',
+            duration: 2000,
+          })
+        }
       } else {
         const error = await response.json()
         throw new Error(error.error || 'Update failed')
@@ -1,4 +1,9 @@
 import { useState, useCallback,} from 'react'
+import { postJsonConditional } from '../../utils/conditionalFetch'
+import { fromJsonValue } from '../../utils/valueHelpers'
+
+// Same rule the backend uses for versioned (ETag) reads: anything under a config object
+const isConfigPath = (path) => path.split('.').slice(0, -1).includes('config')
 
 export const usePropertyRefresh = (odrivePropertyTree, collectAllProperties, isConnected) => {
   const [refreshingProperties, setRefreshingProperties] = useState(new Set())
@@ -31,39 +36,37 @@ export const usePropertyRefresh = (odrivePropertyTree, collectAllProperties, isC
     })
 
     try {
-      // Make single batch request for all properties
+      // Config values only change when written, so they are requested separately and
+      // revalidated (304 while unchanged); live values are always read fresh
+      const configPaths = devicePaths.filter(isConfigPath)
+      const livePaths = devicePaths.filter(path => !isConfigPath(path))
       console.log(`Refreshing ${allPaths.length} properties in batch request...`)
       
-      const response = await fetch('/api/odrive/property', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ paths: devicePaths })
-      })
+      const [configResult, liveResponse] = await Promise.all([
+        configPaths.length > 0
+          ? postJsonConditional('/api/odrive/property', { paths: configPaths })
+          : { ok: true, data: { results: {} } },
+        livePaths.length > 0
+          ? fetch('/api/odrive/property', {
+              method: 'POST',
+              headers: { 'Content-Type': 'application/json' },
+              body: JSON.stringify({ paths: livePaths })
+            })
+          : null
+      ])
 
-      if (response.ok) {
-        const responseText = await response.text()
-        
+      if (configResult.ok && (!liveResponse || liveResponse.ok)) {
         try {
-          // Handle potential Infinity values in batch response
-          const cleanedResponse = responseText.replace(/:Infinity/g, ':"Infinity"').replace(/:-Infinity/g, ':"-Infinity"')
-          const data = JSON.parse(cleanedResponse)
+          const liveData = liveResponse ? await liveResponse.json() : { results: {} }
+          const results = { ...configResult.data.results, ...liveData.results }
           
-          if (data.results) {
+          if (configResult.data.results && liveData.results) {
             const newPropertyValues = {}
             
             // Map device paths back to display paths and handle values
             allPaths.forEach((displayPath, index) => {
               const devicePath = devicePaths[index]
-              let value = data.results[devicePath]
-              
-              // Convert string Infinity back to actual Infinity
-              if (value === "Infinity") {
-                value = Infinity
-              } else if (value === "-Infinity") {
-                value = -Infinity
-              }
-              
-              newPropertyValues[displayPath] = value
+              newPropertyValues[displayPath] = fromJsonValue(results[devicePath])
             })
             
             setPropertyValues(newPropertyValues)
@@ -79,7 +82,7 @@ export const usePropertyRefresh = (odrivePropertyTree, collectAllProperties, isC
           setPropertyValues(fallbackValues)
         }
       } else {
-        console.error('Batch property request failed:', response.status)
+        console.error('Batch property request failed:', configResult.ok ? liveResponse.status : configResult.status)
         // Fallback: set all to error
         const errorValues = {}
         allPaths.forEach(path => {
@@ -146,43 +149,18 @@ export const usePropertyRefresh = (odrivePropertyTree, collectAllProperties, isC
       })
       
       if (response.ok) {
-        const responseText = await response.text()
-        
         try {
-          // Try to parse as normal JSON first
-          const data = JSON.parse(responseText)
+          const data = await response.json()
           setPropertyValues(prev => ({
             ...prev,
-            [displayPath]: data.value
+            [displayPath]: fromJsonValue(data.value)
+          }))
+        } catch (parseError) {
+          console.error('Failed to parse property response:', parseError)
+          setPropertyValues(prev => ({
+            ...prev,
+            [displayPath]: 'Parse Error'
           }))
-        // eslint-disable-next-line no-unused-vars
-        } catch (jsonError) {
-          // If JSON parsing fails, try to handle Infinity values
-          try {
-            // Replace Infinity with a string representation for parsing
-            const cleanedResponse = responseText.replace(/:Infinity/g, ':"Infinity"').replace(/:-Infinity/g, ':"-Infinity"')
-            const data = JSON.parse(cleanedResponse)
-            
-            // Convert string back to actual Infinity for proper handling
-            let value = data.value
-            if (value === "Infinity") {
-              value = Infinity
-            } else if (value === "-Infinity") {
-              value = -Infinity
-            }
-            
-            setPropertyValues(prev => ({
-              ...prev,
-              [displayPath]: value
-            }))
-          } catch (cleanupError) {
-            console.error(`Cleaned response also failed to parse:`, cleanupError)
-            // Set a fallback value
-            setPropertyValues(prev => ({
-              ...prev,
-              [displayPath]: 'Parse Error'
-            }))
-          }
         }
       }
     } catch (error) {
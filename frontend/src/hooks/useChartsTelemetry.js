@@ -1,63 +1,71 @@
 import { useEffect, useRef } from 'react'
 
-export const useChartsTelemetry = (properties, onData) => {
-  const intervalRef = useRef(null)
-  const lastRequestTime = useRef(0)
-  const updateRate = 1 // milliseconmds
+// Rate we ask the backend for; it answers with the rate it can actually sustain
+const DESIRED_RATE_HZ = 1000
+const MIN_POLL_INTERVAL = 1 // milliseconds
+const MAX_POLL_INTERVAL = 2000 // milliseconds
+
+export const useChartsTelemetry = (properties, onData, desiredRate = DESIRED_RATE_HZ) => {
+  const timeoutRef = useRef(null)
+  const clientIdRef = useRef(`charts-${Math.random().toString(36).slice(2, 10)}`)
 
   useEffect(() => {
     if (!properties.length) {
-      if (intervalRef.current) {
-        clearInterval(intervalRef.current)
-        intervalRef.current = null
-      }
       return
     }
 
+    let cancelled = false
+
+    // One request in flight at a time; the next poll is scheduled from the backend's advertised rate
     const fetchData = async () => {
+      let nextPoll = 1000 / desiredRate
       try {
-        // Add small random delay to stagger requests
-        const now = Date.now()
-        const minInterval = 1
-        const timeSinceLastRequest = now - lastRequestTime.current
-
-        if (timeSinceLastRequest < minInterval) {
-          await new Promise(resolve => setTimeout(resolve, minInterval - timeSinceLastRequest))
-        }
-
-        lastRequestTime.current = Date.now()
-
         const response = await fetch('/api/telemetry/get-telemetry', {
           method: 'POST',
           headers: {
             'Content-Type': 'application/json',
           },
-          body: JSON.stringify({ paths: properties }),
+          body: JSON.stringify({ paths: properties, rate_hz: desiredRate, client_id: clientIdRef.current }),
         })
 
         if (response.ok) {
-          const data = await response.json()
-          // Fix: Check if we have data and pass it correctly
-          if (data && Object.keys(data).length > 0) {
+          const { sampling, ...data } = await response.json()
+          if (sampling?.next_poll_ms) {
+            nextPoll = sampling.next_poll_ms
+          }
+          // Responses served from cache may repeat the previous sample - only forward fresh ones
+          if (!cancelled && data && Object.keys(data).length > 0 && sampling?.fresh !== false) {
             onData({
               data: data,  // Pass data directly, not nested
-              timestamp: Date.now()
+              timestamp: Date.now(),
+              sampling,
             })
           }
+        } else if (response.status === 429) {
+          // Rate limited - wait as long as the backend asks before polling again
+          const body = await response.json().catch(() => ({}))
+          nextPoll = body.retry_after_ms ?? Number(response.headers.get('Retry-After')) * 1000
         }
       } catch (error) {
         // Just log errors, don't handle connection state
         console.warn('Charts telemetry error:', error)
+        nextPoll = MAX_POLL_INTERVAL / 4
+      }
+
+      if (!cancelled) {
+        const delay = Math.min(MAX_POLL_INTERVAL, Math.max(MIN_POLL_INTERVAL, nextPoll))
+        timeoutRef.current = setTimeout(fetchData, delay)
       }
     }
 
-    intervalRef.current = setInterval(fetchData, updateRate)
+    fetchData()
 
     return () => {
-      if (intervalRef.current) {
-        clearInterval(intervalRef.current)
-        intervalRef.current = null
+      cancelled = true
+      if (timeoutRef.current) {
+        clearTimeout(timeoutRef.current)
+        timeoutRef.current = null
       }
     }
-  }, [properties, onData, updateRate])
+  }, [properties, onData, desiredRate])
 }
@@ -0,0 +1,46 @@
+/**
+ * Conditional POST requests for versioned config reads
+ *
+ * Browsers don't revalidate POST responses on their own, so the last ETag and
+ * parsed body are kept per request here and sent back as If-None-Match. The
+ * backend answers 304 (no USB reads) while nothing has been written since.
+ */
+
+const MAX_CACHED_REQUESTS = 16
+const responseCache = new Map()
+
+/**
+ * POST a JSON body and return { ok, status, data }; a 304 returns the cached data
+ */
+export const postJsonConditional = async (url, body) => {
+  const requestBody = JSON.stringify(body)
+  const key = `${url}\n${requestBody}`
+  const cached = responseCache.get(key)
+
+  const headers = { 'Content-Type': 'application/json' }
+  if (cached) {
+    headers['If-None-Match'] = cached.etag
+  }
+
+  const response = await fetch(url, { method: 'POST', headers, body: requestBody })
+
+  if (response.status === 304 && cached) {
+    return { ok: true, status: 304, data: cached.data }
+  }
+  if (!response.ok) {
+    responseCache.delete(key)
+    return { ok: false, status: response.status, data: null, response }
+  }
+
+  const data = await response.json()
+  const etag = response.headers.get('ETag')
+  responseCache.delete(key)
+  if (etag) {
+    responseCache.set(key, { etag, data })
+    if (responseCache.size > MAX_CACHED_REQUESTS) {
+      // Map keeps insertion order - drop the least recently stored request
+      responseCache.delete(responseCache.keys().next().value)
+    }
+  }
+  return { ok: true, status: response.status, data }
+}
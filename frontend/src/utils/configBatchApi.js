@@ -6,32 +6,21 @@
  */
 
 import { odriveRegistry, getBatchPaths } from './odriveUnifiedRegistry'
+import { fromJsonValue } from './valueHelpers'
 import { convertTorqueConstantToKv } from './valueHelpers'
+import { postJsonConditional } from './conditionalFetch'
 
 export const loadConfigurationBatch = async (configPaths) => {
   try {
-    const response = await fetch('/api/odrive/config/batch', {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ paths: configPaths })
-    });
+    // Revalidates against the last response - unchanged config comes back as 304 without USB reads
+    const { ok, status, data, response } = await postJsonConditional('/api/odrive/config/batch', { paths: configPaths });
 
-    if (!response.ok) {
+    if (!ok) {
       const errorText = await response.text();
       console.error('Batch API error response:', errorText);
-      throw new Error(`HTTP error! status: ${response.status} - ${errorText}`);
-    }
-
-    // Check if response is actually JSON
-    const contentType = response.headers.get('content-type');
-    if (!contentType || !contentType.includes('application/json')) {
-      const responseText = await response.text();
-      console.error('Non-JSON response received:', responseText);
-      throw new Error(`Expected JSON response but got: ${contentType || 'unknown'}. Response: ${responseText.substring(0, 200)}`);
+      throw new Error(`HTTP error! status: ${status} - ${errorText}`);
     }
 
-    const data = await response.json();
-
     // Validate response structure
     if (!data || typeof data !== 'object' || !data.results) {
       console.error('Invalid response structure:', data);
@@ -69,7 +58,8 @@ export const loadConfigurationBatch = async (configPaths) => {
           }
         }
       } else {
-        cleanedResults[path] = value;
+        // Infinite limits arrive as strings (JSON has no Infinity)
+        cleanedResults[path] = fromJsonValue(value);
       }
     });
 
@@ -52,3 +52,15 @@ export const convertKvToTorqueConstant = (motorKv) => {
   }
   return 0.0
 }
+
+/**
+ * Map a value read from the backend back to a number where JSON could not carry it
+ * (the backend sends infinite values as the strings "Infinity" / "-Infinity", NaN as null)
+ * @param {*} value - The value as received
+ * @returns {*} Infinity / -Infinity for those strings, the value unchanged otherwise
+ */
+export const fromJsonValue = (value) => {
+  if (value === 'Infinity') return Infinity
+  if (value === '-Infinity') return -Infinity
+  return value
+}
@@ -1,8 +1,46 @@
 import { defineConfig } from 'vite'
 import react from '@vitejs/plugin-react'
+import fs from 'node:fs'
+import path from 'node:path'
+import zlib from 'node:zlib'
+
+// Write .br/.gz next to compressible build output so the backend never has to
+// compress on the fly (it serves these variants when present)
+const COMPRESSIBLE = /\.(js|mjs|css|html|svg|json|wasm|xml|txt)$/
+const MIN_COMPRESS_SIZE = 1024
+
+function precompress() {
+  let outDir = 'dist'
+  return {
+    name: 'precompress',
+    apply: 'build',
+    configResolved(config) {
+      outDir = path.resolve(config.root, config.build.outDir)
+    },
+    closeBundle() {
+      const walk = (dir) => {
+        for (const entry of fs.readdirSync(dir, { withFileTypes: true })) {
+          const file = path.join(dir, entry.name)
+          if (entry.isDirectory()) {
+            walk(file)
+            continue
+          }
+          if (!COMPRESSIBLE.test(entry.name)) continue
+          const content = fs.readFileSync(file)
+          if (content.length < MIN_COMPRESS_SIZE) continue
+          fs.writeFileSync(`${file}.br`, zlib.brotliCompressSync(content, {
+            params: { [zlib.constants.BROTLI_PARAM_QUALITY]: 11 },
+          }))
+          fs.writeFileSync(`${file}.gz`, zlib.gzipSync(content, { level: 9 }))
+        }
+      }
+      walk(outDir)
+    },
+  }
+}
 
 export default defineConfig({
-  plugins: [react()],
+  plugins: [react(), precompress()],
   server: {
     port: 3000,
     proxy: {